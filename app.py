@@ -1,6 +1,10 @@
 """
 Investment Outlook – Flask app.
 Serves the frontend static files and mounts /api/stock routes.
+Unless WARMER_ENABLED=0, a background thread keeps popular symbols warm (see
+backend/services/warmer.py).
+`python app.py` runs the development server; production uses `gunicorn app:app`
+with gevent workers (see gunicorn.conf.py).
 """
 
 import os
@@ -13,11 +17,22 @@ from flask import Flask, send_from_directory
 from backend.routes.stock import stock_bp
 from backend.routes.real_estate import real_estate_bp
 from backend.routes.compare import compare_bp
+from backend.routes.metrics import metrics_bp
+from backend.routes.instrumentation import init_app as init_instrumentation
+from backend.services import warmer
 
 app = Flask(__name__, static_folder="frontend", static_url_path="")
 app.register_blueprint(stock_bp)
 app.register_blueprint(real_estate_bp)
 app.register_blueprint(compare_bp)
+app.register_blueprint(metrics_bp)
+init_instrumentation(app)
+
+# Outlook worker processes re-import this module as __mp_main__; they must not warm.
+if __name__ != "__mp_main__" and (os.environ.get("WARMER_ENABLED") or "1").strip().lower() not in (
+    "0", "false", "no", "off",
+):
+    warmer.start()
 
 
 @app.route("/")
@@ -0,0 +1,148 @@
+"""
+HTTP response caching for deterministic GET endpoints.
+
+Responses are stored serialized in the shared ResponseCache under the path plus a
+canonical query string, sent with a strong ETag (If-None-Match answers 304), and given
+a Cache-Control lifetime by the route's policy: results that can never change (pure
+real estate math) are immutable, closed historical stock ranges are cacheable for a
+day, anything ending "today" must be revalidated. Entries tagged with a symbol are
+dropped when that symbol's price series is refreshed, and a cache hit still counts as a
+request for the symbol (popularity) so the warmer keeps it hot. Answers built on the
+regional dataset are dropped as soon as a lookup sees that its file was rebuilt.
+"""
+
+from datetime import date
+from functools import wraps
+from typing import Callable
+
+from flask import make_response, request
+
+from backend.services import popularity, regional_data
+from backend.services.alpha_vantage import add_refresh_listener
+from backend.services.response_cache import CachedResponse, cache
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Adjusted closes of a closed range only move if a later split/dividend re-bases history
+CLOSED_RANGE = "public, max-age=86400"
+REVALIDATE = "no-cache"
+
+# Server-side lifetimes. Cached stock answers skip get_daily_adjusted, which is what
+# triggers a series refresh (and tag invalidation), so they must also expire by time.
+CLOSED_RANGE_TTL = 86400.0
+OPEN_RANGE_TTL = 300.0
+
+# A policy maps the request args to (tags, Cache-Control value, server TTL or None).
+# It may also have a before_lookup(args) attribute, run before every cache lookup (hits
+# included) so it can invalidate entries whose inputs changed outside the app.
+Policy = Callable[[dict], tuple[frozenset[str], str, float | None]]
+
+REGIONAL_TAG = "regional"
+
+add_refresh_listener(lambda symbol: cache.invalidate_tag(f"symbol:{symbol}"))
+regional_data.add_reload_listener(lambda: cache.invalidate_tag(REGIONAL_TAG))
+
+
+def canonical_query(args) -> str:
+    """Sorted, whitespace-trimmed, empty-dropped query string; symbol upper-cased."""
+    pairs = []
+    for key in sorted(args.keys()):
+        for value in sorted(args.getlist(key)):
+            value = value.strip()
+            if not value:
+                continue
+            if key == "symbol":
+                value = value.upper()
+            pairs.append(f"{key}={value}")
+    return "&".join(pairs)
+
+
+def immutable_policy(args) -> tuple[frozenset[str], str, float | None]:
+    return frozenset(), IMMUTABLE, None
+
+
+def stock_policy(end_param: str) -> Policy:
+    """Tag by symbol; closed (end date before today) ranges get CLOSED_RANGE, others revalidate."""
+    def policy(args) -> tuple[frozenset[str], str, float | None]:
+        symbol = (args.get("symbol") or "").strip().upper()
+        if not symbol:
+            return frozenset(), IMMUTABLE, None
+        tags = frozenset({f"symbol:{symbol}"})
+        end = (args.get(end_param) or "").strip()
+        if end and end < date.today().isoformat():
+            return tags, CLOSED_RANGE, CLOSED_RANGE_TTL
+        return tags, REVALIDATE, OPEN_RANGE_TTL
+    return policy
+
+
+def dated_policy(date_param: str) -> Policy:
+    """stock_policy(date_param), except that a missing date (meaning today) always revalidates."""
+    by_symbol = stock_policy(date_param)
+
+    def policy(args) -> tuple[frozenset[str], str, float | None]:
+        tags, cache_control, ttl = by_symbol(args)
+        if not (args.get(date_param) or "").strip():
+            return tags, REVALIDATE, OPEN_RANGE_TTL
+        return tags, cache_control, ttl
+    return policy
+
+
+def regional_policy(policy: Policy) -> Policy:
+    """
+    policy, except that answers using the regional dataset (region or
+    annualInterestRate=historical) are tagged and only kept for CLOSED_RANGE: the
+    dataset can be rebuilt under a running app.
+    """
+    def uses_dataset(args) -> bool:
+        rate = (args.get("annualInterestRate") or "").strip().lower()
+        return bool((args.get("region") or "").strip()) or rate == "historical"
+
+    def wrapped(args) -> tuple[frozenset[str], str, float | None]:
+        tags, cache_control, ttl = policy(args)
+        if not uses_dataset(args):
+            return tags, cache_control, ttl
+        if cache_control == IMMUTABLE:
+            cache_control, ttl = CLOSED_RANGE, CLOSED_RANGE_TTL
+        return tags | {REGIONAL_TAG}, cache_control, ttl
+
+    def before_lookup(args) -> None:
+        # A rebuilt file is noticed here even when every answer comes from the cache
+        # (a stat per lookup); the reload drops the REGIONAL_TAG entries
+        if uses_dataset(args):
+            regional_data.reload_if_changed()
+
+    wrapped.before_lookup = before_lookup
+    return wrapped
+
+
+def cached(policy: Policy):
+    """Decorator for GET views returning JSON: serve from / store into the response cache."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"{request.path}?{canonical_query(request.args)}"
+            before_lookup = getattr(policy, "before_lookup", None)
+            if before_lookup is not None:
+                before_lookup(request.args)
+            entry = cache.get(key)
+            if entry is None:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.is_streamed:
+                    return resp
+                tags, cache_control, ttl = policy(request.args)
+                entry = CachedResponse(resp.get_data(), resp.mimetype, cache_control, tags, ttl)
+                cache.put(key, entry)
+            else:
+                for tag in entry.tags:
+                    if tag.startswith("symbol:"):
+                        popularity.record(tag[len("symbol:"):])
+            if entry.etag in request.if_none_match:
+                cache.record_not_modified()
+                resp = make_response("", 304)
+            else:
+                resp = make_response(entry.body)
+                resp.mimetype = entry.mimetype
+            resp.set_etag(entry.etag)
+            resp.headers["Cache-Control"] = entry.cache_control
+            return resp
+        return wrapper
+    return decorator
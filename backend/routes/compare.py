@@ -4,21 +4,45 @@ Returns both results so the frontend can show side-by-side (and we use one stock
 Also time-series for year-over-year chart.
 """
 
-from flask import Blueprint, request, jsonify
+import json
 
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+
+from backend.routes.caching import cached, dated_policy, regional_policy, stock_policy
+from backend.routes.real_estate import cash_flow_args, interest_rate_arg
 from backend.services.returns import compute_hypothetical_return
 from backend.services.real_estate import compute_hypothetical_real_estate
 from backend.services.compare_timeseries import get_compare_time_series
+from backend.services.portfolio import compare_portfolio
+from backend.services.outlook import (
+    DEFAULT_APPRECIATION_VOLATILITY_PERCENT,
+    DEFAULT_HORIZON_YEARS,
+    DEFAULT_LOOKBACK_YEARS,
+    DEFAULT_PATHS,
+    DEFAULT_SEED,
+    simulate_outlook,
+)
+from backend.services.break_even import TARGETS as BREAK_EVEN_TARGETS, break_even
+from backend.services.rolling import rolling_windows
+from backend.services.batch import (
+    DEFAULT_CHUNK_SIZE,
+    REAL_ESTATE_COLUMNS,
+    STOCK_COLUMNS,
+    evaluate_batch,
+    expand_scenarios,
+)
 
 compare_bp = Blueprint("compare", __name__, url_prefix="/api/compare")
 
 
 @compare_bp.route("", methods=["GET"])
+@cached(regional_policy(stock_policy("sellDate")))
 def compare():
     """
     GET with optional stock params: symbol, investedAmount, buyDate, sellDate
     and optional real estate params: purchasePrice, downPaymentPercent, annualInterestRate,
-    buyDate (re), asOfDate, annualAppreciationPercent.
+    buyDate (re), asOfDate, annualAppreciationPercent, region (historical home prices)
+    and annualInterestRate=historical (30-year fixed rate of the buy month).
     Returns { stock: {...} or null, realEstate: {...} or null }.
     At least one set of params must be provided.
     """
@@ -33,10 +57,14 @@ def compare():
     # Real estate params (use reBuyDate/reAsOfDate to avoid clashing with stock buyDate/sellDate)
     purchase_price = request.args.get("purchasePrice", type=float)
     down_payment_percent = request.args.get("downPaymentPercent", type=float)
-    annual_interest_rate = request.args.get("annualInterestRate", type=float)
     re_buy_date = (request.args.get("reBuyDate") or request.args.get("buyDate") or "").strip()
     as_of_date = (request.args.get("asOfDate") or "").strip()
     annual_appreciation = request.args.get("annualAppreciationPercent", type=float) or 0.0
+    region = (request.args.get("region") or "").strip() or None
+    try:
+        annual_interest_rate = interest_rate_arg(request.args, re_buy_date)
+    except ValueError as e:
+        return jsonify({"error": f"Real estate: {e}"}), 400
 
     has_stock = symbol and invested_amount and invested_amount > 0 and stock_buy
     has_re = (
@@ -78,6 +106,7 @@ def compare():
                 buy_date=re_buy_date,
                 as_of_date=as_of_date,
                 annual_appreciation_percent=annual_appreciation,
+                region=region,
             )
         except ValueError as e:
             errors.append(f"Real estate: {e}")
@@ -89,10 +118,16 @@ def compare():
 
 
 @compare_bp.route("/time-series", methods=["GET"])
+@cached(regional_policy(stock_policy("sellDate")))
 def compare_time_series():
     """
-    GET same params as /api/compare. Returns year-over-year values for charting:
-    { years: ["2020","2021",...], stock: { values: [...] }, realEstate: { values: [...] } }.
+    GET same params as /api/compare, plus optional granularity=daily|weekly|monthly|yearly
+    (default yearly), maxPoints (default 1000; longer series are downsampled) and the
+    /api/real-estate/cash-flow params (propertyTaxPercent, monthlyRent, ...), which
+    switch real estate from equity to ledger net worth.
+    Returns period-end values for charting:
+    { granularity, labels: [...], years: [...] (yearly only), stock: { values: [...] },
+      realEstate: { values: [...], metric: "netWorth" and summary with cash-flow params } }.
     """
     symbol = (request.args.get("symbol") or "").strip().upper()
     invested_amount = request.args.get("investedAmount", type=float)
@@ -100,10 +135,16 @@ def compare_time_series():
     stock_sell = (request.args.get("sellDate") or "").strip() or None
     purchase_price = request.args.get("purchasePrice", type=float)
     down_payment_percent = request.args.get("downPaymentPercent", type=float)
-    annual_interest_rate = request.args.get("annualInterestRate", type=float)
     re_buy_date = (request.args.get("reBuyDate") or request.args.get("buyDate") or "").strip()
     as_of_date = (request.args.get("asOfDate") or "").strip()
     annual_appreciation = request.args.get("annualAppreciationPercent", type=float) or 0.0
+    region = (request.args.get("region") or "").strip() or None
+    try:
+        annual_interest_rate = interest_rate_arg(request.args, re_buy_date)
+    except ValueError as e:
+        return jsonify({"error": f"Real estate: {e}"}), 400
+    granularity = (request.args.get("granularity") or "yearly").strip().lower()
+    max_points = request.args.get("maxPoints", type=int)
 
     has_stock = symbol and invested_amount and invested_amount > 0 and stock_buy
     has_re = (
@@ -130,7 +171,273 @@ def compare_time_series():
             re_buy_date=re_buy_date if has_re else None,
             as_of_date=as_of_date if has_re else None,
             annual_appreciation_percent=annual_appreciation,
+            granularity=granularity,
+            max_points=max_points,
+            cash_flow=cash_flow_args(request.args) if has_re else None,
+            region=region if has_re else None,
         )
         return jsonify(out)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+
+
+@compare_bp.route("/outlook", methods=["GET"])
+@cached(dated_policy("startDate"))
+def outlook():
+    """
+    GET Monte Carlo outlook. Stock params: symbol, investedAmount; real estate params:
+    purchasePrice, downPaymentPercent, annualInterestRate, annualAppreciationPercent
+    (mean), appreciationVolatilityPercent. Optional: startDate (default today),
+    horizonYears (10), paths (10000), method=bootstrap|gbm, lookbackYears (20), seed (0).
+    Returns { labels, percentiles, stock: { bands, calibration, summary } or null,
+    realEstate: { bands, summary, ... } or null, ... }.
+    """
+    symbol = (request.args.get("symbol") or "").strip().upper()
+    invested_amount = request.args.get("investedAmount", type=float)
+    purchase_price = request.args.get("purchasePrice", type=float)
+    has_stock = symbol and invested_amount is not None
+    if not has_stock and purchase_price is None:
+        return jsonify({
+            "error": (
+                "Provide stock params (symbol, investedAmount) and/or real estate params "
+                "(purchasePrice, downPaymentPercent, annualInterestRate)."
+            ),
+        }), 400
+    try:
+        out = simulate_outlook(
+            symbol=symbol if has_stock else None,
+            invested_amount=invested_amount if has_stock else None,
+            purchase_price=purchase_price,
+            down_payment_percent=request.args.get("downPaymentPercent", type=float),
+            annual_interest_rate=request.args.get("annualInterestRate", type=float),
+            annual_appreciation_percent=(
+                request.args.get("annualAppreciationPercent", type=float) or 0.0
+            ),
+            appreciation_volatility_percent=request.args.get(
+                "appreciationVolatilityPercent",
+                default=DEFAULT_APPRECIATION_VOLATILITY_PERCENT,
+                type=float,
+            ),
+            start_date=(request.args.get("startDate") or "").strip() or None,
+            horizon_years=request.args.get("horizonYears", default=DEFAULT_HORIZON_YEARS, type=int),
+            paths=request.args.get("paths", default=DEFAULT_PATHS, type=int),
+            method=(request.args.get("method") or "bootstrap").strip().lower(),
+            lookback_years=request.args.get("lookbackYears", default=DEFAULT_LOOKBACK_YEARS, type=int),
+            seed=request.args.get("seed", default=DEFAULT_SEED, type=int),
+        )
+        return jsonify(out)
+    except ValueError as e:
+        status = 503 if "API key" in str(e) else 400
+        return jsonify({"error": str(e)}), status
+
+
+@compare_bp.route("/rolling", methods=["GET"])
+@cached(regional_policy(dated_policy("to")))
+def rolling():
+    """
+    GET every-start-date analysis: holdingYears plus stock params (symbol,
+    investedAmount) and/or real estate params (purchasePrice, downPaymentPercent,
+    annualInterestRate or "historical", annualAppreciationPercent, region).
+    Optional: from / to (range of buy dates; from is required without a stock),
+    step=daily|weekly|monthly, windows=1 for per-window columns.
+    Returns { windows, firstBuyDate, lastBuyDate, stock: { gainLossPercent: {...},
+    annualizedReturnPercent: {...}, lossPercent, worst, best } or null, realEstate: {...}
+    or null, stockBeatsRealEstatePercent, columns }.
+    """
+    symbol = (request.args.get("symbol") or "").strip().upper()
+    invested_amount = request.args.get("investedAmount", type=float)
+    purchase_price = request.args.get("purchasePrice", type=float)
+    holding_years = request.args.get("holdingYears", type=int)
+    has_stock = symbol and invested_amount is not None
+    if holding_years is None or (not has_stock and purchase_price is None):
+        return jsonify({
+            "error": (
+                "Provide holdingYears and stock params (symbol, investedAmount) and/or real "
+                "estate params (purchasePrice, downPaymentPercent, annualInterestRate)."
+            ),
+        }), 400
+    rate = (request.args.get("annualInterestRate") or "").strip().lower()
+    try:
+        out = rolling_windows(
+            holding_years=holding_years,
+            symbol=symbol if has_stock else None,
+            invested_amount=invested_amount if has_stock else None,
+            purchase_price=purchase_price,
+            down_payment_percent=request.args.get("downPaymentPercent", type=float),
+            annual_interest_rate=(
+                rate if rate == "historical"
+                else request.args.get("annualInterestRate", type=float)
+            ),
+            annual_appreciation_percent=(
+                request.args.get("annualAppreciationPercent", type=float) or 0.0
+            ),
+            region=(request.args.get("region") or "").strip() or None,
+            loan_term_years=request.args.get("loanTermYears", type=int) or 30,
+            from_date=(request.args.get("from") or "").strip() or None,
+            to_date=(request.args.get("to") or "").strip() or None,
+            step=(request.args.get("step") or "").strip().lower() or None,
+            include_windows=(request.args.get("windows") or "").strip().lower() in ("1", "true"),
+        )
+        return jsonify(out)
+    except ValueError as e:
+        status = 503 if "API key" in str(e) else 400
+        return jsonify({"error": str(e)}), status
+
+
+@compare_bp.route("/break-even", methods=["GET"])
+@cached(dated_policy("asOfDate"))
+def compare_break_even():
+    """
+    GET stock params (symbol, investedAmount, buyDate) and real estate params
+    (purchasePrice, downPaymentPercent, annualInterestRate, reBuyDate, asOfDate,
+    annualAppreciationPercent). Optional: granularity=daily|weekly|monthly|yearly
+    (default yearly), solveFor (comma-separated; default all of annualAppreciationPercent,
+    annualInterestRate, downPaymentPercent, stockAnnualReturnPercent), loanTermYears=30.
+    Returns { labels, stock: { gainLoss }, realEstate: { gainLoss }, breakEven: { target:
+    [...] }, asOf: {...} }; null where there is no break-even value.
+    """
+    symbol = (request.args.get("symbol") or "").strip().upper()
+    invested_amount = request.args.get("investedAmount", type=float)
+    stock_buy = (request.args.get("buyDate") or "").strip()
+    purchase_price = request.args.get("purchasePrice", type=float)
+    down_payment_percent = request.args.get("downPaymentPercent", type=float)
+    annual_interest_rate = request.args.get("annualInterestRate", type=float)
+    if (
+        not symbol
+        or invested_amount is None
+        or not stock_buy
+        or purchase_price is None
+        or purchase_price <= 0
+        or down_payment_percent is None
+        or annual_interest_rate is None
+    ):
+        return jsonify({
+            "error": (
+                "Provide stock params (symbol, investedAmount, buyDate) and real estate "
+                "params (purchasePrice, downPaymentPercent, annualInterestRate [, reBuyDate, "
+                "asOfDate])."
+            ),
+        }), 400
+    solve_for = (request.args.get("solveFor") or "").strip()
+    try:
+        out = break_even(
+            symbol=symbol,
+            invested_amount=invested_amount,
+            stock_buy=stock_buy,
+            purchase_price=purchase_price,
+            down_payment_percent=down_payment_percent,
+            annual_interest_rate=annual_interest_rate,
+            re_buy_date=(request.args.get("reBuyDate") or "").strip() or None,
+            as_of_date=(request.args.get("asOfDate") or "").strip() or None,
+            annual_appreciation_percent=(
+                request.args.get("annualAppreciationPercent", type=float) or 0.0
+            ),
+            loan_term_years=request.args.get("loanTermYears", type=int) or 30,
+            granularity=(request.args.get("granularity") or "yearly").strip().lower(),
+            targets=(
+                tuple(t.strip() for t in solve_for.split(",") if t.strip())
+                if solve_for else BREAK_EVEN_TARGETS
+            ),
+        )
+        return jsonify(out)
+    except ValueError as e:
+        status = 503 if "API key" in str(e) else 400
+        return jsonify({"error": str(e)}), status
+
+
+@compare_bp.route("/batch", methods=["POST"])
+def compare_batch():
+    """
+    POST JSON { scenarios: [{...}], grid: { param: [values] }, base: {...}, chunkSize }.
+    Scenario keys are the /api/compare params; grid is expanded as a cartesian product
+    over base. Streams NDJSON (application/x-ndjson):
+      { type: "header", count, columns: { stock: [...], realEstate: [...] } }
+      { type: "rows", offset, count, stock: { col: [...] }, realEstate: { col: [...] }, errors }
+      { type: "end", count, errorCount }
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object body"}), 400
+    try:
+        scenarios = expand_scenarios(body.get("scenarios"), body.get("grid"), body.get("base"))
+        chunk_size = int(body.get("chunkSize") or DEFAULT_CHUNK_SIZE)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    chunk_size = max(1, min(chunk_size, len(scenarios)))
+
+    def generate():
+        yield _ndjson({
+            "type": "header",
+            "count": len(scenarios),
+            "columns": {"stock": STOCK_COLUMNS, "realEstate": REAL_ESTATE_COLUMNS},
+        })
+        error_count = 0
+        for chunk in evaluate_batch(scenarios, chunk_size):
+            error_count += len(chunk["errors"])
+            yield _ndjson({"type": "rows", **chunk})
+        yield _ndjson({"type": "end", "count": len(scenarios), "errorCount": error_count})
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@compare_bp.route("/portfolio", methods=["POST"])
+def portfolio():
+    """
+    POST JSON { holdings: [{ symbol, weight }], investedAmount, buyDate, sellDate?,
+    rebalance: none|monthly|quarterly|yearly, contribution: { amount, frequency }?,
+    maxPoints?, plus optional real estate params (purchasePrice, downPaymentPercent,
+    annualInterestRate, reBuyDate, asOfDate, annualAppreciationPercent) }.
+    Returns { dates, portfolio: { values, contributed, holdings, summary },
+    realEstate: { values, summary } or null } on the merged trading calendar.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object body"}), 400
+    try:
+        holdings = body.get("holdings")
+        if not isinstance(holdings, list) or not all(isinstance(h, dict) for h in holdings):
+            raise ValueError("holdings must be a list of { symbol, weight }")
+        buy_date = str(body.get("buyDate") or "").strip()
+        if not buy_date:
+            raise ValueError("Missing buyDate (YYYY-MM-DD)")
+        contribution = body.get("contribution") or {}
+        if not isinstance(contribution, dict):
+            raise ValueError("contribution must be { amount, frequency }")
+        real_estate = None
+        if body.get("purchasePrice") is not None:
+            real_estate = {
+                "purchase_price": _real_estate_number(body, "purchasePrice"),
+                "down_payment_percent": _real_estate_number(body, "downPaymentPercent"),
+                "annual_interest_rate": _real_estate_number(body, "annualInterestRate"),
+                "buy_date": str(body.get("reBuyDate") or buy_date).strip(),
+                "as_of_date": str(body.get("asOfDate") or "").strip(),
+                "annual_appreciation_percent": float(body.get("annualAppreciationPercent") or 0),
+            }
+            if not real_estate["as_of_date"]:
+                raise ValueError("Real estate: missing asOfDate (YYYY-MM-DD)")
+        out = compare_portfolio(
+            holdings=holdings,
+            invested_amount=float(body.get("investedAmount") or 0),
+            buy_date=buy_date,
+            sell_date=str(body.get("sellDate") or "").strip() or None,
+            rebalance=str(body.get("rebalance") or "none").strip().lower(),
+            contribution_amount=float(contribution.get("amount") or 0),
+            contribution_frequency=str(contribution.get("frequency") or "monthly").strip().lower(),
+            real_estate=real_estate,
+            max_points=int(body.get("maxPoints") or 1000),
+        )
+        return jsonify(out)
+    except (TypeError, ValueError) as e:
+        status = 503 if "API key" in str(e) else 400
+        return jsonify({"error": str(e)}), status
+
+
+def _real_estate_number(body: dict, name: str) -> float:
+    try:
+        return float(body[name])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Real estate: missing or invalid {name} (number)") from None
+
+
+def _ndjson(obj: dict) -> str:
+    return json.dumps(obj, separators=(",", ":")) + "\n"
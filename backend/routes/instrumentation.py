@@ -0,0 +1,39 @@
+"""
+Request instrumentation: collects the timing spans of each request, sends them in a
+Server-Timing header and records them in the metrics histograms. JSON response
+encoding is timed as the "encode" span. Nothing is installed when METRICS_ENABLED=0.
+"""
+
+import time
+
+from flask import Flask, g, request
+from flask.json.provider import DefaultJSONProvider
+
+from backend.services import metrics
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs) -> str:
+        with metrics.span("encode"):
+            return super().dumps(obj, **kwargs)
+
+
+def init_app(app: Flask) -> None:
+    if not metrics.enabled():
+        return
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_spans():
+        g.metrics_token = metrics.begin_request()
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def finish_spans(response):
+        token = g.pop("metrics_token", None)
+        if token is None:
+            return response
+        total = time.perf_counter() - g.pop("metrics_start")
+        spans = metrics.end_request(token, request.endpoint or "unmatched", total)
+        response.headers["Server-Timing"] = metrics.server_timing(spans, total)
+        return response
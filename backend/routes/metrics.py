@@ -0,0 +1,158 @@
+"""
+Metrics API: counters for upstream data fetching, remaining upstream quota and caches,
+and everything together (plus timing histograms) in Prometheus text format.
+"""
+
+from flask import Blueprint, Response, jsonify
+
+from backend.services import http_client, metrics, shared_series, warmer
+from backend.services.alpha_vantage import get_fetch_stats
+from backend.services.avm_cache import cache as avm_cache
+from backend.services.response_cache import cache as response_cache
+from backend.services.upstream import scheduler
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("", methods=["GET"])
+def prometheus():
+    """
+    GET. Prometheus text exposition: span and request duration histograms, cache hit
+    rates (response cache, RentCast AVM cache, coalesced stock loads), upstream HTTP
+    counters and remaining upstream quota.
+    """
+    lines = metrics.render_histograms()
+
+    caches = {"response": response_cache.stats(), "avm": avm_cache.stats()}
+    lines += metrics.format_family(
+        "cache_hits_total", "counter", "Cache hits.",
+        [({"cache": "response"}, caches["response"]["hits"]),
+         ({"cache": "avm"}, caches["avm"]["hits"] + caches["avm"]["negativeHits"])],
+    )
+    lines += metrics.format_family(
+        "cache_misses_total", "counter", "Cache misses.",
+        [({"cache": name}, stats["misses"]) for name, stats in caches.items()],
+    )
+    lines += metrics.format_family(
+        "cache_hit_ratio", "gauge", "Cache hits / lookups since start.",
+        [({"cache": name}, stats["hitRate"]) for name, stats in caches.items()],
+    )
+    lines += metrics.format_family(
+        "cache_evictions_total", "counter", "Cache entries evicted.",
+        [({"cache": name}, stats["evictions"]) for name, stats in caches.items()],
+    )
+    lines += metrics.format_family(
+        "response_cache_not_modified_total", "counter", "304 answers to If-None-Match.",
+        [({}, caches["response"]["notModified"])],
+    )
+
+    flights = get_fetch_stats()
+    lines += metrics.format_family(
+        "series_loads_total", "counter",
+        "Stock series loads: executed, or coalesced onto an in-flight load.",
+        [({"result": "executed"}, flights["executed"]),
+         ({"result": "coalesced"}, flights["coalesced"])],
+    )
+
+    shared = shared_series.stats()
+    lines += metrics.format_family(
+        "shared_series_symbols", "gauge", "Symbols in the cross-process series file.",
+        [({}, shared["symbols"])],
+    )
+    lines += metrics.format_family(
+        "shared_series_bytes", "gauge", "Cross-process series file bytes used / capacity.",
+        [({"kind": "used"}, shared["usedBytes"]),
+         ({"kind": "capacity"}, shared["capacityBytes"])],
+    )
+
+    http = http_client.get_stats()
+    lines += metrics.format_family(
+        "upstream_http_requests_total", "counter", "Upstream HTTP calls.",
+        [({"provider": name}, agg["calls"]) for name, agg in http.items()],
+    )
+    lines += metrics.format_family(
+        "upstream_http_bytes_total", "counter", "Upstream response bytes.",
+        [({"provider": name}, agg["bytes"]) for name, agg in http.items()],
+    )
+
+    quotas = scheduler.quota()
+    lines += metrics.format_family(
+        "upstream_quota_remaining", "gauge", "Requests available now (tightest limit).",
+        [({"provider": name}, q["remaining"]) for name, q in quotas.items()],
+    )
+    lines += metrics.format_family(
+        "upstream_quota_limit", "gauge", "Request limit per period.",
+        [({"provider": name, "period_seconds": f"{b['periodSeconds']:.0f}"}, b["limit"])
+         for name, q in quotas.items() for b in q["limits"]],
+    )
+    lines += metrics.format_family(
+        "upstream_queued", "gauge", "Requests waiting for an upstream token.",
+        [({"provider": name, "priority": pr}, n)
+         for name, q in quotas.items() for pr, n in q["queued"].items()],
+    )
+    for counter, help_text in (
+        ("calls", "Upstream tokens granted."),
+        ("retried", "Upstream calls sent again after a transient failure."),
+        ("throttled", "Upstream answers reporting a rate limit."),
+        ("rejected", "Requests that could not get an upstream token in time."),
+    ):
+        lines += metrics.format_family(
+            f"upstream_{counter}_total", "counter", help_text,
+            [({"provider": name}, q[counter]) for name, q in quotas.items()],
+        )
+
+    return Response("\n".join(lines) + "\n", content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@metrics_bp.route("/upstream", methods=["GET"])
+def upstream():
+    """
+    GET. Returns { alphaVantage: { inFlight, executed, coalesced }, sharedSeries:
+    { enabled, path, symbols, usedBytes, capacityBytes, hits, misses, published,
+    compactions }, http: { provider: { calls, bytes, waitMs, transferMs, parseMs } } }
+    where coalesced is the number of stock series loads saved by sharing an in-flight
+    fetch, sharedSeries describes the cross-process series file and http holds
+    cumulative download timings.
+    """
+    return jsonify({
+        "alphaVantage": get_fetch_stats(),
+        "sharedSeries": shared_series.stats(),
+        "http": http_client.get_stats(),
+    })
+
+
+@metrics_bp.route("/quota", methods=["GET"])
+def quota():
+    """
+    GET. Per upstream provider (alphaVantage, rentcast): token buckets
+    { limit, periodSeconds, remaining, nextTokenInSeconds }, overall remaining,
+    queued requests by priority, and calls / throttled / rejected counters.
+    """
+    return jsonify(scheduler.quota())
+
+
+@metrics_bp.route("/avm-cache", methods=["GET"])
+def avm_cache_stats():
+    """GET. RentCast AVM cache { hits, negativeHits, misses, hitRate, evictions, memoryEntries }."""
+    return jsonify(avm_cache.stats())
+
+
+@metrics_bp.route("/response-cache", methods=["GET"])
+def response_cache_stats():
+    """
+    GET. API response cache { entries, bytes, hits, misses, hitRate, notModified,
+    evictions, invalidations }.
+    """
+    return jsonify(response_cache.stats())
+
+
+@metrics_bp.route("/warmer", methods=["GET"])
+def warmer_status():
+    """
+    GET. Cache warmer of the answering process { running, leader, lastRunAt, nextRunAt,
+    lastResult: { refreshed, loaded, skipped, failed } }; leader is true for the one
+    process that downloads.
+    """
+    return jsonify(warmer.status())
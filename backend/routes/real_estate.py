@@ -1,28 +1,50 @@
 """
-Real estate API routes: value by address (RentCast), hypothetical return (mortgage + equity).
+Real estate API routes: value by address (RentCast), hypothetical return (mortgage + equity),
+monthly cash-flow ledger, parameter sweep (rate x down payment x appreciation grid),
+regions of the historical home price dataset.
 """
 
 from flask import Blueprint, request, jsonify
 
-from backend.services.real_estate import compute_hypothetical_real_estate
+from backend.routes.caching import cached, immutable_policy, regional_policy
+from backend.services import cash_flow, regional_data
+from backend.services.real_estate import (
+    compute_hypothetical_real_estate,
+    parse_date,
+    round_to,
+)
 from backend.services.rentcast import get_value_by_address
+from backend.services.sweep import encode_values, frange, sweep_real_estate
 
 real_estate_bp = Blueprint(
     "real_estate", __name__, url_prefix="/api/real-estate"
 )
 
 
+def interest_rate_arg(args, buy_date: str) -> float | None:
+    """
+    annualInterestRate as a number; "historical" means the 30-year fixed rate of the
+    buy month from the regional dataset (None while buy_date is missing).
+    """
+    if (args.get("annualInterestRate") or "").strip().lower() == "historical":
+        return regional_data.mortgage_rate(parse_date(buy_date)) if buy_date else None
+    return args.get("annualInterestRate", type=float)
+
+
 @real_estate_bp.route("/hypothetical", methods=["GET"])
+@cached(regional_policy(immutable_policy))
 def hypothetical():
     """
     GET ?purchasePrice=&downPaymentPercent=&annualInterestRate=&buyDate=&asOfDate=
-    Optional: annualAppreciationPercent=0, loanTermYears=30
+    Optional: annualAppreciationPercent=0, loanTermYears=30, region (historical home
+    prices of e.g. CA or "San Francisco, CA"); annualInterestRate=historical uses the
+    30-year fixed rate of the buy month.
     """
     try:
         purchase_price = request.args.get("purchasePrice", type=float)
         down_payment_percent = request.args.get("downPaymentPercent", type=float)
-        annual_interest_rate = request.args.get("annualInterestRate", type=float)
         buy_date = (request.args.get("buyDate") or "").strip()
+        annual_interest_rate = interest_rate_arg(request.args, buy_date)
         as_of_date = (request.args.get("asOfDate") or "").strip()
         annual_appreciation = request.args.get(
             "annualAppreciationPercent", type=float
@@ -53,12 +75,154 @@ def hypothetical():
             as_of_date=as_of_date,
             annual_appreciation_percent=annual_appreciation,
             loan_term_years=loan_term_years,
+            region=(request.args.get("region") or "").strip() or None,
+        )
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def cash_flow_args(args) -> dict | None:
+    """ledger() keyword arguments from the cash-flow query params given, or None if none are."""
+    out = {}
+    for name, keyword in cash_flow.PARAMS.items():
+        if (args.get(name) or "").strip():
+            value = args.get(name, type=float)
+            if value is None:
+                raise ValueError(f"Invalid {name}")
+            out[keyword] = value
+    return out or None
+
+
+@real_estate_bp.route("/cash-flow", methods=["GET"])
+@cached(regional_policy(immutable_policy))
+def cash_flow_ledger():
+    """
+    GET ?purchasePrice=&downPaymentPercent=&annualInterestRate=&buyDate=&asOfDate=
+    Optional: annualAppreciationPercent, loanTermYears=30, closingCostPercent,
+    sellingCostPercent, propertyTaxPercent, insuranceAnnual, hoaMonthly,
+    maintenancePercent, monthlyRent, rentGrowthPercent, vacancyPercent,
+    expenseGrowthPercent, discountRatePercent (all default 0), ledger=monthly|yearly|none,
+    region and annualInterestRate=historical as for /hypothetical.
+    Returns { summary: { irrPercent, npv, cashOnCashPercent, netWorth, ... },
+    ledger: { granularity, labels, columns } or null }.
+    """
+    try:
+        purchase_price = request.args.get("purchasePrice", type=float)
+        down_payment_percent = request.args.get("downPaymentPercent", type=float)
+        buy_date = (request.args.get("buyDate") or "").strip()
+        annual_interest_rate = interest_rate_arg(request.args, buy_date)
+        as_of_date = (request.args.get("asOfDate") or "").strip()
+        if (
+            purchase_price is None
+            or purchase_price <= 0
+            or down_payment_percent is None
+            or annual_interest_rate is None
+            or not buy_date
+            or not as_of_date
+        ):
+            return jsonify({
+                "error": (
+                    "Missing or invalid: purchasePrice (positive), "
+                    "downPaymentPercent, annualInterestRate, buyDate (YYYY-MM-DD), "
+                    "asOfDate (YYYY-MM-DD)"
+                ),
+            }), 400
+        result = cash_flow.cash_flow_ledger(
+            ledger_mode=(request.args.get("ledger") or "monthly").strip().lower(),
+            purchase_price=purchase_price,
+            down_payment_percent=down_payment_percent,
+            annual_interest_rate=annual_interest_rate,
+            buy_date=buy_date,
+            as_of_date=as_of_date,
+            annual_appreciation_percent=request.args.get(
+                "annualAppreciationPercent", type=float
+            ) or 0.0,
+            loan_term_years=request.args.get("loanTermYears", type=int) or 30,
+            region=(request.args.get("region") or "").strip() or None,
+            **(cash_flow_args(request.args) or {}),
         )
         return jsonify(result)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
 
+def _sweep_axis(prefix: str, fixed_key: str) -> list[float]:
+    """Axis values from {prefix}Min/{prefix}Max/{prefix}Step, or the single fixed_key value."""
+    lo = request.args.get(f"{prefix}Min", type=float)
+    if lo is None:
+        fixed = request.args.get(fixed_key, type=float)
+        if fixed is None:
+            raise ValueError(f"Provide {prefix}Min/{prefix}Max/{prefix}Step or {fixed_key}")
+        return [fixed]
+    hi = request.args.get(f"{prefix}Max", type=float)
+    step = request.args.get(f"{prefix}Step", type=float)
+    if hi is None or step is None:
+        raise ValueError(f"Provide {prefix}Max and {prefix}Step with {prefix}Min")
+    return frange(lo, hi, step)
+
+
+@real_estate_bp.route("/sweep", methods=["GET"])
+@cached(immutable_policy)
+def sweep():
+    """
+    GET ?purchasePrice=&buyDate=&asOfDate= plus, for each axis, a range
+    (rateMin/rateMax/rateStep, downMin/downMax/downStep, appreciationMin/appreciationMax/
+    appreciationStep) or a fixed value (annualInterestRate, downPaymentPercent,
+    annualAppreciationPercent). Optional: metric=equity|gainLossPercent,
+    encoding=json|float32, loanTermYears=30.
+    Returns axes, shape [rates, downs, appreciations] and row-major values.
+    """
+    try:
+        purchase_price = request.args.get("purchasePrice", type=float)
+        buy_date = (request.args.get("buyDate") or "").strip()
+        as_of_date = (request.args.get("asOfDate") or "").strip()
+        if purchase_price is None or purchase_price <= 0 or not buy_date or not as_of_date:
+            return jsonify({
+                "error": (
+                    "Missing or invalid: purchasePrice (positive), buyDate (YYYY-MM-DD), "
+                    "asOfDate (YYYY-MM-DD)"
+                ),
+            }), 400
+        result = sweep_real_estate(
+            purchase_price=purchase_price,
+            buy_date=buy_date,
+            as_of_date=as_of_date,
+            rates=_sweep_axis("rate", "annualInterestRate"),
+            down_payments=_sweep_axis("down", "downPaymentPercent"),
+            appreciations=_sweep_axis("appreciation", "annualAppreciationPercent"),
+            metric=(request.args.get("metric") or "equity").strip(),
+            loan_term_years=request.args.get("loanTermYears", type=int) or 30,
+        )
+        result.update(encode_values(
+            result["values"], (request.args.get("encoding") or "json").strip().lower()
+        ))
+        result["min"] = round_to(result["min"], 2)
+        result["max"] = round_to(result["max"], 2)
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@real_estate_bp.route("/regions", methods=["GET"])
+def regions():
+    """
+    GET regions with a historical home price index in the regional dataset.
+    Returns { regions: ["CA", "CA/SAN FRANCISCO", ...], from, through (YYYY-MM),
+    mortgageRates (whether annualInterestRate=historical is available) }.
+    """
+    try:
+        data = regional_data.get_dataset()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "regions": data.hpi_regions(),
+        "from": regional_data.month_label(data.first_month),
+        "through": regional_data.month_label(data.first_month + data.months - 1),
+        "mortgageRates": regional_data.MORTGAGE_RATE_KEY in data.rows,
+    })
+
+
 @real_estate_bp.route("/value", methods=["GET"])
 def value_by_address():
     """
@@ -4,13 +4,15 @@ Stock API routes: hypothetical return and historical series.
 
 from flask import Blueprint, request, jsonify
 
+from backend.routes.caching import cached, stock_policy
 from backend.services.returns import compute_hypothetical_return
-from backend.services.alpha_vantage import get_daily_adjusted
+from backend.services.alpha_vantage import get_daily_adjusted, slice_range
 
 stock_bp = Blueprint("stock", __name__, url_prefix="/api/stock")
 
 
 @stock_bp.route("/hypothetical-return", methods=["GET"])
+@cached(stock_policy("sellDate"))
 def hypothetical_return():
     """GET ?symbol=&investedAmount=&buyDate=&sellDate= (optional)."""
     try:
@@ -35,6 +37,7 @@ def hypothetical_return():
 
 
 @stock_bp.route("/historical", methods=["GET"])
+@cached(stock_policy("to"))
 def historical():
     """GET ?symbol=&from=&to= (optional). Returns daily adjusted close for range."""
     try:
@@ -44,25 +47,8 @@ def historical():
         if not symbol:
             return jsonify({"error": "Missing symbol"}), 400
         series = get_daily_adjusted(symbol, "full")
-        dates = series["dates"]
-        closes = series["closes"]
-        start_idx = 0
-        end_idx = len(dates) - 1
-        if from_date:
-            for i, d in enumerate(dates):
-                if d >= from_date:
-                    start_idx = i
-                    break
-        if to_date:
-            for i, d in enumerate(dates):
-                if d > to_date:
-                    end_idx = i - 1
-                    break
-            else:
-                end_idx = len(dates) - 1
-        out_dates = dates[start_idx : end_idx + 1]
-        out_closes = closes[start_idx : end_idx + 1]
-        return jsonify({"symbol": series["symbol"], "dates": out_dates, "closes": out_closes})
+        out_dates, out_closes = slice_range(series, from_date, to_date)
+        return jsonify({"symbol": series.symbol, "dates": out_dates, "closes": out_closes})
     except ValueError as e:
         status = 503 if "API key" in str(e) else 400
         return jsonify({"error": str(e)}), status
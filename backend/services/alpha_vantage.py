@@ -1,12 +1,58 @@
 """
 Alpha Vantage API client for historical stock data.
 Free tier: 25 requests/day, 5/minute. Get key at https://www.alphavantage.co/support/#api-key
+
+Series are kept in a local store (see series_store): the first request for a symbol
+downloads the full history, later requests are served from disk and only refreshed
+with outputsize=compact once they are older than SERIES_MAX_AGE_HOURS.
+
+Downloads go through the PriceSource named by PRICE_SOURCE: Alpha Vantage by default,
+or local CSV / Parquet files (see price_sources).
+
+With several app processes, series live once in a memory-mapped file they all read
+(see shared_series): each process's memory holds views into it rather than copies, and
+a symbol is loaded or downloaded by one process at a time.
 """
 
 import os
+import threading
+import time
+from datetime import date
+
+import numpy as np
 import requests
 
-BASE_URL = "https://www.alphavantage.co/query"
+from backend.services import (
+    http_client,
+    metrics,
+    popularity,
+    price_sources,
+    series_store,
+    shared_series,
+)
+from backend.services.daily_series_parser import DailySeriesParser
+from backend.services.price_series import PriceSeries
+from backend.services.price_sources import PriceSource
+from backend.services.singleflight import SingleFlight
+from backend.services.upstream import BACKGROUND, INTERACTIVE, scheduler
+
+BASE_URL = os.environ.get("ALPHA_VANTAGE_BASE_URL") or "https://www.alphavantage.co/query"
+DEFAULT_MAX_AGE_HOURS = 12.0
+
+# symbol -> series as returned by get_daily_adjusted
+_memory: dict[str, PriceSeries] = {}
+_memory_lock = threading.Lock()
+
+# Called with the symbol whenever a different copy of its series is loaded into memory
+# (download, compact refresh, or a newer copy written to the store by another process)
+_refresh_listeners: list = []
+
+_source: PriceSource | None = None
+_source_lock = threading.Lock()
+
+# Concurrent requests for the same symbol (e.g. /api/compare and /api/compare/time-series
+# from one Compare click) share a single load/download.
+_flight = SingleFlight()
 
 
 def get_api_key() -> str:
@@ -19,10 +65,28 @@ def get_api_key() -> str:
     return key
 
 
-def get_daily_adjusted(symbol: str, outputsize: str = "full") -> dict:
+def _max_age_seconds() -> float:
+    hours = os.environ.get("SERIES_MAX_AGE_HOURS")
+    try:
+        return float(hours) * 3600 if hours else DEFAULT_MAX_AGE_HOURS * 3600
+    except ValueError:
+        return DEFAULT_MAX_AGE_HOURS * 3600
+
+
+def _is_fresh(series: PriceSeries, refreshed_after: float = 0.0) -> bool:
+    refreshed_at = series.refreshed_at
+    return refreshed_at >= refreshed_after and time.time() - refreshed_at < _max_age_seconds()
+
+
+def _fetch_daily_adjusted(
+    symbol: str, outputsize: str, priority: int = INTERACTIVE, stop_at: int | None = None
+) -> PriceSeries:
     """
-    Fetch daily adjusted time series (split/dividend adjusted) for a symbol.
-    Returns dict with keys: symbol, dates (list[str]), closes (list[float]).
+    Download one TIME_SERIES_DAILY_ADJUSTED payload as a PriceSeries with the adjusted
+    close plus raw open / high / low / volume / dividend columns.
+    Waits for an Alpha Vantage token from the upstream scheduler first, then downloads
+    through the shared pooled session, parsing the body as it arrives. With stop_at
+    (ordinal day) the download ends at the first day on or before it.
     """
     api_key = get_api_key()
     params = {
@@ -31,25 +95,267 @@ def get_daily_adjusted(symbol: str, outputsize: str = "full") -> dict:
         "outputsize": outputsize,
         "apikey": api_key,
     }
-    resp = requests.get(BASE_URL, params=params, timeout=30)
+    parsers: list[DailySeriesParser] = []
+
+    def download() -> http_client.UpstreamResponse:
+        # A retried download starts over with a fresh parser
+        parsers.append(DailySeriesParser(stop_at=stop_at))
+        return http_client.get_streaming("alphaVantage", BASE_URL, parsers[-1].feed, params=params)
+
+    resp = scheduler.call("alphaVantage", download, priority=priority)
+    parser = parsers[-1]
     resp.raise_for_status()
-    data = resp.json()
-    meta = data.get("Meta Data")
-    series = data.get("Time Series (Daily)")
-    if not series:
-        note = data.get("Note") or data.get("Error Message") or "Unknown error"
+    series = parser.series(symbol.upper())
+    if series is None:
+        data = parser.error()
+        # "Note" / "Information" is how Alpha Vantage reports going over a limit
+        throttle = data.get("Note") or data.get("Information")
+        if throttle:
+            scheduler.report_throttled("alphaVantage")
+        note = throttle or data.get("Error Message") or "Unknown error"
         raise ValueError(note)
-    dates = sorted(series.keys())
-    closes = [float(series[d]["5. adjusted close"]) for d in dates]
-    return {"symbol": meta["2. Symbol"], "dates": dates, "closes": closes}
-
-
-def get_price_on_or_before(series: dict, target_date: str) -> dict | None:
-    """Get closing price on or nearest before target_date (YYYY-MM-DD)."""
-    dates = series["dates"]
-    closes = series["closes"]
-    # Want latest date <= target_date (nearest trading day on or before)
-    for i in range(len(dates) - 1, -1, -1):
-        if dates[i] <= target_date:
-            return {"date": dates[i], "close": closes[i]}
-    return None
+    return series
+
+
+class AlphaVantageSource(PriceSource):
+    """TIME_SERIES_DAILY_ADJUSTED downloads, rate limited by the upstream scheduler."""
+
+    name = "alphavantage"
+    incremental = True
+
+    def fetch(
+        self,
+        symbol: str,
+        outputsize: str = "full",
+        priority: int = INTERACTIVE,
+        stop_at: int | None = None,
+    ) -> PriceSeries:
+        return _fetch_daily_adjusted(symbol, outputsize, priority, stop_at)
+
+
+def get_source() -> PriceSource:
+    """The configured PriceSource (PRICE_SOURCE, default alphavantage), created once."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            name = (os.environ.get("PRICE_SOURCE") or "alphavantage").strip().lower()
+            if name == AlphaVantageSource.name:
+                _source = AlphaVantageSource()
+            elif name in price_sources.FILE_SOURCES:
+                _source = price_sources.FILE_SOURCES[name](os.environ.get("PRICE_SOURCE_PATH") or "")
+            else:
+                choices = ", ".join([AlphaVantageSource.name, *price_sources.FILE_SOURCES])
+                raise ValueError(f"PRICE_SOURCE must be one of {choices}")
+        return _source
+
+
+def set_source(source: PriceSource | None) -> None:
+    """Use source for downloads from now on (None: back to PRICE_SOURCE)."""
+    global _source
+    with _source_lock:
+        _source = source
+
+
+def add_refresh_listener(fn) -> None:
+    """Register fn(symbol) to be called when a symbol's series in memory is replaced."""
+    _refresh_listeners.append(fn)
+
+
+def _remember(key: str, series: PriceSeries) -> PriceSeries:
+    with _memory_lock:
+        previous = _memory.get(key)
+        _memory[key] = series
+    if previous is not None and previous.refreshed_at != series.refreshed_at:
+        for fn in _refresh_listeners:
+            fn(key)
+    return series
+
+
+def _publish(key: str, series: PriceSeries) -> PriceSeries:
+    """Remember the shared copy of series (series itself if it cannot be shared)."""
+    try:
+        series = shared_series.put(key, series)
+    except (OSError, ValueError):
+        pass
+    return _remember(key, series)
+
+
+def _usable(series: PriceSeries | None, outputsize: str, refreshed_after: float) -> bool:
+    return (
+        series is not None
+        and _is_fresh(series, refreshed_after)
+        and (series.has_full or outputsize != "full")
+    )
+
+
+def get_daily_adjusted(
+    symbol: str, outputsize: str = "full", priority: int = INTERACTIVE
+) -> PriceSeries:
+    """
+    Fetch daily adjusted time series (split/dividend adjusted) for a symbol: a
+    PriceSeries of ordinal dates and adjusted closes.
+
+    Served from memory or the local store when fresh. A symbol never seen before (or only
+    ever pulled compact, when full is requested) costs one full download; a stale one
+    costs one compact download that is merged into the stored history. Concurrent
+    callers for the same symbol share one load. priority (upstream.INTERACTIVE or
+    BACKGROUND) orders any download in the upstream scheduler queue; interactive calls
+    are counted as requests for the symbol (see popularity).
+    """
+    key = symbol.upper()
+    if priority == INTERACTIVE:
+        popularity.record(key)
+    cached = _memory.get(key)
+    if cached and _is_fresh(cached):
+        return cached
+    return _flight.do(
+        f"{key}:{outputsize}", lambda: _load_daily_adjusted(key, outputsize, priority)
+    )
+
+
+def refresh_daily_adjusted(
+    symbol: str, refreshed_after: float, priority: int = BACKGROUND
+) -> PriceSeries:
+    """
+    get_daily_adjusted(symbol, "full") that also treats a series refreshed before
+    refreshed_after (epoch seconds) as stale, e.g. to pick up today's close after the
+    market closed. Costs at most one download; if that fails the stored series is
+    returned unchanged (check its refreshed_at).
+    """
+    key = symbol.upper()
+    return _flight.do(
+        f"{key}:full", lambda: _load_daily_adjusted(key, "full", priority, refreshed_after)
+    )
+
+
+def preload(symbol: str) -> bool:
+    """
+    Load symbol's shared or stored series (whichever is newer) into memory, parsed and
+    indexed, without any download. Returns False if the symbol is in neither.
+    """
+    key = symbol.upper()
+    stored = series_store.get_refreshed_at(key)
+    shared = shared_series.get(key)
+    if stored is None and shared is None:
+        return False
+    cached = _memory.get(key)
+    if shared is not None and (stored is None or shared.refreshed_at >= stored[0]):
+        if cached is None or cached.refreshed_at < shared.refreshed_at:
+            _remember(key, shared)
+        return True
+    if cached is None or cached.refreshed_at < stored[0]:
+        series = series_store.load_series(key)
+        if series is None:
+            return False
+        _publish(key, series)
+    return True
+
+
+def get_fetch_stats() -> dict:
+    """Single-flight counters: loads executed vs. callers that shared an in-flight load."""
+    return _flight.stats()
+
+
+def _load_daily_adjusted(
+    key: str, outputsize: str, priority: int, refreshed_after: float = 0.0
+) -> PriceSeries:
+    # Another flight may have refreshed the symbol while this caller was queued.
+    cached = _memory.get(key)
+    if cached and _is_fresh(cached, refreshed_after):
+        return cached
+    shared = shared_series.get(key)
+    if _usable(shared, outputsize, refreshed_after):
+        return _remember(key, shared)
+    with shared_series.writing(key):
+        # ... or another process, while this one waited for the symbol
+        shared = shared_series.get(key)
+        if _usable(shared, outputsize, refreshed_after):
+            return _remember(key, shared)
+        return _load_stored_or_download(key, outputsize, priority, refreshed_after)
+
+
+def _load_stored_or_download(
+    key: str, outputsize: str, priority: int, refreshed_after: float
+) -> PriceSeries:
+    stored = series_store.load_series(key)
+    if _usable(stored, outputsize, refreshed_after):
+        return _publish(key, stored)
+
+    source = get_source()
+    if not source.incremental:
+        # Whole-history source (local files): re-read, keep the stored copy if that fails
+        try:
+            fetched = source.fetch(key, "full", priority)
+        except ValueError:
+            if stored is None:
+                raise
+            return _publish(key, stored)
+        series_store.save_series(key, fetched, full=True)
+    elif stored is None or (outputsize == "full" and not stored.has_full):
+        fetched = source.fetch(key, outputsize, priority)
+        series_store.save_series(key, fetched, full=outputsize == "full")
+    else:
+        try:
+            # Newest first: stop at the last stored day (kept as the overlap for rescaling)
+            fetched = source.fetch(key, "compact", priority, stop_at=stored.ordinals[-1])
+        except (ValueError, requests.RequestException):
+            # Out of quota or upstream down: stale history beats no answer.
+            return _publish(key, stored)
+        if len(fetched) and fetched.ordinals[0] > stored.ordinals[-1]:
+            # The compact window starts after the last stored day: merging would leave a
+            # gap (and miss any re-basing inside it), so replace the whole history.
+            try:
+                fetched = source.fetch(key, "full", priority)
+            except (ValueError, requests.RequestException):
+                return _publish(key, stored)
+            series_store.save_series(key, fetched, full=True)
+        else:
+            series_store.save_series(key, fetched, full=False)
+
+    return _publish(key, series_store.load_series(key))
+
+
+def to_ordinal(date_str: str) -> int:
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date {date_str!r}, expected YYYY-MM-DD") from None
+
+
+def get_price_on_or_before(series: PriceSeries, target_date: str) -> dict | None:
+    """Get closing price on or nearest before target_date (YYYY-MM-DD). O(log n)."""
+    i = series.index_on_or_before(to_ordinal(target_date))
+    if i < 0:
+        return None
+    return {"date": series.date_at(i), "close": series.closes[i]}
+
+
+def get_prices_on_or_before(
+    series: PriceSeries, target_dates: list[str]
+) -> list[dict | None]:
+    """
+    Batch get_price_on_or_before: one result (or None) per target date, in input order.
+    All dates are located with one searchsorted over the series' ordinals.
+    """
+    with metrics.span("lookup"):
+        targets = np.fromiter(
+            (to_ordinal(t) for t in target_dates), dtype=np.int64, count=len(target_dates)
+        )
+        rows = np.searchsorted(np.asarray(series.ordinals), targets, side="right") - 1
+        closes = series.closes
+        return [
+            {"date": series.date_at(i), "close": closes[i]} if i >= 0 else None
+            for i in rows.tolist()
+        ]
+
+
+def slice_range(
+    series: PriceSeries, from_date: str | None = None, to_date: str | None = None
+) -> tuple[list[str], list[float]]:
+    """Return (dates, closes) with from_date <= date <= to_date (either bound optional). O(log n)."""
+    with metrics.span("lookup"):
+        start, end = series.index_range(
+            to_ordinal(from_date) if from_date else None,
+            to_ordinal(to_date) if to_date else None,
+        )
+        return series.dates(start, end), series.closes[start:end].tolist()
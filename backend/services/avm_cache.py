@@ -0,0 +1,216 @@
+"""
+Persistent cache for RentCast AVM responses, keyed on a normalized address.
+
+"123 Main St" and "123 main street," map to the same key, so repeat lookups cost no
+RentCast quota (50 requests/month). Entries live in an in-memory LRU backed by SQLite,
+expire after AVM_CACHE_TTL_DAYS, and "address not found" answers are cached too
+(negative entries, AVM_CACHE_NEGATIVE_TTL_DAYS).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from backend.services.sqlite_pool import ConnectionPool
+
+DEFAULT_PATH = os.path.join("data", "avm_cache.sqlite3")
+DEFAULT_TTL_DAYS = 30.0
+DEFAULT_NEGATIVE_TTL_DAYS = 7.0
+DEFAULT_MAX_ENTRIES = 5000
+# Memory hits are written back to accessed_at on disk at most this often (batched)
+TOUCH_FLUSH_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS avm (
+    key TEXT PRIMARY KEY,
+    payload TEXT,
+    error TEXT,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS avm_accessed ON avm (accessed_at);
+"""
+
+# USPS street suffix and unit abbreviations (street line only)
+_STREET_WORDS = {
+    "STREET": "ST", "STR": "ST", "AVENUE": "AVE", "AV": "AVE", "ROAD": "RD",
+    "DRIVE": "DR", "BOULEVARD": "BLVD", "LANE": "LN", "COURT": "CT", "PLACE": "PL",
+    "TERRACE": "TER", "PARKWAY": "PKWY", "HIGHWAY": "HWY", "CIRCLE": "CIR",
+    "SQUARE": "SQ", "TRAIL": "TRL", "EXPRESSWAY": "EXPY",
+    "FREEWAY": "FWY", "ALLEY": "ALY", "CROSSING": "XING",
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+    "APARTMENT": "APT", "SUITE": "STE", "FLOOR": "FL", "BUILDING": "BLDG",
+}
+_PUNCTUATION = re.compile(r"[.#'\"]")
+_ZIP = re.compile(r"^(\d{5})(?:-?\d{4})?$")
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical cache key: upper case, punctuation and commas dropped, whitespace
+    collapsed, street suffixes / directionals / unit words in the street line abbreviated,
+    ZIP+4 reduced to the 5-digit ZIP.
+    """
+    parts = []
+    for i, raw in enumerate(address.upper().split(",")):
+        words = _PUNCTUATION.sub(" ", raw).split()
+        if not words:
+            continue
+        if i == 0:
+            words = [_STREET_WORDS.get(w, w) for w in words]
+        words = [_ZIP.sub(r"\1", w) for w in words]
+        parts.append(" ".join(words))
+    return " ".join(parts)
+
+
+def _ttl_seconds(name: str, default_days: float) -> float:
+    try:
+        return float(os.environ.get(name) or default_days) * 86400
+    except ValueError:
+        return default_days * 86400
+
+
+def _max_entries() -> int:
+    try:
+        return int(os.environ.get("AVM_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES)
+    except ValueError:
+        return DEFAULT_MAX_ENTRIES
+
+
+def _setup(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+
+
+class AvmCache:
+    """In-memory LRU in front of a SQLite table; both bounded to AVM_CACHE_MAX_ENTRIES."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, dict | None, str | None]] = OrderedDict()
+        self._pool = ConnectionPool(
+            lambda: os.environ.get("AVM_CACHE_PATH") or DEFAULT_PATH, _setup
+        )
+        # key -> last memory hit not yet written to accessed_at
+        self._touched: dict[str, float] = {}
+        self._touch_flushed_at = time.time()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, entry: tuple[float, dict | None, str | None]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > _max_entries():
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str) -> tuple[dict | None, str | None] | None:
+        """
+        Return (payload, None) for a cached value, (None, error) for a cached
+        "not found", or None on a miss / expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._count(entry)
+                    self._touched[key] = now
+                    flush = now - self._touch_flushed_at >= TOUCH_FLUSH_SECONDS
+                else:
+                    del self._memory[key]
+                    entry = None
+        if entry is not None:
+            if flush:
+                with self._pool.connection() as conn, conn:
+                    self._flush_touches(conn)
+            return entry[1], entry[2]
+
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT payload, error, expires_at FROM avm WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                with self._lock:
+                    self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE avm SET accessed_at = ? WHERE key = ?", (now, key))
+        entry = (row[2], json.loads(row[0]) if row[0] else None, row[1])
+        self._remember(key, entry)
+        with self._lock:
+            self._count(entry)
+        return entry[1], entry[2]
+
+    def _flush_touches(self, conn: sqlite3.Connection) -> None:
+        """Write pending memory hits to accessed_at (inside the caller's transaction)."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touch_flushed_at = time.time()
+        if touched:
+            conn.executemany(
+                "UPDATE avm SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(at, key) for key, at in touched.items()],
+            )
+
+    def _count(self, entry: tuple) -> None:
+        if entry[1] is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+
+    def put(self, key: str, payload: dict) -> None:
+        self._store(key, payload, None, _ttl_seconds("AVM_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS))
+
+    def put_negative(self, key: str, error: str) -> None:
+        self._store(
+            key, None, error,
+            _ttl_seconds("AVM_CACHE_NEGATIVE_TTL_DAYS", DEFAULT_NEGATIVE_TTL_DAYS),
+        )
+
+    def _store(self, key: str, payload: dict | None, error: str | None, ttl: float) -> None:
+        now = time.time()
+        entry = (now + ttl, payload, error)
+        with self._pool.connection() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO avm (key, payload, error, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(payload) if payload is not None else None, error, entry[0], now),
+            )
+            # LRU eviction on disk: drop expired rows and the least recently used overflow
+            # (recent memory hits written first so the hottest keys are not the ones dropped)
+            self._flush_touches(conn)
+            conn.execute("DELETE FROM avm WHERE expires_at <= ?", (now,))
+            cur = conn.execute(
+                "DELETE FROM avm WHERE key IN (SELECT key FROM avm ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (_max_entries(),),
+            )
+            if cur.rowcount > 0:
+                with self._lock:
+                    self.evictions += cur.rowcount
+        self._remember(key, entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negativeHits": self.negative_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "memoryEntries": len(self._memory),
+            }
+
+
+cache = AvmCache()
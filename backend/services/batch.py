@@ -0,0 +1,282 @@
+"""
+Batch scenario evaluation: many stock-vs-real-estate scenarios in one request.
+Each distinct symbol is loaded once, the real estate legs of a chunk are evaluated
+in one vectorized pass (per-row loan, rate and payment-count arrays through
+remaining_balance()), and results are produced in columnar chunks so the route can
+stream them as NDJSON. annualInterestRate=historical and region work as they do on
+/api/compare.
+"""
+
+from itertools import product
+from typing import Iterator
+
+import numpy as np
+import requests
+
+from backend.services import metrics, regional_data
+from backend.services.alpha_vantage import get_daily_adjusted
+from backend.services.price_series import PriceSeries
+from backend.services.real_estate import (
+    appreciation_factor,
+    loan_terms,
+    parse_date,
+    remaining_balance,
+    round_to,
+)
+from backend.services.returns import compute_hypothetical_return
+
+MAX_SCENARIOS = 10000
+DEFAULT_CHUNK_SIZE = 250
+
+STOCK_COLUMNS = (
+    "symbol", "buyDate", "sellDate", "buyPrice", "sellPrice",
+    "valueAtSell", "gainLoss", "gainLossPercent",
+)
+REAL_ESTATE_COLUMNS = (
+    "monthlyPayment", "remainingBalance", "estimatedValueAtAsOf",
+    "equityAtAsOf", "gainLoss", "gainLossPercent",
+)
+
+
+def expand_scenarios(
+    scenarios: list[dict] | None = None,
+    grid: dict[str, list] | None = None,
+    base: dict | None = None,
+) -> list[dict]:
+    """
+    Build the scenario list: explicit scenarios plus the cartesian product of grid
+    values, each layered over base. Keys are the /api/compare query params.
+    """
+    if scenarios is not None and not (
+        isinstance(scenarios, list) and all(isinstance(s, dict) for s in scenarios)
+    ):
+        raise ValueError("scenarios must be a list of objects")
+    if grid is not None and not isinstance(grid, dict):
+        raise ValueError("grid must be an object of param -> list of values")
+    if base is not None and not isinstance(base, dict):
+        raise ValueError("base must be an object")
+    base = base or {}
+    out = [{**base, **s} for s in (scenarios or [])]
+    if grid:
+        keys = list(grid)
+        for key in keys:
+            if not isinstance(grid[key], list) or not grid[key]:
+                raise ValueError(f"grid.{key} must be a non-empty list")
+        size = 1
+        for key in keys:
+            size *= len(grid[key])
+        if len(out) + size > MAX_SCENARIOS:
+            raise ValueError(f"Too many scenarios (max {MAX_SCENARIOS})")
+        for combo in product(*(grid[k] for k in keys)):
+            out.append({**base, **dict(zip(keys, combo))})
+    if not out:
+        raise ValueError("Provide scenarios (list) and/or grid (param -> list of values)")
+    if len(out) > MAX_SCENARIOS:
+        raise ValueError(f"Too many scenarios (max {MAX_SCENARIOS})")
+    return out
+
+
+def _num(value) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Not a number: {value!r}") from None
+
+
+def _text(value) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+def _stock_params(s: dict) -> dict | None:
+    symbol = _text(s.get("symbol")).upper()
+    invested = _num(s.get("investedAmount"))
+    buy = _text(s.get("buyDate"))
+    if not (symbol and invested and invested > 0 and buy):
+        return None
+    return {
+        "symbol": symbol,
+        "invested_amount": invested,
+        "buy_date": buy,
+        "sell_date": _text(s.get("sellDate")) or None,
+    }
+
+
+def _real_estate_params(s: dict) -> dict | None:
+    price = _num(s.get("purchasePrice"))
+    down = _num(s.get("downPaymentPercent"))
+    rate = s.get("annualInterestRate")
+    if _text(rate).lower() != "historical":
+        rate = _num(rate)
+    buy = _text(s.get("reBuyDate") or s.get("buyDate"))
+    as_of = _text(s.get("asOfDate"))
+    if not (price and price > 0 and down is not None and rate is not None and buy and as_of):
+        return None
+    term = _num(s.get("loanTermYears"))
+    return {
+        "purchase_price": price,
+        "down_payment_percent": down,
+        "annual_interest_rate": "historical" if isinstance(rate, str) else rate,
+        "buy_date": buy,
+        "as_of_date": as_of,
+        "annual_appreciation_percent": _num(s.get("annualAppreciationPercent")) or 0.0,
+        "loan_term_years": int(term) if term else 30,
+        "region": _text(s.get("region")) or None,
+    }
+
+
+def _evaluate_real_estate(params: list[dict | None]) -> tuple[dict[str, list], dict[int, str]]:
+    """
+    Columns for the real estate leg of a chunk. Rows are validated one by one (the
+    checks and messages of amortize()); balances and values for all of them then come
+    from one broadcast over per-row arrays, with one index gather per region.
+    """
+    n = len(params)
+    cols: dict[str, list] = {c: [None] * n for c in REAL_ESTATE_COLUMNS}
+    errors: dict[int, str] = {}
+    rows: list[int] = []
+    terms: list[tuple[float, float, float]] = []
+    rates: list[float] = []
+    starts: list[int] = []
+    elapsed: list[int] = []
+    days: list[int] = []
+    regions: dict[tuple[str, float], list[int]] = {}
+    for i, p in enumerate(params):
+        if p is None:
+            continue
+        try:
+            start, end = parse_date(p["buy_date"]), parse_date(p["as_of_date"])
+            rate = p["annual_interest_rate"]
+            if rate == "historical":
+                rate = regional_data.mortgage_rate(start)
+            if p["annual_appreciation_percent"] < -100:
+                raise ValueError("annualAppreciationPercent must be at least -100")
+            terms.append(loan_terms(
+                p["purchase_price"], p["down_payment_percent"], rate, p["loan_term_years"]
+            ))
+        except ValueError as e:
+            errors[i] = f"Real estate: {e}"
+            continue
+        if p["region"]:
+            regions.setdefault((p["region"], p["annual_appreciation_percent"]), []).append(
+                len(rows)
+            )
+        rows.append(i)
+        rates.append(rate)
+        starts.append(regional_data.month_index(start))
+        elapsed.append(max(0, regional_data.month_index(end) - starts[-1]))
+        days.append(end.toordinal() - start.toordinal())
+    if not rows:
+        return cols, errors
+
+    with metrics.span("amortize"):
+        kept = [params[i] for i in rows]
+        price = np.array([q["purchase_price"] for q in kept])
+        down_payment, loan, payment = np.array(terms).T
+        term = np.array([q["loan_term_years"] for q in kept]) * 12
+        months = np.array(elapsed)
+        balance = remaining_balance(loan, np.array(rates), np.minimum(months, term), term)
+        appreciation = np.array([q["annual_appreciation_percent"] for q in kept])
+        value = price * appreciation_factor(appreciation, np.array(days))
+        start_months = np.array(starts)
+        ok = np.ones(len(rows), dtype=bool)
+        for (region, appreciation), group in regions.items():
+            try:
+                factors, _ = regional_data.window_appreciation(
+                    region, start_months[group], months[group], appreciation
+                )
+            except ValueError:
+                # Find the rows the index does not cover; the others still get values
+                factors = np.full(len(group), np.nan)
+                for j, g in enumerate(group):
+                    try:
+                        factors[j] = regional_data.window_appreciation(
+                            region, start_months[g:g + 1], months[g:g + 1], appreciation
+                        )[0][0]
+                    except ValueError as e:
+                        errors[rows[g]] = f"Real estate: {e}"
+                        ok[g] = False
+            value[group] = price[group] * factors
+        equity = value - balance
+        gain_loss = equity - down_payment
+
+    for j, i in enumerate(rows):
+        if not ok[j]:
+            continue
+        cols["monthlyPayment"][i] = round_to(float(payment[j]), 2)
+        cols["remainingBalance"][i] = round_to(float(balance[j]), 2)
+        cols["estimatedValueAtAsOf"][i] = round_to(float(value[j]), 2)
+        cols["equityAtAsOf"][i] = round_to(float(equity[j]), 2)
+        cols["gainLoss"][i] = round_to(float(gain_loss[j]), 2)
+        cols["gainLossPercent"][i] = (
+            round_to(float(gain_loss[j] / down_payment[j] * 100.0), 2) if down_payment[j] else 0.0
+        )
+    return cols, errors
+
+
+def evaluate_batch(
+    scenarios: list[dict], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[dict]:
+    """
+    Evaluate scenarios and yield one columnar chunk per chunk_size scenarios:
+    { offset, count, stock: {column: [...]}, realEstate: {column: [...]}, errors: {row: msg} }.
+    Rows without a stock (or real estate) leg have None in that leg's columns; errors are
+    keyed by absolute row index. Series are loaded lazily, once per distinct symbol.
+    """
+    series_by_symbol: dict[str, PriceSeries | str] = {}
+
+    for offset in range(0, len(scenarios), chunk_size):
+        chunk = scenarios[offset : offset + chunk_size]
+        n = len(chunk)
+        errors: dict[int, str] = {}
+        stock_params: list[dict | None] = []
+        re_params: list[dict | None] = []
+        for i, s in enumerate(chunk):
+            try:
+                stock_params.append(_stock_params(s))
+                re_params.append(_real_estate_params(s))
+            except ValueError as e:
+                stock_params.append(None)
+                re_params.append(None)
+                errors[i] = str(e)
+            else:
+                if stock_params[-1] is None and re_params[-1] is None:
+                    errors[i] = "Scenario has neither stock nor real estate params"
+
+        stock_cols: dict[str, list] = {c: [None] * n for c in STOCK_COLUMNS}
+        for i, p in enumerate(stock_params):
+            if p is None:
+                continue
+            series = series_by_symbol.get(p["symbol"])
+            if series is None:
+                try:
+                    series = get_daily_adjusted(p["symbol"], "full")
+                except ValueError as e:
+                    series = str(e)
+                except requests.RequestException as e:
+                    # Not str(e): HTTP errors quote the request URL, API key included
+                    series = f"Upstream request failed ({type(e).__name__})"
+                series_by_symbol[p["symbol"]] = series
+            if isinstance(series, str):
+                errors[i] = f"Stock: {series}"
+                continue
+            try:
+                res = compute_hypothetical_return(series=series, **p)
+            except ValueError as e:
+                errors[i] = f"Stock: {e}"
+                continue
+            for c in STOCK_COLUMNS:
+                stock_cols[c][i] = res[c]
+
+        re_cols, re_errors = _evaluate_real_estate(re_params)
+        for i, msg in re_errors.items():
+            errors[i] = f"{errors[i]}; {msg}" if i in errors else msg
+
+        yield {
+            "offset": offset,
+            "count": n,
+            "stock": stock_cols,
+            "realEstate": re_cols,
+            "errors": {str(offset + i): msg for i, msg in sorted(errors.items())},
+        }
@@ -0,0 +1,205 @@
+"""
+Break-even solver: the property appreciation, mortgage rate, down payment or stock
+return at which the real estate gain (equity minus down payment) equals the stock
+gain, at the end of every period from purchase to the as-of date.
+
+Everything is solved for all horizons at once on NumPy arrays built from amortize()'s
+closed form. Equity is linear in the down payment and a power of the appreciation
+factor, so those two (and the stock return) invert exactly; the balance is not
+invertible in the rate, so rates are found by vectorized bracketing (Illinois
+regula falsi) between 0 and MAX_RATE_PERCENT.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from backend.services import metrics
+from backend.services.alpha_vantage import get_daily_adjusted
+from backend.services.compare_timeseries import GRANULARITIES, period_ends
+from backend.services.price_series import iso_date
+from backend.services.real_estate import amortize, parse_date, remaining_balance, round_to
+
+# Break-even curve name -> what is solved for
+TARGETS = (
+    "annualAppreciationPercent",
+    "annualInterestRate",
+    "downPaymentPercent",
+    "stockAnnualReturnPercent",
+)
+MAX_RATE_PERCENT = 50.0
+SOLVER_TOLERANCE = 1e-10
+SOLVER_MAX_ITERATIONS = 100
+
+
+def bracketed_root(f, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Roots of f (array -> array, elementwise) in [lo, hi], one per element; NaN where
+    f(lo) and f(hi) have the same sign. Illinois regula falsi on all elements at once.
+    """
+    lo, hi = np.array(lo, dtype=np.float64), np.array(hi, dtype=np.float64)
+    f_lo, f_hi = f(lo), f(hi)
+    root = np.full(lo.shape, np.nan)
+    root[f_lo == 0] = lo[f_lo == 0]
+    root[f_hi == 0] = hi[f_hi == 0]
+    active = (f_lo * f_hi < 0) & np.isnan(root)
+    side = np.zeros(lo.shape, dtype=np.int8)
+    for _ in range(SOLVER_MAX_ITERATIONS):
+        if not active.any():
+            break
+        x = np.where(active, (lo * f_hi - hi * f_lo) / np.where(active, f_hi - f_lo, 1.0), lo)
+        f_x = np.where(active, f(x), 0.0)
+        done = active & ((np.abs(f_x) <= SOLVER_TOLERANCE) | (hi - lo <= SOLVER_TOLERANCE))
+        root[done] = x[done]
+        active &= ~done
+        left = active & (f_x * f_lo > 0)
+        right = active & ~left
+        lo[left], f_lo[left] = x[left], f_x[left]
+        hi[right], f_hi[right] = x[right], f_x[right]
+        # Illinois: halve the stale end's value when the same end moves twice in a row
+        f_hi[left & (side == 1)] /= 2
+        f_lo[right & (side == -1)] /= 2
+        side = np.where(left, 1, np.where(right, -1, side))
+    root[active] = ((lo + hi) / 2)[active]
+    return root
+
+
+def _curve(values: np.ndarray, digits: int = 4) -> list[float | None]:
+    """JSON list with NaN / inf (no solution) as None."""
+    return [round_to(float(v), digits) if np.isfinite(v) else None for v in values]
+
+
+def break_even(
+    *,
+    symbol: str,
+    invested_amount: float,
+    stock_buy: str,
+    purchase_price: float,
+    down_payment_percent: float,
+    annual_interest_rate: float,
+    re_buy_date: str | None = None,
+    as_of_date: str | None = None,
+    annual_appreciation_percent: float = 0.0,
+    loan_term_years: int = 30,
+    granularity: str = "yearly",
+    targets: tuple[str, ...] = TARGETS,
+) -> dict:
+    """
+    Break-even curves at the end of each period from re_buy_date (default stock_buy)
+    to as_of_date (default the last close). At each date, with the other inputs as
+    given: annualAppreciationPercent / annualInterestRate / downPaymentPercent is the
+    value at which equity minus down payment equals the stock gainLoss (the stock
+    bought on stock_buy, valued at the close on or before that date), and
+    stockAnnualReturnPercent is the yearly stock return that would match the real
+    estate gain. A point is None where no such value exists (a rate outside 0 to
+    MAX_RATE_PERCENT, a down payment outside 0-100%, a horizon of zero...).
+
+    Returns { granularity, labels, stock: { symbol, buyDate, investedAmount, gainLoss },
+    realEstate: { ..., gainLoss }, breakEven: { target: [...] }, asOf: { date, target:
+    value } }.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown or not targets:
+        raise ValueError(f"solveFor must be any of {', '.join(TARGETS)}")
+    if invested_amount <= 0:
+        raise ValueError("investedAmount must be positive")
+
+    series = get_daily_adjusted(symbol, "full")
+    ordinals = np.asarray(series.ordinals, dtype=np.int64)
+    closes = np.asarray(series.closes, dtype=np.float64)
+    buy_row = series.index_on_or_before(parse_date(stock_buy).toordinal())
+    if buy_row < 0:
+        raise ValueError(f"No price data on or before buy date {stock_buy} for {symbol}")
+    re_buy_date = re_buy_date or stock_buy
+    as_of_date = as_of_date or series.date_at(-1)
+    re_start = parse_date(re_buy_date)
+    if parse_date(as_of_date) < re_start:
+        raise ValueError("asOfDate must not be before the real estate buy date")
+
+    labels, ends = period_ends(re_buy_date, as_of_date, granularity, cap=as_of_date)
+    cols = amortize(
+        purchase_price=purchase_price,
+        down_payment_percent=down_payment_percent,
+        annual_interest_rate=annual_interest_rate,
+        buy_date=re_buy_date,
+        as_of_dates=ends,
+        annual_appreciation_percent=annual_appreciation_percent,
+        loan_term_years=loan_term_years,
+    )
+    end_ordinals = np.array([date.fromisoformat(e).toordinal() for e in ends], dtype=np.int64)
+
+    with metrics.span("solve"):
+        # Stock gain at each date; NaN before the stock was bought
+        rows = np.searchsorted(ordinals, end_ordinals, side="right") - 1
+        held = rows >= buy_row
+        growth = np.where(held, closes[np.maximum(rows, 0)] / closes[buy_row], np.nan)
+        stock_gain = invested_amount * (growth - 1)
+        stock_years = np.where(held, (end_ordinals - ordinals[buy_row]) / 365.25, np.nan)
+
+        down = cols["downPayment"]
+        loan = cols["loanAmount"]
+        value = np.asarray(cols["estimatedValue"])
+        balance = np.asarray(cols["remainingBalance"])
+        re_gain = value - balance - down
+        paid = np.asarray(cols["paymentsMade"], dtype=np.float64)
+        n = loan_term_years * 12
+        years = np.maximum(end_ordinals - re_start.toordinal(), 0) / 365.25
+        curves = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if "annualAppreciationPercent" in targets:
+                # purchase_price * g ** years = stock gain + down payment + balance
+                needed = (stock_gain + down + balance) / purchase_price
+                g = np.where((years > 0) & (needed > 0), needed ** (1 / years), np.nan)
+                curves["annualAppreciationPercent"] = (g - 1) * 100
+            if "downPaymentPercent" in targets:
+                # gain = value - price * h - down * (1 - h), linear in the down payment
+                h = balance / loan
+                d = (value - purchase_price * h - stock_gain) / (1 - h)
+                ok = (h < 1) & (d >= 0) & (d < purchase_price)
+                curves["downPaymentPercent"] = np.where(ok, d / purchase_price * 100, np.nan)
+            if "annualInterestRate" in targets:
+                # Equity falls as the rate rises; only dates with payments made depend on it
+                target = value - down - stock_gain
+                varies = (paid > 0) & (paid < n) & np.isfinite(target)
+                rates = np.full(len(ends), np.nan)
+                if varies.any():
+                    k, t = paid[varies], target[varies]
+                    rates[varies] = bracketed_root(
+                        lambda r: t - remaining_balance(loan, r, k, n),
+                        np.zeros(len(k)),
+                        np.full(len(k), MAX_RATE_PERCENT),
+                    )
+                curves["annualInterestRate"] = rates
+            if "stockAnnualReturnPercent" in targets:
+                needed = (re_gain + invested_amount) / invested_amount
+                ok = (stock_years > 0) & (needed > 0)
+                curves["stockAnnualReturnPercent"] = np.where(
+                    ok, needed ** (1 / stock_years) - 1, np.nan
+                ) * 100
+
+    solved = {name: _curve(curves[name]) for name in TARGETS if name in curves}
+    return {
+        "granularity": granularity,
+        "labels": labels,
+        "stock": {
+            "symbol": series.symbol,
+            "buyDate": iso_date(int(ordinals[buy_row])),
+            "investedAmount": round_to(invested_amount, 2),
+            "gainLoss": _curve(stock_gain, 2),
+        },
+        "realEstate": {
+            "purchasePrice": round_to(purchase_price, 2),
+            "downPaymentPercent": round_to(down_payment_percent, 2),
+            "annualInterestRate": round_to(annual_interest_rate, 2),
+            "annualAppreciationPercent": round_to(annual_appreciation_percent, 2),
+            "buyDate": re_buy_date,
+            "gainLoss": _curve(re_gain, 2),
+        },
+        "breakEven": solved,
+        "asOf": {
+            "date": ends[-1] if ends else as_of_date,
+            **{name: values[-1] if values else None for name, values in solved.items()},
+        },
+    }
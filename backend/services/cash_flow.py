@@ -0,0 +1,365 @@
+"""
+Monthly cash-flow ledger for a financed property: mortgage, property tax, insurance,
+HOA, maintenance, rent net of vacancy, closing and selling costs.
+
+The whole schedule is NumPy columns over months (closed-form balance, growth factors
+as powers), so a 30-year ledger is a handful of array operations rather than a Python
+loop per month. From it: net worth over time (sale proceeds plus cumulative cash
+flow), the same cash invested at a discount rate instead (opportunity cost), IRR, NPV
+and cash-on-cash return.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from backend.services import metrics, regional_data
+from backend.services.real_estate import (
+    amortize,
+    appreciation_factor,
+    parse_date,
+    remaining_balance,
+    round_to,
+)
+
+# Query param -> ledger() keyword, for routes
+PARAMS = {
+    "closingCostPercent": "closing_cost_percent",
+    "sellingCostPercent": "selling_cost_percent",
+    "propertyTaxPercent": "property_tax_percent",
+    "insuranceAnnual": "insurance_annual",
+    "hoaMonthly": "hoa_monthly",
+    "maintenancePercent": "maintenance_percent",
+    "monthlyRent": "monthly_rent",
+    "rentGrowthPercent": "rent_growth_percent",
+    "vacancyPercent": "vacancy_percent",
+    "expenseGrowthPercent": "expense_growth_percent",
+    "discountRatePercent": "discount_rate_percent",
+}
+LEDGER_COLUMNS = (
+    "value", "balance", "payment", "interest", "principal", "propertyTax", "insurance",
+    "hoa", "maintenance", "rent", "netCashFlow", "cumulativeCashFlow", "netWorth",
+    "alternativeValue",
+)
+# Per-month amounts (summed when the ledger is yearly); the rest are balances
+FLOW_COLUMNS = (
+    "payment", "interest", "principal", "propertyTax", "insurance", "hoa", "maintenance",
+    "rent", "netCashFlow",
+)
+LEDGER_MODES = ("monthly", "yearly", "none")
+IRR_MAX_ITERATIONS = 100
+
+
+def _months_between(start: date, end: date) -> int:
+    """Full months from start to end (0 if end is before start), as in amortize()."""
+    return max(0, end.year * 12 + end.month - start.year * 12 - start.month) if end >= start else 0
+
+
+def _row_days(start: date, end: date, months: int) -> np.ndarray:
+    """
+    Days from start to each ledger row's date: k calendar months after start (day
+    clamped to the month's length) for row k, and end itself for the last row.
+    """
+    month_starts = np.datetime64(start.replace(day=1), "M") + np.arange(months + 1)
+    first_days = month_starts.astype("datetime64[D]")
+    lengths = ((month_starts + 1).astype("datetime64[D]") - first_days).astype(np.int64)
+    dates = first_days + (np.minimum(start.day, lengths) - 1)
+    days = (dates - np.datetime64(start, "D")).astype(np.int64)
+    days[-1] = end.toordinal() - start.toordinal()
+    return days
+
+
+def _month_label(start: date, k: int) -> str:
+    total = start.year * 12 + start.month - 1 + k
+    return f"{total // 12}-{total % 12 + 1:02d}"
+
+
+def irr(cash_flows: np.ndarray) -> float | None:
+    """
+    Periodic internal rate of return of cash_flows (index = period), or None if the
+    flows never change sign or the rate cannot be bracketed. Newton steps, each one
+    vectorized over all periods, fall back to bisection when they leave the bracket.
+    """
+    if not (cash_flows > 0).any() or not (cash_flows < 0).any():
+        return None
+    t = np.arange(len(cash_flows))
+
+    def npv(rate: float) -> float:
+        return float(np.dot(cash_flows, (1.0 + rate) ** -t))
+
+    # Lowest rate whose discount factors (1 + rate) ** -t still fit in a float
+    lo, hi = 10.0 ** (-300.0 / len(cash_flows)) - 1.0, 1.0
+    f_lo, f_hi = npv(lo), npv(hi)
+    while f_lo * f_hi > 0 and hi < 1e6:
+        hi *= 10
+        f_hi = npv(hi)
+    if f_lo * f_hi > 0:
+        return None
+    rate = 0.005
+    for _ in range(IRR_MAX_ITERATIONS):
+        discount = (1.0 + rate) ** -t
+        f = float(np.dot(cash_flows, discount))
+        if abs(f) < 1e-9 * max(1.0, float(np.abs(cash_flows).max())):
+            return rate
+        if (f > 0) == (f_lo > 0):
+            lo, f_lo = rate, f
+        else:
+            hi = rate
+        slope = float(np.dot(cash_flows * -t, discount / (1.0 + rate)))
+        step = rate - f / slope if slope else hi + 1
+        rate = step if lo < step < hi else (lo + hi) / 2
+        if hi - lo < 1e-12:
+            return rate
+    return rate
+
+
+def ledger(
+    *,
+    purchase_price: float,
+    down_payment_percent: float,
+    annual_interest_rate: float,
+    buy_date: str,
+    as_of_date: str,
+    annual_appreciation_percent: float = 0.0,
+    loan_term_years: int = 30,
+    closing_cost_percent: float = 0.0,
+    selling_cost_percent: float = 0.0,
+    property_tax_percent: float = 0.0,
+    insurance_annual: float = 0.0,
+    hoa_monthly: float = 0.0,
+    maintenance_percent: float = 0.0,
+    monthly_rent: float = 0.0,
+    rent_growth_percent: float = 0.0,
+    vacancy_percent: float = 0.0,
+    expense_growth_percent: float = 0.0,
+    discount_rate_percent: float = 0.0,
+    region: str | None = None,
+) -> dict:
+    """
+    Month-by-month ledger from buy_date through as_of_date (row k is the k-th month
+    after purchase; row 0 is the purchase itself). Percent inputs are yearly:
+    property tax and maintenance are a share of the current value, rent and
+    insurance / HOA step up once a year by rent / expense growth, vacancy is the share
+    of rent lost. netCashFlow = rent - payment - tax - insurance - HOA - maintenance.
+    netWorth = value less selling costs and the loan balance, plus cumulative cash
+    flow. alternativeValue is net worth on the same basis had the same cash (purchase
+    outlay, then every monthly shortfall, less every surplus) been invested at the
+    discount rate instead; netWorth - alternativeValue is the NPV carried forward.
+    With region, the value follows the region's historical home price index month by
+    month (regional_data.appreciation()) instead of annual_appreciation_percent.
+
+    Returns { months, monthlyDiscountRate, initialInvestment, downPayment,
+    closingCosts, loanAmount, monthlyPayment, saleProceeds, columns, appreciation }
+    where saleProceeds and every column (LEDGER_COLUMNS) are NumPy arrays with one
+    entry per month 0..months, and appreciation is { region, indexFrom, indexThrough }
+    or None.
+    """
+    for name, value in (
+        ("closingCostPercent", closing_cost_percent),
+        ("sellingCostPercent", selling_cost_percent),
+        ("propertyTaxPercent", property_tax_percent),
+        ("insuranceAnnual", insurance_annual),
+        ("hoaMonthly", hoa_monthly),
+        ("maintenancePercent", maintenance_percent),
+        ("monthlyRent", monthly_rent),
+    ):
+        if value < 0:
+            raise ValueError(f"{name} must be non-negative")
+    if not 0 <= vacancy_percent <= 100:
+        raise ValueError("vacancyPercent must be between 0 and 100")
+    if selling_cost_percent >= 100:
+        raise ValueError("sellingCostPercent must be below 100")
+    if discount_rate_percent <= -100:
+        raise ValueError("discountRatePercent must be greater than -100")
+
+    start, end = parse_date(buy_date), parse_date(as_of_date)
+    months = _months_between(start, end)
+    # Scalars and validation (purchase price, down payment, rate) from the closed form
+    loan = amortize(
+        purchase_price=purchase_price,
+        down_payment_percent=down_payment_percent,
+        annual_interest_rate=annual_interest_rate,
+        buy_date=buy_date,
+        as_of_dates=[],
+        loan_term_years=loan_term_years,
+    )
+
+    with metrics.span("amortize"):
+        k = np.arange(months + 1)
+        n = loan_term_years * 12
+        loan_amount = loan["loanAmount"]
+        paid = np.minimum(k, n)
+        balance = remaining_balance(loan_amount, annual_interest_rate, paid, n)
+        previous_balance = np.concatenate(([loan_amount], balance[:-1]))
+        payment = np.where((k >= 1) & (k <= n), loan["monthlyPayment"], 0.0)
+        principal = np.where(k >= 1, previous_balance - balance, 0.0)
+        interest = payment - principal
+
+        regional = None
+        if region:
+            factors, regional = regional_data.appreciation(
+                region, start, months, annual_appreciation_percent
+            )
+            value = purchase_price * factors
+        else:
+            # As amortize() values a date, so the last row matches /api/compare
+            value = purchase_price * appreciation_factor(
+                annual_appreciation_percent, _row_days(start, end, months)
+            )
+        value_at_start = np.concatenate(([purchase_price], value[:-1]))
+        # Year of ownership the month falls in: 0 for months 1-12, 1 for 13-24, ...
+        year = np.maximum(k - 1, 0) // 12
+        expense_growth = (1 + expense_growth_percent / 100.0) ** year
+        active = k >= 1
+        property_tax = np.where(active, value_at_start * property_tax_percent / 1200.0, 0.0)
+        maintenance = np.where(active, value_at_start * maintenance_percent / 1200.0, 0.0)
+        insurance = np.where(active, insurance_annual / 12.0 * expense_growth, 0.0)
+        hoa = np.where(active, hoa_monthly * expense_growth, 0.0)
+        rent = np.where(
+            active,
+            monthly_rent
+            * (1 + rent_growth_percent / 100.0) ** year
+            * (1 - vacancy_percent / 100.0),
+            0.0,
+        )
+        net_cash_flow = rent - payment - property_tax - insurance - hoa - maintenance
+        cumulative = np.cumsum(net_cash_flow)
+
+        down_payment = loan["downPayment"]
+        closing_costs = purchase_price * closing_cost_percent / 100.0
+        initial = down_payment + closing_costs
+        sale_proceeds = value * (1 - selling_cost_percent / 100.0) - balance
+        net_worth = sale_proceeds + cumulative
+
+        # Same cash at the discount rate: FV_k = g**k * cumsum(c_j / g**j), counted
+        # net of the shortfalls paid in (as netWorth is)
+        monthly_discount = (1 + discount_rate_percent / 100.0) ** (1 / 12.0)
+        invested = -net_cash_flow
+        invested[0] += initial
+        scale = monthly_discount ** k
+        alternative = scale * np.cumsum(invested / scale) + cumulative
+
+    return {
+        "months": months,
+        "monthlyDiscountRate": monthly_discount - 1,
+        "initialInvestment": initial,
+        "downPayment": down_payment,
+        "closingCosts": closing_costs,
+        "loanAmount": loan_amount,
+        "monthlyPayment": loan["monthlyPayment"],
+        "saleProceeds": sale_proceeds,
+        "appreciation": regional,
+        "columns": {
+            "value": value,
+            "balance": balance,
+            "payment": payment,
+            "interest": interest,
+            "principal": principal,
+            "propertyTax": property_tax,
+            "insurance": insurance,
+            "hoa": hoa,
+            "maintenance": maintenance,
+            "rent": rent,
+            "netCashFlow": net_cash_flow,
+            "cumulativeCashFlow": cumulative,
+            "netWorth": net_worth,
+            "alternativeValue": alternative,
+        },
+    }
+
+
+def summarize(result: dict) -> dict:
+    """
+    IRR, NPV, cash-on-cash and end-of-ledger figures for a ledger() result (plus
+    region, indexFrom and indexThrough for a regional ledger).
+    """
+    columns = result["columns"]
+    months = result["months"]
+    initial = result["initialInvestment"]
+    # Cash flows of buying, holding and selling at the end of the ledger
+    flows = columns["netCashFlow"].copy()
+    flows[0] -= initial
+    flows[-1] += result["saleProceeds"][-1]
+    monthly_irr = irr(flows)
+    rate = result["monthlyDiscountRate"]
+    npv = float(np.dot(flows, (1 + rate) ** -np.arange(months + 1)))
+    first_year = columns["netCashFlow"][1:13]
+    cash_on_cash = (
+        float(first_year.mean()) * 12 / initial * 100.0 if len(first_year) and initial else 0.0
+    )
+    net_worth = float(columns["netWorth"][-1])
+    return {
+        "months": months,
+        "initialInvestment": round_to(initial, 2),
+        "downPayment": round_to(result["downPayment"], 2),
+        "closingCosts": round_to(result["closingCosts"], 2),
+        "loanAmount": round_to(result["loanAmount"], 2),
+        "monthlyPayment": round_to(result["monthlyPayment"], 2),
+        "totalRent": round_to(float(columns["rent"].sum()), 2),
+        "totalInterest": round_to(float(columns["interest"].sum()), 2),
+        "totalOperatingCosts": round_to(
+            float(
+                (columns["propertyTax"] + columns["insurance"] + columns["hoa"]
+                 + columns["maintenance"]).sum()
+            ),
+            2,
+        ),
+        "cumulativeCashFlow": round_to(float(columns["cumulativeCashFlow"][-1]), 2),
+        "saleProceeds": round_to(float(result["saleProceeds"][-1]), 2),
+        "netWorth": round_to(net_worth, 2),
+        "profit": round_to(net_worth - initial, 2),
+        "alternativeValue": round_to(float(columns["alternativeValue"][-1]), 2),
+        "irrPercent": (
+            round_to(((1 + monthly_irr) ** 12 - 1) * 100.0, 2) if monthly_irr is not None else None
+        ),
+        "npv": round_to(npv, 2),
+        "cashOnCashPercent": round_to(cash_on_cash, 2),
+        **(result["appreciation"] or {}),
+    }
+
+
+def net_worth_at(
+    *, buy_date: str, as_of_dates: list[str], **kwargs
+) -> tuple[dict, list[float]]:
+    """
+    Ledger through the last of as_of_dates; returns (summary, net worth at each date,
+    taken from the month row amortize() would use for that date).
+    """
+    start = parse_date(buy_date)
+    ends = [parse_date(d) for d in as_of_dates]
+    last = max(ends, default=start).isoformat()
+    result = ledger(buy_date=buy_date, as_of_date=last, **kwargs)
+    rows = np.array([_months_between(start, e) for e in ends], dtype=np.intp)
+    return summarize(result), result["columns"]["netWorth"][rows].tolist()
+
+
+def cash_flow_ledger(*, ledger_mode: str = "monthly", **kwargs) -> dict:
+    """
+    ledger() + summarize() shaped for the API: { summary, ledger: { granularity, labels
+    (YYYY-MM), columns } or null }. ledger_mode "yearly" keeps the purchase row, every
+    12th month and the last month, with flow columns summed since the previous row;
+    "none" omits the ledger.
+    """
+    if ledger_mode not in LEDGER_MODES:
+        raise ValueError(f"ledger must be one of {', '.join(LEDGER_MODES)}")
+    result = ledger(**kwargs)
+    out: dict = {"summary": summarize(result), "ledger": None}
+    if ledger_mode == "none":
+        return out
+    columns = result["columns"]
+    rows = np.arange(result["months"] + 1)
+    if ledger_mode == "yearly":
+        rows = np.unique(np.concatenate((rows[::12], rows[-1:])))
+    selected = {name: columns[name][rows] for name in LEDGER_COLUMNS}
+    if ledger_mode == "yearly":
+        for name in FLOW_COLUMNS:
+            totals = np.cumsum(columns[name])[rows]
+            selected[name] = np.diff(totals, prepend=0.0)
+    start = parse_date(kwargs["buy_date"])
+    with metrics.span("encode"):
+        out["ledger"] = {
+            "granularity": ledger_mode,
+            "labels": [_month_label(start, int(k)) for k in rows],
+            "columns": {name: np.round(values, 2).tolist() for name, values in selected.items()},
+        }
+    return out
@@ -1,86 +1,151 @@
 """
-Year-over-year comparison: stock value and real estate equity at end of each year.
-Uses one Alpha Vantage call for stock; real estate is computed per year.
+Period-over-period comparison: stock value and real estate equity at the end of each
+year (default), month, week or trading day. Uses one Alpha Vantage call for stock; real
+estate is computed for all periods in one pass (equity, or net worth from the monthly
+cash-flow ledger when cash-flow params are given). Long series are downsampled
+server-side.
 """
 
-from backend.services.alpha_vantage import get_daily_adjusted, get_price_on_or_before
-from backend.services.real_estate import compute_hypothetical_real_estate
+from calendar import monthrange
+from datetime import date, timedelta
+
+from backend.services.alpha_vantage import (
+    get_daily_adjusted,
+    get_price_on_or_before,
+    get_prices_on_or_before,
+)
+from backend.services.cash_flow import net_worth_at
+from backend.services.downsample import downsample_aligned
+from backend.services.real_estate import amortize, round_to
+
+GRANULARITIES = ("daily", "weekly", "monthly", "yearly")
+DEFAULT_MAX_POINTS = 1000
 
 
 def _year_end_date(year: int) -> str:
     return f"{year}-12-31"
 
 
-def _stock_values_by_year(
+def period_ends(
+    start_date: str, last_date: str, granularity: str, cap: str | None = None
+) -> tuple[list[str], list[str]]:
+    """
+    Return (labels, end dates) for each period from start_date's period through
+    last_date's period. The final end date is capped at cap when given.
+    Labels: "2024" (yearly), "2024-03" (monthly), end date (weekly, daily; weekdays only).
+    """
+    start = date.fromisoformat(start_date)
+    last = date.fromisoformat(last_date)
+    periods: list[tuple[str | None, date]] = []
+    if granularity == "yearly":
+        periods = [(str(y), date(y, 12, 31)) for y in range(start.year, last.year + 1)]
+    elif granularity == "monthly":
+        y, m = start.year, start.month
+        while (y, m) <= (last.year, last.month):
+            periods.append((f"{y}-{m:02d}", date(y, m, monthrange(y, m)[1])))
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    elif granularity == "weekly":
+        d = start + timedelta(days=6 - start.weekday())
+        while d - timedelta(days=6) <= last:
+            periods.append((None, d))
+            d += timedelta(days=7)
+    elif granularity == "daily":
+        d = start
+        while d <= last:
+            if d.weekday() < 5:
+                periods.append((None, d))
+            d += timedelta(days=1)
+    else:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    labels: list[str] = []
+    ends: list[str] = []
+    for i, (label, end) in enumerate(periods):
+        end_date = end.isoformat()
+        if cap and i == len(periods) - 1:
+            end_date = min(end_date, cap)
+        if end_date < start_date:
+            continue
+        labels.append(label or end_date)
+        ends.append(end_date)
+    return labels, ends
+
+
+def _stock_values(
     symbol: str,
     invested_amount: float,
     buy_date: str,
     sell_date: str | None,
+    granularity: str = "yearly",
 ) -> tuple[list[str], list[float]]:
-    """Return (years, values) for stock at end of each year from buy to sell."""
+    """Return (labels, values) for stock at the end of each period from buy to sell."""
     series = get_daily_adjusted(symbol, "full")
     buy = get_price_on_or_before(series, buy_date)
     if not buy:
         raise ValueError(f"No price data on or before buy date {buy_date} for {symbol}")
     buy_price = buy["close"]
     shares = invested_amount / buy_price
-    buy_year = int(buy_date[:4])
     if sell_date:
         sell = get_price_on_or_before(series, sell_date)
         if not sell or sell["date"] < buy["date"]:
             raise ValueError(f"No price data for sell date for {symbol}")
-        sell_year = int(sell["date"][:4])
+        last_date = sell["date"]
     else:
-        sell_year = int(series["dates"][-1][:4])
+        last_date = series.date_at(-1)
 
-    years: list[str] = []
+    labels, end_dates = period_ends(buy_date, last_date, granularity, cap=sell_date)
+
+    out_labels: list[str] = []
     values: list[float] = []
-    for y in range(buy_year, sell_year + 1):
-        if y == sell_year and sell_date:
-            end_date = min(_year_end_date(y), sell_date)
-        else:
-            end_date = _year_end_date(y)
-        if end_date < buy_date:
-            continue
-        pt = get_price_on_or_before(series, end_date)
+    for label, pt in zip(labels, get_prices_on_or_before(series, end_dates)):
         if not pt:
             continue
-        years.append(str(y))
+        out_labels.append(label)
         values.append(round(shares * pt["close"], 2))
-    return years, values
+    return out_labels, values
 
 
-def _real_estate_values_by_year(
+def _real_estate_values(
     purchase_price: float,
     down_payment_percent: float,
     annual_interest_rate: float,
     buy_date: str,
     as_of_date: str,
     annual_appreciation_percent: float,
-) -> tuple[list[str], list[float]]:
-    """Return (years, equity values) at end of each year from buy to as_of."""
-    buy_year = int(buy_date[:4])
-    as_of_year = int(as_of_date[:4])
-    years: list[str] = []
-    values: list[float] = []
-    for y in range(buy_year, as_of_year + 1):
-        if y == as_of_year:
-            end_date = min(_year_end_date(y), as_of_date)
-        else:
-            end_date = _year_end_date(y)
-        if end_date < buy_date:
-            continue
-        result = compute_hypothetical_real_estate(
+    granularity: str = "yearly",
+    cash_flow: dict | None = None,
+    region: str | None = None,
+) -> tuple[list[str], list[float], dict]:
+    """
+    Return (labels, values, extra) at the end of each period from buy to as_of.
+    Values are equity, or ledger net worth when cash_flow (cash_flow.ledger() keyword
+    arguments) is given; extra then holds metric "netWorth" and the ledger summary.
+    With region, the value follows the region's home price index and extra (or the
+    summary) says which index months were used.
+    """
+    labels, end_dates = period_ends(buy_date, as_of_date, granularity, cap=as_of_date)
+    if cash_flow is not None:
+        summary, values = net_worth_at(
             purchase_price=purchase_price,
             down_payment_percent=down_payment_percent,
             annual_interest_rate=annual_interest_rate,
             buy_date=buy_date,
-            as_of_date=end_date,
+            as_of_dates=end_dates,
             annual_appreciation_percent=annual_appreciation_percent,
+            region=region,
+            **cash_flow,
         )
-        years.append(str(y))
-        values.append(result["equityAtAsOf"])
-    return years, values
+        return labels, [round_to(v, 2) for v in values], {"metric": "netWorth", "summary": summary}
+    cols = amortize(
+        purchase_price=purchase_price,
+        down_payment_percent=down_payment_percent,
+        annual_interest_rate=annual_interest_rate,
+        buy_date=buy_date,
+        as_of_dates=end_dates,
+        annual_appreciation_percent=annual_appreciation_percent,
+        region=region,
+    )
+    return labels, [round_to(v, 2) for v in cols["equity"]], cols.get("appreciation") or {}
 
 
 def get_compare_time_series(
@@ -95,15 +160,33 @@ def get_compare_time_series(
     re_buy_date: str | None = None,
     as_of_date: str | None = None,
     annual_appreciation_percent: float = 0.0,
+    granularity: str = "yearly",
+    max_points: int | None = None,
+    cash_flow: dict | None = None,
+    region: str | None = None,
 ) -> dict:
     """
-    Return year-over-year values for stock and/or real estate.
-    Returns { years: [], stock: { values: [] } or None, realEstate: { values: [] } or None }.
+    Return period-end values for stock and/or real estate.
+    Returns { granularity, labels: [], years: [] (yearly only, same as labels),
+    stock: { values: [] } or None, realEstate: { values: [] } or None }.
+    With cash_flow (cash_flow.ledger() keyword arguments: taxes, rent, ...) real estate
+    values are ledger net worth and realEstate also has metric "netWorth" and summary.
+    With region, real estate values follow that region's historical home price index
+    and realEstate (or its summary) has region, indexFrom and indexThrough.
+    At most max_points (default DEFAULT_MAX_POINTS) labels are returned; longer series
+    are downsampled with LTTB so peaks and troughs of each line survive.
     """
-    out: dict = {"years": [], "stock": None, "realEstate": None}
-    stock_years: list[str] = []
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if max_points is None:
+        max_points = DEFAULT_MAX_POINTS
+    if max_points < 3:
+        raise ValueError("maxPoints must be at least 3")
+
+    out: dict = {"granularity": granularity, "labels": [], "stock": None, "realEstate": None}
+    stock_labels: list[str] = []
     stock_vals: list[float] = []
-    re_years: list[str] = []
+    re_labels: list[str] = []
     re_vals: list[float] = []
 
     has_stock = symbol and invested_amount and invested_amount > 0 and stock_buy
@@ -116,34 +199,47 @@ def get_compare_time_series(
     )
 
     if has_stock:
-        stock_years, stock_vals = _stock_values_by_year(
+        stock_labels, stock_vals = _stock_values(
             symbol=symbol,
             invested_amount=invested_amount,
             buy_date=stock_buy,
             sell_date=stock_sell,
+            granularity=granularity,
         )
         out["stock"] = {"values": stock_vals}
     if has_re:
-        re_years, re_vals = _real_estate_values_by_year(
+        re_labels, re_vals, re_extra = _real_estate_values(
             purchase_price=purchase_price,
             down_payment_percent=down_payment_percent,
             annual_interest_rate=annual_interest_rate,
             buy_date=re_buy_date,
             as_of_date=as_of_date,
             annual_appreciation_percent=annual_appreciation_percent,
+            granularity=granularity,
+            cash_flow=cash_flow,
+            region=region,
         )
-        out["realEstate"] = {"values": re_vals}
+        out["realEstate"] = {"values": re_vals, **re_extra}
+
+    # Align labels: union of both, sorted (labels sort chronologically as strings)
+    all_labels = sorted(set(stock_labels) | set(re_labels))
 
-    # Align years: union of both, sorted
-    all_years = sorted(set(stock_years) | set(re_years), key=int)
-    out["years"] = all_years
+    # If both series exist, pad with None so chart can show both (same length as labels)
+    columns: list[list[float | None]] = []
+    if out["stock"]:
+        label_to_stock = dict(zip(stock_labels, stock_vals))
+        columns.append([label_to_stock.get(lb) for lb in all_labels])
+    if out["realEstate"]:
+        label_to_re = dict(zip(re_labels, re_vals))
+        columns.append([label_to_re.get(lb) for lb in all_labels])
 
-    # If both series exist, pad with None so chart can show both (same length as all_years)
+    all_labels, columns = downsample_aligned(all_labels, columns, max_points)
+    out["labels"] = all_labels
+    if granularity == "yearly":
+        out["years"] = all_labels
     if out["stock"]:
-        year_to_stock = dict(zip(stock_years, stock_vals))
-        out["stock"]["values"] = [year_to_stock.get(y) for y in all_years]
+        out["stock"]["values"] = columns.pop(0)
     if out["realEstate"]:
-        year_to_re = dict(zip(re_years, re_vals))
-        out["realEstate"]["values"] = [year_to_re.get(y) for y in all_years]
+        out["realEstate"]["values"] = columns.pop(0)
 
     return out
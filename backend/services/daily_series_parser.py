@@ -0,0 +1,124 @@
+"""
+Incremental parser for Alpha Vantage TIME_SERIES_DAILY_ADJUSTED bodies.
+
+The body is fed chunk by chunk as it downloads. Complete day entries are cut out of the
+buffer at their "}," boundaries, decoded in batches with the C json decoder and appended
+straight into PriceSeries columns, so neither the whole body nor a dict per trading day
+is ever held. Alpha Vantage lists days newest first, which lets a caller stop reading
+once it has everything back to a given date (stop_at).
+"""
+
+import json
+from array import array
+from datetime import date
+
+from backend.services.price_series import PriceSeries
+
+_SERIES_KEY = b'"Time Series (Daily)"'
+_ENTRY_END = b"},"
+
+# PriceSeries column -> field of a day entry
+_FIELDS = (
+    ("open", "1. open"),
+    ("high", "2. high"),
+    ("low", "3. low"),
+    ("volume", "6. volume"),
+    ("dividend", "7. dividend amount"),
+)
+
+
+class DailySeriesParser:
+    """
+    feed(chunk) for each piece of the body (returns False once no more input is
+    needed), then series() for the result. stop_at (ordinal day) ends parsing at the
+    first day on or before it, that day included.
+    """
+
+    def __init__(self, stop_at: int | None = None) -> None:
+        self.stop_at = stop_at
+        self.done = False
+        self._buf = bytearray()
+        self._head = b""
+        self._in_series = False
+        self._ordinals = array("i")
+        self._closes = array("d")
+        self._columns = {name: array("d") for name, _ in _FIELDS}
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return False
+        buf = self._buf
+        buf += chunk
+        if not self._in_series:
+            i = buf.find(_SERIES_KEY)
+            if i < 0:
+                return True  # still in Meta Data, or an error body
+            start = buf.find(b"{", i + len(_SERIES_KEY))
+            if start < 0:
+                return True
+            self._head = bytes(buf[:i])
+            self._in_series = True
+            del buf[: start + 1]
+        cut = buf.rfind(_ENTRY_END)
+        if cut >= 0:
+            self._add(json.loads(b"{" + bytes(buf[:cut + 1]) + b"}"))
+            del buf[: cut + len(_ENTRY_END)]
+        return not self.done
+
+    def _add(self, entries: dict) -> None:
+        if self.done:
+            return
+        add_ordinal, add_close = self._ordinals.append, self._closes.append
+        columns = [(self._columns[name].append, field) for name, field in _FIELDS]
+        parse_day = date.fromisoformat
+        stop_at = self.stop_at
+        for day, row in entries.items():
+            ordinal = parse_day(day).toordinal()
+            add_ordinal(ordinal)
+            add_close(float(row["5. adjusted close"]))
+            for add, field in columns:
+                add(float(row.get(field, "nan")))
+            if stop_at is not None and ordinal <= stop_at:
+                self.done = True
+                return
+
+    def series(self, symbol: str) -> PriceSeries | None:
+        """
+        The parsed days as an ascending PriceSeries (symbol from Meta Data when present,
+        else symbol), or None if the body had no daily series (see error()).
+        """
+        if not self._in_series:
+            return None
+        if not self.done and self._buf.strip():
+            # Last entry: `"day": {...} } }` (the series and root objects close after it)
+            tail = self._buf.decode("utf-8").strip()
+            entry, _ = json.JSONDecoder().raw_decode("{" + tail)
+            self._add(entry)
+            self._buf.clear()
+        if not self._ordinals:
+            return None
+        ordinals, closes, columns = self._ordinals, self._closes, self._columns
+        if any(ordinals[i] <= ordinals[i + 1] for i in range(len(ordinals) - 1)):
+            # Not strictly newest first: sort by date (last entry wins on duplicates)
+            order = sorted(dict(zip(ordinals, range(len(ordinals)))).items(), reverse=True)
+            ordinals = array("i", (o for o, _ in order))
+            closes = array("d", (closes[i] for _, i in order))
+            columns = {n: array("d", (v[i] for _, i in order)) for n, v in columns.items()}
+        for values in (ordinals, closes, *columns.values()):
+            values.reverse()
+        meta = self._meta()
+        return PriceSeries(meta.get("2. Symbol") or symbol, ordinals, closes, **columns)
+
+    def _meta(self) -> dict:
+        # head is `{ "Meta Data": {...},` : close the root object to decode it
+        try:
+            return json.loads(self._head.rstrip().rstrip(b",") + b"}").get("Meta Data") or {}
+        except ValueError:
+            return {}
+
+    def error(self) -> dict:
+        """The decoded body when it had no daily series (Note / Information / Error Message)."""
+        try:
+            return json.loads(self._buf)
+        except ValueError:
+            return {}
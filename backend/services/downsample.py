@@ -0,0 +1,69 @@
+"""
+Server-side downsampling for chart series so payloads stay bounded for long daily ranges.
+"""
+
+from backend.services import metrics
+
+
+def lttb_indices(values: list[float | None], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets: pick at most threshold indices of values that best
+    preserve the visual shape of the line (x = index). None entries are skipped; the
+    first and last non-None points are always kept.
+    """
+    points = [i for i, v in enumerate(values) if v is not None]
+    n = len(points)
+    if n <= threshold:
+        return points
+    if threshold < 3:
+        return [points[0], points[-1]]
+
+    selected = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = points[0]
+    for b in range(threshold - 2):
+        start = int(b * bucket_size) + 1
+        end = int((b + 1) * bucket_size) + 1
+        # Average of the next bucket is the third triangle vertex
+        next_start = end
+        next_end = min(int((b + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        nxt = points[next_start:next_end]
+        avg_x = sum(nxt) / len(nxt)
+        avg_y = sum(values[i] for i in nxt) / len(nxt)
+
+        ax, ay = a, values[a]
+        best, best_area = points[start], -1.0
+        for i in points[start:end]:
+            area = abs((ax - avg_x) * (values[i] - ay) - (ax - i) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        a = best
+    selected.append(points[-1])
+    return selected
+
+
+def downsample_aligned(
+    labels: list[str], series: list[list[float | None]], max_points: int
+) -> tuple[list[str], list[list[float | None]]]:
+    """
+    Reduce labels and several value lists sharing those labels to at most max_points
+    (at least 2). Each series gets an equal share of the budget; the union of the
+    indices LTTB keeps for each series is returned so every series keeps its own peaks
+    and troughs. When the shares overlap badly (many series, a tiny budget) the union
+    is thinned evenly, keeping the first and last label.
+    """
+    if len(labels) <= max_points or not series:
+        return labels, series
+    with metrics.span("downsample"):
+        share = max(3, (max_points - 2) // len(series))
+        keep: set[int] = {0, len(labels) - 1}
+        for values in series:
+            keep.update(lttb_indices(values, share))
+        idx = sorted(keep)
+        if len(idx) > max_points:
+            step = (len(idx) - 1) / (max(max_points, 2) - 1)
+            idx = [idx[round(k * step)] for k in range(max(max_points, 2))]
+        return [labels[i] for i in idx], [[values[i] for i in idx] for values in series]
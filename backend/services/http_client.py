@@ -0,0 +1,227 @@
+"""
+Shared HTTP client for the upstream APIs (Alpha Vantage, RentCast).
+
+One pooled keep-alive session per process (no TCP/TLS handshake per call), gzip
+negotiation, configurable timeouts, and per-call wait/transfer/parse timings aggregated
+per provider. The session itself only retries connections that never reached the
+server; other transient failures (5xx, timeouts, dropped connections) are retried by
+the upstream scheduler with jittered exponential backoff, so every attempt that reaches
+the provider takes a rate-limit token (see is_transient, backoff).
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.retry import Retry
+
+from backend.services import metrics
+
+CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_stats: dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def timeouts() -> tuple[float, float]:
+    """(connect, read) timeouts in seconds: UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT."""
+    return (
+        _env_float("UPSTREAM_CONNECT_TIMEOUT", 5.0),
+        _env_float("UPSTREAM_READ_TIMEOUT", 30.0),
+    )
+
+
+def retries() -> int:
+    """UPSTREAM_RETRIES: how many times one call may be sent again after a transient failure."""
+    return max(0, int(_env_float("UPSTREAM_RETRIES", 3)))
+
+
+def backoff(attempt: int) -> float:
+    """Seconds to wait before retry number attempt (1, 2, ...): exponential plus jitter."""
+    return _env_float("UPSTREAM_BACKOFF_SECONDS", 0.5) * 2 ** (attempt - 1) + random.uniform(
+        0, _env_float("UPSTREAM_BACKOFF_JITTER_SECONDS", 0.5)
+    )
+
+
+def is_transient(outcome: "UpstreamResponse | BaseException") -> bool:
+    """
+    True for a 5xx response or a timeout / dropped connection worth sending again
+    (not for a failure to connect, which the session retries by itself).
+    """
+    if isinstance(outcome, UpstreamResponse):
+        return outcome.status_code in RETRY_STATUSES
+    reason = getattr(outcome.args[0], "reason", None) if outcome.args else None
+    if isinstance(outcome, requests.ConnectTimeout) or isinstance(reason, ConnectTimeoutError):
+        return False  # the session already retried the connection
+    return isinstance(
+        outcome,
+        (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError),
+    )
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session, created on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # Connect errors only: anything else may have reached the provider and
+                # counted against its quota, so the scheduler retries it with a token
+                retry = Retry(
+                    total=retries(),
+                    connect=retries(),
+                    read=0,
+                    status=0,
+                    other=0,
+                    allowed_methods=frozenset({"GET"}),
+                    backoff_factor=_env_float("UPSTREAM_BACKOFF_SECONDS", 0.5),
+                    backoff_jitter=_env_float("UPSTREAM_BACKOFF_JITTER_SECONDS", 0.5),
+                )
+                pool_size = int(_env_float("UPSTREAM_POOL_SIZE", 16))
+                adapter = HTTPAdapter(
+                    pool_connections=4, pool_maxsize=pool_size, max_retries=retry
+                )
+                session = requests.Session()
+                session.headers["Accept-Encoding"] = "gzip, deflate"
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+class UpstreamResponse:
+    """Fully read upstream response: status, raw body and timings (ms)."""
+
+    __slots__ = ("provider", "status_code", "content", "timings")
+
+    def __init__(self, provider: str, status_code: int, content: bytes, timings: dict) -> None:
+        self.provider = provider
+        self.status_code = status_code
+        self.content = content
+        self.timings = timings
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.provider} returned HTTP {self.status_code}")
+
+    def json(self) -> Any:
+        start = time.perf_counter()
+        data = json.loads(self.content)
+        elapsed = time.perf_counter() - start
+        self.timings["parseMs"] = elapsed * 1000
+        metrics.observe("parse", elapsed)
+        _record(self.provider, {"parseMs": self.timings["parseMs"]})
+        return data
+
+
+def get(
+    provider: str,
+    url: str,
+    *,
+    params: dict | None = None,
+    headers: dict | None = None,
+) -> UpstreamResponse:
+    """
+    GET url through the pooled session and read the body in chunks.
+    timings: waitMs (request sent until headers, incl. connect and retries),
+    transferMs (body download and decompression), bytes.
+    """
+    start = time.perf_counter()
+    resp = get_session().get(url, params=params, headers=headers, timeout=timeouts(), stream=True)
+    try:
+        headers_at = time.perf_counter()
+        body = bytearray()
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            body.extend(chunk)
+        done = time.perf_counter()
+    finally:
+        resp.close()
+    timings = {
+        "waitMs": (headers_at - start) * 1000,
+        "transferMs": (done - headers_at) * 1000,
+        "bytes": len(body),
+    }
+    _record(provider, timings, call=True)
+    metrics.observe("upstream", done - start)
+    return UpstreamResponse(provider, resp.status_code, bytes(body), timings)
+
+
+def get_streaming(
+    provider: str,
+    url: str,
+    on_chunk: Callable[[bytes], bool],
+    *,
+    params: dict | None = None,
+    headers: dict | None = None,
+) -> UpstreamResponse:
+    """
+    GET url and pass the (decompressed) body to on_chunk as it arrives instead of
+    buffering it; on_chunk returns False to stop reading early (the connection is then
+    dropped rather than returned to the pool). Time spent in on_chunk is reported as
+    parseMs; the returned response has an empty content. Error statuses (>= 400) are
+    not streamed.
+    """
+    start = time.perf_counter()
+    resp = get_session().get(url, params=params, headers=headers, timeout=timeouts(), stream=True)
+    size = 0
+    parse = 0.0
+    try:
+        headers_at = time.perf_counter()
+        if resp.status_code < 400:
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                t = time.perf_counter()
+                more = on_chunk(chunk)
+                parse += time.perf_counter() - t
+                if not more:
+                    break
+        done = time.perf_counter()
+    finally:
+        resp.close()
+    timings = {
+        "waitMs": (headers_at - start) * 1000,
+        "transferMs": (done - headers_at - parse) * 1000,
+        "parseMs": parse * 1000,
+        "bytes": size,
+    }
+    _record(provider, timings, call=True)
+    metrics.observe("upstream", done - start - parse)
+    metrics.observe("parse", parse)
+    return UpstreamResponse(provider, resp.status_code, b"", timings)
+
+
+def _record(provider: str, timings: dict, call: bool = False) -> None:
+    with _stats_lock:
+        agg = _stats.setdefault(
+            provider,
+            {"calls": 0, "bytes": 0, "waitMs": 0.0, "transferMs": 0.0, "parseMs": 0.0},
+        )
+        if call:
+            agg["calls"] += 1
+        for key, value in timings.items():
+            agg[key] += value
+
+
+def get_stats() -> dict:
+    """Per provider: calls, bytes and total wait/transfer/parse milliseconds."""
+    with _stats_lock:
+        return {
+            name: {k: round(v, 1) if isinstance(v, float) else v for k, v in agg.items()}
+            for name, agg in _stats.items()
+        }
@@ -0,0 +1,170 @@
+"""
+Hot-path timing spans, per request and aggregated into Prometheus histograms.
+
+Code wraps a stage in `with span("upstream"):` (or reports a duration it already
+measured with observe()). Inside a request, time per span name is summed for that
+request: it goes out in the Server-Timing header and, when the request ends, into the
+span histogram (one observation per request and span, so a histogram reads as "time a
+request spent downloading / parsing / ..."). Outside a request (background threads)
+each span is observed directly.
+
+Set METRICS_ENABLED=0 to turn it off: span() then returns a shared no-op context
+manager and no per-request state is kept.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+
+PREFIX = "investment_outlook"
+
+# Histogram upper bounds in seconds (+Inf is implicit)
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_enabled = (os.environ.get("METRICS_ENABLED") or "1").strip().lower() not in (
+    "0", "false", "no", "off",
+)
+
+# Span name -> seconds for the request being served by this thread / greenlet
+_current: ContextVar[dict[str, float] | None] = ContextVar("metrics_spans", default=None)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+# (family, label value) -> Histogram; family is "span" or "request"
+_histograms: dict[tuple[str, str], Histogram] = {}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        observe(self.name, time.perf_counter() - self.start)
+
+
+def span(name: str):
+    """Context manager timing the enclosed block as span name."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def observe(name: str, seconds: float) -> None:
+    """Add an already measured duration to span name."""
+    if not _enabled:
+        return
+    spans = _current.get()
+    if spans is None:
+        with _lock:
+            _histogram("span", name).observe(seconds)
+    else:
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+def _histogram(family: str, label: str) -> Histogram:
+    hist = _histograms.get((family, label))
+    if hist is None:
+        hist = _histograms[(family, label)] = Histogram()
+    return hist
+
+
+def begin_request() -> Token:
+    """Start collecting spans for the current request; pass the token to end_request."""
+    return _current.set({})
+
+
+def end_request(token: Token, endpoint: str, seconds: float) -> dict[str, float]:
+    """Stop collecting, record the request's spans and duration; returns the spans."""
+    spans = _current.get() or {}
+    _current.reset(token)
+    with _lock:
+        for name, value in spans.items():
+            _histogram("span", name).observe(value)
+        _histogram("request", endpoint).observe(seconds)
+    return spans
+
+
+def server_timing(spans: dict[str, float], total: float) -> str:
+    """Server-Timing header value, durations in milliseconds."""
+    parts = [f"{name};dur={value * 1000:.2f}" for name, value in spans.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def format_family(
+    name: str, kind: str, help_text: str, samples: list[tuple[dict[str, str], float]]
+) -> list[str]:
+    """Prometheus text lines for one counter/gauge family of (labels, value) samples."""
+    lines = [f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} {kind}"]
+    for labels, value in samples:
+        text = str(value) if isinstance(value, int) else repr(float(value))
+        lines.append(f"{PREFIX}_{name}{_labels(labels)} {text}")
+    return lines
+
+
+def render_histograms() -> list[str]:
+    """Prometheus text lines for the span and request duration histograms."""
+    families = (
+        ("span", "span_seconds", "span", "Time a request spent in each instrumented stage."),
+        ("request", "request_seconds", "endpoint", "Request duration by endpoint."),
+    )
+    with _lock:
+        snapshot = {
+            key: (list(h.counts), h.sum, h.count) for key, h in _histograms.items()
+        }
+    lines: list[str] = []
+    for family, name, label, help_text in families:
+        full = f"{PREFIX}_{name}"
+        lines += [f"# HELP {full} {help_text}", f"# TYPE {full} histogram"]
+        for (fam, value), (counts, total, count) in sorted(snapshot.items()):
+            if fam != family:
+                continue
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{full}_bucket{_labels({label: value, 'le': le})} {cumulative}")
+            lines.append(f"{full}_sum{_labels({label: value})} {total:.6f}")
+            lines.append(f"{full}_count{_labels({label: value})} {count}")
+    return lines
@@ -0,0 +1,323 @@
+"""
+Monte Carlo outlook: simulated future paths of a stock investment and a leveraged
+property purchase, summarized as percentile bands per month.
+
+Stock paths draw monthly log returns from the symbol's own history (the cached
+get_daily_adjusted series): either bootstrapped (resampled with replacement from the
+calibration window) or GBM (normal with the window's mean and volatility). Property
+paths draw monthly log appreciation from a normal distribution; the mortgage balance is
+deterministic and comes from amortize(), so equity is value minus balance.
+
+Paths are generated as (paths x months) NumPy arrays, CHUNK_PATHS at a time with one
+seed per chunk, so a given seed gives the same answer whether chunks run in this
+process or across the OUTLOOK_WORKERS process pool.
+"""
+
+import calendar
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from backend.services import metrics
+from backend.services.alpha_vantage import get_daily_adjusted
+from backend.services.price_series import iso_date
+from backend.services.real_estate import amortize, parse_date, round_to
+
+METHODS = ("bootstrap", "gbm")
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_PATHS = 10_000
+MAX_PATHS = 100_000
+DEFAULT_HORIZON_YEARS = 10
+MAX_HORIZON_YEARS = 40
+# paths x months: each (paths x months) float64 array is 8 bytes a cell
+MAX_CELLS = 10_000_000
+DEFAULT_LOOKBACK_YEARS = 20
+MIN_CALIBRATION_MONTHS = 12
+DEFAULT_SEED = 0
+# Assumed yearly volatility of property appreciation when none is given
+DEFAULT_APPRECIATION_VOLATILITY_PERCENT = 5.0
+CHUNK_PATHS = 2_500
+# Smaller simulations are not worth shipping to worker processes
+PARALLEL_MIN_CELLS = 2_000_000
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    try:
+        return max(0, int(os.environ.get("OUTLOOK_WORKERS") or 0))
+    except ValueError:
+        return 0
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver / spawn: never fork a process that runs threads (warmer, gevent)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _pool
+
+
+def add_months(d: date, months: int) -> date:
+    """d plus months calendar months (day clamped to the month's length)."""
+    total = d.year * 12 + d.month - 1 + months
+    year, month = divmod(total, 12)
+    month += 1
+    return date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def monthly_log_returns(series, lookback_years: int, end: date) -> tuple[np.ndarray, str, str]:
+    """
+    Log returns between consecutive month-end closes of series over the lookback_years
+    before end (completed months only). Returns (returns, first month end, last month end).
+    """
+    ordinals = np.asarray(series.ordinals, dtype=np.int64)
+    closes = np.asarray(series.closes, dtype=np.float64)
+    end_ordinal = end.toordinal()
+    start_ordinal = add_months(end, -12 * lookback_years).toordinal()
+    lo, hi = np.searchsorted(ordinals, [start_ordinal, end_ordinal], side="right")
+    lo = max(lo - 1, 0)
+    ordinals, closes = ordinals[lo:hi], closes[lo:hi]
+    # Ordinal day -> month number; a month ends where the next row is in a later month
+    months = (ordinals - date(1970, 1, 1).toordinal()).astype("datetime64[D]").astype(
+        "datetime64[M]"
+    ).astype(np.int64)
+    ends = np.flatnonzero(months[1:] != months[:-1])
+    if len(ends) < MIN_CALIBRATION_MONTHS + 1:
+        raise ValueError(
+            f"Not enough price history to calibrate (need {MIN_CALIBRATION_MONTHS} months)"
+        )
+    month_closes = closes[ends]
+    returns = np.diff(np.log(month_closes))
+    return returns, iso_date(int(ordinals[ends[0]])), iso_date(int(ordinals[ends[-1]]))
+
+
+def _simulate_chunk(
+    seed_seq: np.random.SeedSequence,
+    paths: int,
+    months: int,
+    stock: tuple[str, np.ndarray] | None,
+    property_drift: tuple[float, float] | None,
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    """
+    Growth multiples for one chunk: (stock, property), each (paths x months + 1) with
+    column 0 equal to 1, or None for a leg that is not simulated.
+    """
+    rng = np.random.default_rng(seed_seq)
+    stock_growth = property_growth = None
+    if stock is not None:
+        method, returns = stock
+        if method == "bootstrap":
+            steps = returns[rng.integers(0, len(returns), size=(paths, months))]
+        else:
+            steps = rng.normal(returns.mean(), returns.std(ddof=1), size=(paths, months))
+        stock_growth = _growth(steps)
+    if property_drift is not None:
+        mu, sigma = property_drift
+        property_growth = _growth(rng.normal(mu, sigma, size=(paths, months)))
+    return stock_growth, property_growth
+
+
+def _growth(steps: np.ndarray) -> np.ndarray:
+    out = np.empty((steps.shape[0], steps.shape[1] + 1))
+    out[:, 0] = 0.0
+    np.cumsum(steps, axis=1, out=out[:, 1:])
+    return np.exp(out, out=out)
+
+
+def _simulate(
+    seed: int,
+    paths: int,
+    months: int,
+    stock: tuple[str, np.ndarray] | None,
+    property_drift: tuple[float, float] | None,
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    sizes = [min(CHUNK_PATHS, paths - i) for i in range(0, paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(s, n, months, stock, property_drift) for s, n in zip(seeds, sizes)]
+    workers = _workers()
+    if workers > 1 and len(sizes) > 1 and paths * months >= PARALLEL_MIN_CELLS:
+        chunks = list(_get_pool(workers).map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+    return tuple(
+        np.concatenate([c[leg] for c in chunks]) if chunks[0][leg] is not None else None
+        for leg in (0, 1)
+    )
+
+
+def _bands(values: np.ndarray) -> dict:
+    """
+    Percentile bands (p5, p25, ...) per month, rounded for JSON. Same as np.percentile
+    (linear interpolation), but sorting each month's paths as one contiguous row is
+    several times faster than percentile's column-wise selection.
+    """
+    ranked = np.sort(values.T, axis=1)
+    positions = np.asarray(PERCENTILES) / 100.0 * (ranked.shape[1] - 1)
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, ranked.shape[1] - 1)
+    weight = positions - below
+    levels = (ranked[:, below] * (1 - weight) + ranked[:, above] * weight).T
+    return {f"p{p}": np.round(row, 2).tolist() for p, row in zip(PERCENTILES, levels)}
+
+
+def simulate_outlook(
+    *,
+    symbol: str | None = None,
+    invested_amount: float | None = None,
+    purchase_price: float | None = None,
+    down_payment_percent: float | None = None,
+    annual_interest_rate: float | None = None,
+    annual_appreciation_percent: float = 0.0,
+    appreciation_volatility_percent: float = DEFAULT_APPRECIATION_VOLATILITY_PERCENT,
+    loan_term_years: int = 30,
+    start_date: str | None = None,
+    horizon_years: int = DEFAULT_HORIZON_YEARS,
+    paths: int = DEFAULT_PATHS,
+    method: str = "bootstrap",
+    lookback_years: int = DEFAULT_LOOKBACK_YEARS,
+    seed: int = DEFAULT_SEED,
+) -> dict:
+    """
+    Simulate paths month by month for horizon_years from start_date (default today).
+    The stock leg needs symbol and invested_amount; the real estate leg needs
+    purchase_price, down_payment_percent and annual_interest_rate (equity against the
+    down payment, as in /api/compare). At least one leg is required.
+
+    Returns { startDate, months, paths, method, seed, percentiles, labels (month dates),
+    stock: { bands, calibration, summary } or null, realEstate: { bands, downPayment,
+    loanAmount, monthlyPayment, summary } or null, probabilityStockBeatsRealEstate (both
+    legs; null with a zero down payment) }. Bands hold one list per percentile (p5 ...
+    p95), one value per label.
+    """
+    has_stock = bool(symbol) and invested_amount is not None
+    has_re = purchase_price is not None
+    if not has_stock and not has_re:
+        raise ValueError("Provide stock params and/or real estate params")
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    if not 1 <= paths <= MAX_PATHS:
+        raise ValueError(f"paths must be between 1 and {MAX_PATHS}")
+    if not 1 <= horizon_years <= MAX_HORIZON_YEARS:
+        raise ValueError(f"horizonYears must be between 1 and {MAX_HORIZON_YEARS}")
+    cells = paths * horizon_years * 12
+    if cells > MAX_CELLS:
+        raise ValueError(
+            f"Simulation too large ({cells} path-months, max {MAX_CELLS}); use at most "
+            f"{MAX_CELLS // (horizon_years * 12)} paths over {horizon_years} years"
+        )
+    if lookback_years < 1:
+        raise ValueError("lookbackYears must be at least 1")
+    if has_stock and invested_amount <= 0:
+        raise ValueError("Invalid investedAmount")
+    if appreciation_volatility_percent < 0:
+        raise ValueError("appreciationVolatilityPercent must be non-negative")
+
+    start = parse_date(start_date) if start_date else date.today()
+    months = horizon_years * 12
+    labels = [add_months(start, k) for k in range(months + 1)]
+
+    stock = None
+    calibration = None
+    if has_stock:
+        returns, first, last = monthly_log_returns(
+            get_daily_adjusted(symbol, "full"), lookback_years, start
+        )
+        stock = (method, returns)
+        sigma = float(returns.std(ddof=1))
+        calibration = {
+            "from": first,
+            "to": last,
+            "months": len(returns),
+            "annualReturnPercent": round_to((np.exp(12 * returns.mean()) - 1) * 100, 2),
+            "annualVolatilityPercent": round_to(sigma * np.sqrt(12) * 100, 2),
+        }
+
+    property_drift = None
+    re_cols = None
+    if has_re:
+        if down_payment_percent is None or annual_interest_rate is None:
+            raise ValueError("Real estate needs downPaymentPercent and annualInterestRate")
+        # Balance path is deterministic: the existing closed-form amortization
+        re_cols = amortize(
+            purchase_price=purchase_price,
+            down_payment_percent=down_payment_percent,
+            annual_interest_rate=annual_interest_rate,
+            buy_date=start.isoformat(),
+            as_of_dates=[d.isoformat() for d in labels],
+            loan_term_years=loan_term_years,
+        )
+        if annual_appreciation_percent <= -100:
+            raise ValueError("annualAppreciationPercent must be greater than -100")
+        property_drift = (
+            np.log1p(annual_appreciation_percent / 100.0) / 12.0,
+            appreciation_volatility_percent / 100.0 / np.sqrt(12.0),
+        )
+
+    with metrics.span("simulate"):
+        stock_growth, property_growth = _simulate(seed, paths, months, stock, property_drift)
+
+        out = {
+            "startDate": start.isoformat(),
+            "months": months,
+            "paths": paths,
+            "method": method,
+            "seed": seed,
+            "percentiles": list(PERCENTILES),
+            "labels": [d.isoformat() for d in labels],
+            "stock": None,
+            "realEstate": None,
+        }
+        stock_final = re_final = None
+        if stock_growth is not None:
+            values = stock_growth * invested_amount
+            stock_final = values[:, -1]
+            out["stock"] = {
+                "symbol": symbol,
+                "investedAmount": round_to(invested_amount, 2),
+                "calibration": calibration,
+                "bands": _bands(values),
+                "summary": _summary(stock_final, invested_amount),
+            }
+        if property_growth is not None:
+            balances = np.asarray(re_cols["remainingBalance"])
+            equity = property_growth * purchase_price - balances
+            down_payment = re_cols["downPayment"]
+            re_final = equity[:, -1]
+            out["realEstate"] = {
+                "purchasePrice": round_to(purchase_price, 2),
+                "downPayment": round_to(down_payment, 2),
+                "loanAmount": round_to(re_cols["loanAmount"], 2),
+                "monthlyPayment": round_to(re_cols["monthlyPayment"], 2),
+                "annualAppreciationPercent": round_to(annual_appreciation_percent, 2),
+                "appreciationVolatilityPercent": round_to(appreciation_volatility_percent, 2),
+                "bands": _bands(equity),
+                "summary": _summary(re_final, down_payment),
+            }
+        if stock_final is not None and re_final is not None:
+            # Path by path: growth of the cash each leg put in (invested vs down payment);
+            # with no down payment there is no cash to grow, so no comparison
+            down_payment = re_cols["downPayment"]
+            out["probabilityStockBeatsRealEstate"] = round_to(
+                float(np.mean(stock_final / invested_amount > re_final / down_payment)), 4
+            ) if down_payment > 0 else None
+    return out
+
+
+def _summary(final: np.ndarray, cost_basis: float) -> dict:
+    """Mean / median ending value and the share of paths ending below cost_basis."""
+    return {
+        "meanFinal": round_to(float(final.mean()), 2),
+        "medianFinal": round_to(float(np.median(final)), 2),
+        "probabilityOfLoss": round_to(float(np.mean(final < cost_basis)), 4),
+    }
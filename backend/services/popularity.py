@@ -0,0 +1,58 @@
+"""
+Per-symbol request counts, used by the cache warmer to pick the symbols worth keeping
+hot. Counts are kept in memory and added to the price store (one row per symbol and
+day) at most once a minute, so every worker process and the stand-alone warmer see
+the same totals.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from backend.services import series_store
+
+FLUSH_INTERVAL_SECONDS = 60.0
+KEEP_DAYS = 90
+
+_counts: dict[str, int] = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record(symbol: str) -> None:
+    """Count one interactive request for symbol."""
+    global _last_flush
+    key = symbol.upper()
+    with _lock:
+        _counts[key] = _counts.get(key, 0) + 1
+        due = time.monotonic() - _last_flush >= FLUSH_INTERVAL_SECONDS
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush()
+
+
+def flush() -> None:
+    """Write pending counts to the store (kept for the next flush if the write fails)."""
+    with _lock:
+        counts = dict(_counts)
+        _counts.clear()
+    if not counts:
+        return
+    today = date.today()
+    try:
+        series_store.add_request_counts(
+            counts, today.isoformat(), (today - timedelta(days=KEEP_DAYS)).isoformat()
+        )
+    except sqlite3.Error:
+        with _lock:
+            for key, n in counts.items():
+                _counts[key] = _counts.get(key, 0) + n
+
+
+def popular(limit: int, window_days: int) -> list[str]:
+    """The limit most requested symbols over the last window_days days, busiest first."""
+    flush()
+    since = (date.today() - timedelta(days=window_days)).isoformat()
+    return [symbol for symbol, _ in series_store.top_requested(since, limit)]
@@ -0,0 +1,282 @@
+"""
+Multi-symbol portfolio backtest: target weights across N symbols, optional periodic
+rebalancing and dollar-cost-averaging contributions, compared with the real estate
+equity curve over the same dates.
+
+Series are loaded concurrently through a bounded thread pool and aligned on the merged
+trading calendar with one searchsorted per symbol. Holdings only change on rebalance
+and contribution days, so between two such days the portfolio value is one
+matrix-vector product over the aligned closes; only those event days are stepped
+through in Python.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from backend.services.alpha_vantage import to_ordinal, get_daily_adjusted
+from backend.services.downsample import downsample_aligned
+from backend.services.price_series import PriceSeries, iso_date
+from backend.services.real_estate import amortize, round_to
+
+# Alpha Vantage allows 5 calls/minute; never run more downloads than that at once.
+DEFAULT_MAX_FETCH_WORKERS = 5
+MAX_HOLDINGS = 50
+FREQUENCIES = ("none", "monthly", "quarterly", "yearly")
+
+
+def _max_fetch_workers() -> int:
+    try:
+        return max(1, int(os.environ.get("ALPHA_VANTAGE_MAX_CONCURRENCY", DEFAULT_MAX_FETCH_WORKERS)))
+    except ValueError:
+        return DEFAULT_MAX_FETCH_WORKERS
+
+
+def fetch_series(symbols: list[str]) -> dict[str, PriceSeries]:
+    """Load several symbols concurrently (bounded pool). Raises ValueError naming the symbol."""
+    def load(symbol: str) -> PriceSeries:
+        try:
+            return get_daily_adjusted(symbol, "full")
+        except ValueError as e:
+            raise ValueError(f"{symbol}: {e}") from None
+
+    workers = min(len(symbols), _max_fetch_workers()) or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each load runs in a copy of the caller's context so its timing spans count
+        # toward the request that asked for it.
+        futures = [pool.submit(contextvars.copy_context().run, load, s) for s in symbols]
+        return {s: f.result() for s, f in zip(symbols, futures)}
+
+
+def _aligned(
+    series_list: list[PriceSeries], start_date: str, end_date: str | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """(merged ordinals, closes matrix with one row per day and one column per series)."""
+    start = to_ordinal(start_date)
+    end = to_ordinal(end_date) if end_date else None
+
+    parts = []
+    for s in series_list:
+        lo, hi = s.index_range(start, end)
+        parts.append(np.asarray(s.ordinals[lo:hi], dtype=np.int64))
+    merged = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    if not len(merged):
+        raise ValueError("No trading days in the requested range")
+
+    matrix = np.empty((len(merged), len(series_list)))
+    for j, s in enumerate(series_list):
+        # Last close on or before each merged day (forward fill)
+        rows = np.searchsorted(np.asarray(s.ordinals), merged, side="right") - 1
+        if rows[0] < 0:
+            raise ValueError(f"No price data on or before {start_date} for {s.symbol}")
+        matrix[:, j] = np.asarray(s.closes, dtype=np.float64)[rows]
+    return merged, matrix
+
+
+def align_closes(
+    series_list: list[PriceSeries], start_date: str, end_date: str | None = None
+) -> tuple[list[str], list[list[float]]]:
+    """
+    Merge the trading calendars of series_list between start_date and end_date (inclusive)
+    and forward-fill each series onto it. Returns (dates, columns) with one close column per
+    series. Every series must have a price on or before start_date.
+    """
+    merged, matrix = _aligned(series_list, start_date, end_date)
+    return [iso_date(o) for o in merged.tolist()], matrix.T.tolist()
+
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _period_starts(ordinals: np.ndarray, frequency: str) -> np.ndarray:
+    """Boolean per day: True on the first day of a new month / quarter / year (never day 0)."""
+    starts = np.zeros(len(ordinals), dtype=bool)
+    if frequency in ("monthly", "quarterly", "yearly"):
+        months = (ordinals - _EPOCH).astype("datetime64[D]").astype("datetime64[M]").astype(
+            np.int64
+        )
+        keys = months // {"monthly": 1, "quarterly": 3, "yearly": 12}[frequency]
+        starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+
+def backtest_portfolio(
+    *,
+    holdings: list[dict],
+    invested_amount: float,
+    buy_date: str,
+    sell_date: str | None = None,
+    rebalance: str = "none",
+    contribution_amount: float = 0.0,
+    contribution_frequency: str = "monthly",
+    series_by_symbol: dict[str, PriceSeries] | None = None,
+) -> dict:
+    """
+    Backtest a weighted portfolio. holdings: [{symbol, weight}] (weights are normalized).
+    Buys at the first merged trading day on/after buy_date (using each symbol's last close),
+    rebalances to target weights on the first trading day of each rebalance period and
+    invests contribution_amount split by target weight on the first trading day of each
+    contribution period. Returns { dates, values, contributed, holdings, summary }.
+    """
+    if not holdings or len(holdings) > MAX_HOLDINGS:
+        raise ValueError(f"Provide between 1 and {MAX_HOLDINGS} holdings")
+    if invested_amount is None or invested_amount <= 0:
+        raise ValueError("investedAmount must be positive")
+    if rebalance not in FREQUENCIES:
+        raise ValueError(f"rebalance must be one of {', '.join(FREQUENCIES)}")
+    if contribution_amount < 0:
+        raise ValueError("Contribution amount must be non-negative")
+    if contribution_amount and contribution_frequency not in FREQUENCIES[1:]:
+        raise ValueError(f"Contribution frequency must be one of {', '.join(FREQUENCIES[1:])}")
+
+    symbols: list[str] = []
+    weights: list[float] = []
+    for h in holdings:
+        symbol = str(h.get("symbol") or "").strip().upper()
+        weight = float(h.get("weight") or 0)
+        if not symbol or weight <= 0:
+            raise ValueError("Each holding needs a symbol and a positive weight")
+        if symbol in symbols:
+            raise ValueError(f"Duplicate holding {symbol}")
+        symbols.append(symbol)
+        weights.append(weight)
+    total_weight = sum(weights)
+    weights = [w / total_weight for w in weights]
+
+    if series_by_symbol is None:
+        series_by_symbol = fetch_series(symbols)
+    ordinals, closes = _aligned([series_by_symbol[s] for s in symbols], buy_date, sell_date)
+    dates = [iso_date(o) for o in ordinals.tolist()]
+    w = np.array(weights)
+
+    rebalance_days = _period_starts(ordinals, rebalance)
+    contribution_days = _period_starts(
+        ordinals, contribution_frequency if contribution_amount else "none"
+    )
+    events = np.flatnonzero(rebalance_days | contribution_days).tolist()
+
+    shares = invested_amount * w / closes[0]
+    # Fund-style units so drawdown measures performance, not contributions
+    units = float(invested_amount)
+    unit_counts = np.empty(len(ordinals))
+    values = np.empty(len(ordinals))
+    bounds = [0, *events, len(ordinals)]
+    for a, b in zip(bounds, bounds[1:]):
+        if a:
+            row = closes[a]
+            value = float(row @ shares)
+            if contribution_days[a]:
+                units += contribution_amount * units / value
+                value += contribution_amount
+                if not rebalance_days[a]:
+                    shares = shares + contribution_amount * w / row
+            if rebalance_days[a]:
+                shares = value * w / row
+        values[a:b] = closes[a:b] @ shares
+        unit_counts[a:b] = units
+    contributed_days = np.cumsum(contribution_days) * contribution_amount + invested_amount
+    contributed_total = float(contributed_days[-1])
+
+    nav = values / unit_counts
+    peak_nav = np.maximum.accumulate(np.maximum(nav, 1.0))
+    max_drawdown = float(np.max(1 - nav / peak_nav))
+    values = values.tolist()
+    contributed = contributed_days.tolist()
+
+    final_value = values[-1]
+    gain_loss = final_value - contributed_total
+
+    return {
+        "dates": dates,
+        "values": values,
+        "contributed": contributed,
+        "holdings": [
+            {
+                "symbol": s,
+                "weight": round_to(w, 6),
+                "shares": round_to(sh, 6),
+                "value": round_to(sh * c, 2),
+            }
+            for s, w, sh, c in zip(symbols, weights, shares.tolist(), closes[-1].tolist())
+        ],
+        "summary": {
+            "startDate": dates[0],
+            "endDate": dates[-1],
+            "totalContributed": round_to(contributed_total, 2),
+            "finalValue": round_to(final_value, 2),
+            "gainLoss": round_to(gain_loss, 2),
+            "gainLossPercent": round_to(gain_loss / contributed_total * 100.0, 2),
+            "maxDrawdownPercent": round_to(max_drawdown * 100.0, 2),
+        },
+    }
+
+
+def compare_portfolio(
+    *,
+    holdings: list[dict],
+    invested_amount: float,
+    buy_date: str,
+    sell_date: str | None = None,
+    rebalance: str = "none",
+    contribution_amount: float = 0.0,
+    contribution_frequency: str = "monthly",
+    real_estate: dict | None = None,
+    max_points: int = 1000,
+) -> dict:
+    """
+    Portfolio backtest plus (optionally) the real estate equity curve on the same dates.
+    real_estate holds amortize() keyword args except as_of_dates, plus as_of_date; equity
+    is None outside [buy_date, as_of_date]. Curves are downsampled to max_points.
+    """
+    if max_points < 3:
+        raise ValueError("maxPoints must be at least 3")
+    result = backtest_portfolio(
+        holdings=holdings,
+        invested_amount=invested_amount,
+        buy_date=buy_date,
+        sell_date=sell_date,
+        rebalance=rebalance,
+        contribution_amount=contribution_amount,
+        contribution_frequency=contribution_frequency,
+    )
+    dates = result["dates"]
+    columns: list[list[float | None]] = [result["values"], result["contributed"]]
+
+    re_summary = None
+    if real_estate:
+        re_args = dict(real_estate)
+        as_of = re_args.pop("as_of_date")
+        cols = amortize(as_of_dates=dates, **re_args)
+        columns.append([
+            eq if re_args["buy_date"] <= d <= as_of else None
+            for d, eq in zip(dates, cols["equity"])
+        ])
+        final = amortize(as_of_dates=[as_of], **re_args)
+        re_gain = final["equity"][0] - final["downPayment"]
+        re_summary = {
+            "asOfDate": as_of,
+            "downPayment": round_to(final["downPayment"], 2),
+            "equityAtAsOf": round_to(final["equity"][0], 2),
+            "gainLoss": round_to(re_gain, 2),
+            "gainLossPercent": round_to(
+                re_gain / final["downPayment"] * 100.0 if final["downPayment"] else 0.0, 2
+            ),
+        }
+
+    dates, columns = downsample_aligned(dates, columns, max_points)
+    rounded = [[round_to(v, 2) if v is not None else None for v in col] for col in columns]
+    return {
+        "dates": dates,
+        "portfolio": {
+            "values": rounded[0],
+            "contributed": rounded[1],
+            "holdings": result["holdings"],
+            "summary": result["summary"],
+        },
+        "realEstate": (
+            {"values": rounded[2], "summary": re_summary} if real_estate else None
+        ),
+    }
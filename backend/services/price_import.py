@@ -0,0 +1,74 @@
+"""
+Bulk import of end-of-day price files (CSV / Parquet, see price_sources) into the local
+price store, e.g. to seed a whole universe from licensed data with no upstream calls.
+
+Files are parsed in a process pool; each worker sends back compact PriceSeries bytes
+and this process writes them to the store as full histories, one symbol at a time
+(SQLite has a single writer anyway).
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+
+from backend.services import price_sources, series_store
+from backend.services.price_series import PriceSeries
+
+
+def import_files(
+    paths: list[str],
+    *,
+    workers: int | None = None,
+    symbols: set[str] | None = None,
+    progress: Callable[[str, int, str | None], None] | None = None,
+) -> dict:
+    """
+    Import every price file under paths (files or directories). symbols limits the
+    import to those symbols; workers defaults to the CPU count (1 parses in-process).
+    progress(path, symbols imported from it, error or None) is called per file.
+    Returns { files, symbols, rows, seconds, failed: { path: error } }.
+    """
+    start = time.perf_counter()
+    files = price_sources.find_files(paths)
+    result: dict = {"files": len(files), "symbols": 0, "rows": 0, "seconds": 0.0, "failed": {}}
+    workers = workers or os.cpu_count() or 1
+
+    def store(path: str, parsed: list[tuple[str, bytes]]) -> None:
+        count = 0
+        for symbol, data in parsed:
+            if symbols is not None and symbol not in symbols:
+                continue
+            series = PriceSeries.from_bytes(data, copy=True)
+            series_store.save_series(symbol, series, full=True)
+            count += 1
+            result["symbols"] += 1
+            result["rows"] += len(series)
+        if progress:
+            progress(path, count, None)
+
+    def fail(path: str, error: Exception) -> None:
+        result["failed"][path] = str(error)
+        if progress:
+            progress(path, 0, str(error))
+
+    if workers <= 1 or len(files) <= 1:
+        for path in files:
+            try:
+                store(path, price_sources.parse_to_bytes(path))
+            except (OSError, ValueError) as e:
+                fail(path, e)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            futures = {pool.submit(price_sources.parse_to_bytes, path): path for path in files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    parsed = future.result()
+                except (OSError, ValueError) as e:
+                    fail(path, e)
+                    continue
+                store(path, parsed)
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
@@ -0,0 +1,186 @@
+"""
+Compact columnar daily price series.
+
+A series is a handful of typed arrays: ordinal days (int32, ascending) and adjusted
+closes (float64), plus optional open / high / low / volume / dividend columns. That is
+12 bytes per trading day instead of a date string, a float object and two list slots
+(~100 bytes), so hundreds of symbols stay resident. Date strings are produced only for
+the rows a response actually returns, from one cache shared by all symbols.
+
+to_bytes() / from_bytes() use a flat little-endian layout with 8-byte aligned columns;
+from_bytes() can return columns that are memoryviews into the given buffer (no copy).
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+
+OPTIONAL_COLUMNS = ("open", "high", "low", "volume", "dividend")
+
+MAGIC = b"PSER"
+VERSION = 1
+# magic, version, flags (bit 0: has_full), optional column mask, row count,
+# refreshed_at, symbol length
+_HEADER = struct.Struct("<4sHBBIdH10x")
+_LITTLE = sys.byteorder == "little"
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+@lru_cache(maxsize=1 << 16)
+def iso_date(ordinal: int) -> str:
+    """YYYY-MM-DD for an ordinal day (cached: ~180 years of days fit)."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+class PriceSeries:
+    """
+    Daily series of one symbol. ordinals / closes (and any optional column) are
+    equal-length sequences of numbers: array("i") / array("d"), or memoryviews when
+    loaded with from_bytes. has_full marks a full-history download, refreshed_at is
+    the epoch time it was last refreshed from upstream.
+    """
+
+    __slots__ = (
+        "symbol", "ordinals", "closes", "open", "high", "low", "volume", "dividend",
+        "has_full", "refreshed_at",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        ordinals,
+        closes,
+        *,
+        has_full: bool = False,
+        refreshed_at: float = 0.0,
+        **columns,
+    ) -> None:
+        if len(ordinals) != len(closes):
+            raise ValueError("ordinals and closes must have the same length")
+        self.symbol = symbol
+        self.ordinals = ordinals
+        self.closes = closes
+        for name in OPTIONAL_COLUMNS:
+            values = columns.pop(name, None)
+            if values is not None and len(values) != len(ordinals):
+                raise ValueError(f"{name} column must have one value per date")
+            setattr(self, name, values)
+        if columns:
+            raise TypeError(f"Unknown columns: {', '.join(columns)}")
+        self.has_full = has_full
+        self.refreshed_at = refreshed_at
+
+    @classmethod
+    def from_dates(
+        cls, symbol: str, dates: list[str], closes: list[float], **kwargs
+    ) -> "PriceSeries":
+        """Build from ascending YYYY-MM-DD strings and floats; optional columns as lists."""
+        for name in OPTIONAL_COLUMNS:
+            if kwargs.get(name) is not None:
+                kwargs[name] = array("d", kwargs[name])
+        return cls(
+            symbol,
+            array("i", (date.fromisoformat(d).toordinal() for d in dates)),
+            array("d", closes),
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def date_at(self, i: int) -> str:
+        return iso_date(self.ordinals[i])
+
+    def dates(self, start: int = 0, end: int | None = None) -> list[str]:
+        """YYYY-MM-DD strings for rows start:end."""
+        return [iso_date(o) for o in self.ordinals[start:end]]
+
+    def index_on_or_before(self, ordinal: int) -> int:
+        """Index of the last row on or before ordinal, or -1. O(log n)."""
+        return bisect_right(self.ordinals, ordinal) - 1
+
+    def index_range(self, start: int | None = None, end: int | None = None) -> tuple[int, int]:
+        """(lo, hi) so rows lo:hi have start <= ordinal <= end (either bound optional)."""
+        lo = bisect_left(self.ordinals, start) if start is not None else 0
+        hi = bisect_right(self.ordinals, end) if end is not None else len(self.ordinals)
+        return lo, hi
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Names of the optional columns present."""
+        return tuple(name for name in OPTIONAL_COLUMNS if getattr(self, name) is not None)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns."""
+        total = len(self.ordinals) * 4 + len(self.closes) * 8
+        return total + sum(len(getattr(self, name)) * 8 for name in self.columns)
+
+    def to_bytes(self) -> bytes:
+        """Serialize: header, symbol, then ordinals, closes and optional columns, 8-byte aligned."""
+        present = self.columns
+        mask = sum(1 << OPTIONAL_COLUMNS.index(name) for name in present)
+        symbol = self.symbol.encode("utf-8")
+        parts = [
+            _HEADER.pack(
+                MAGIC, VERSION, 1 if self.has_full else 0, mask, len(self),
+                self.refreshed_at, len(symbol),
+            ),
+            symbol.ljust(_pad8(len(symbol)), b"\0"),
+        ]
+        for typecode, values in [("i", self.ordinals), ("d", self.closes)] + [
+            ("d", getattr(self, name)) for name in present
+        ]:
+            buf = array(typecode, values)
+            if not _LITTLE:
+                buf.byteswap()
+            raw = buf.tobytes()
+            parts.append(raw.ljust(_pad8(len(raw)), b"\0"))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, copy: bool = False) -> "PriceSeries":
+        """
+        Load a to_bytes() buffer (bytes, bytearray, mmap, ...). Columns are memoryviews
+        into data unless copy is set (arrays: one memcpy each, slightly faster to index).
+        """
+        view = memoryview(data).cast("B")
+        if len(view) < _HEADER.size:
+            raise ValueError("Truncated price series")
+        magic, version, flags, mask, count, refreshed_at, symbol_len = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a price series buffer")
+        offset = _HEADER.size
+        symbol = bytes(view[offset:offset + symbol_len]).decode("utf-8")
+        offset += _pad8(symbol_len)
+
+        def column(typecode: str, itemsize: int):
+            nonlocal offset
+            size = count * itemsize
+            if offset + size > len(view):
+                raise ValueError("Truncated price series")
+            raw = view[offset:offset + size]
+            offset += _pad8(size)
+            if _LITTLE and not copy:
+                return raw.cast(typecode)
+            values = array(typecode)
+            values.frombytes(raw)
+            if not _LITTLE:
+                values.byteswap()
+            return values
+
+        ordinals = column("i", 4)
+        closes = column("d", 8)
+        extra = {
+            name: column("d", 8) for i, name in enumerate(OPTIONAL_COLUMNS) if mask & (1 << i)
+        }
+        return cls(
+            symbol, ordinals, closes,
+            has_full=bool(flags & 1), refreshed_at=refreshed_at, **extra,
+        )
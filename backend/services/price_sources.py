@@ -0,0 +1,281 @@
+"""
+Pluggable daily price sources.
+
+get_daily_adjusted downloads through one PriceSource, chosen with PRICE_SOURCE:
+"alphavantage" (default, see alpha_vantage.AlphaVantageSource), or "csv" / "parquet"
+to read end-of-day files from PRICE_SOURCE_PATH with no network at all. The file
+readers are also what the bulk importer (import_prices.py) uses to seed the store.
+
+File layout: one file per symbol (<SYMBOL>.csv, .csv.gz or .parquet; the file name is
+the symbol) or multi-symbol files with a symbol / ticker column. Columns are matched
+by name, ignoring case, spaces and punctuation: a date, an adjusted close (or close),
+and optionally open, high, low, volume and dividend.
+"""
+
+import csv
+import gzip
+import math
+import os
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date
+from functools import lru_cache
+
+from backend.services.price_series import OPTIONAL_COLUMNS, PriceSeries
+from backend.services.upstream import INTERACTIVE
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet files
+    pq = None
+
+CSV_SUFFIXES = (".csv", ".csv.gz")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+# Normalized column name -> field; the first match in each tuple wins
+_COLUMN_NAMES = {
+    "date": ("date", "timestamp", "day", "tradedate"),
+    "close": ("adjustedclose", "adjclose", "closeadjusted", "close"),
+    "symbol": ("symbol", "ticker"),
+    "open": ("open",),
+    "high": ("high",),
+    "low": ("low",),
+    "volume": ("volume",),
+    "dividend": ("dividend", "dividendamount", "dividends"),
+}
+
+
+class PriceSource(ABC):
+    """
+    A backend get_daily_adjusted can load a symbol's history from. incremental sources
+    understand outputsize="compact" and stop_at (ordinal day: the caller already has
+    everything up to it); others always return the whole history.
+    """
+
+    name = "base"
+    incremental = False
+
+    @abstractmethod
+    def fetch(
+        self,
+        symbol: str,
+        outputsize: str = "full",
+        priority: int = INTERACTIVE,
+        stop_at: int | None = None,
+    ) -> PriceSeries:
+        """Return symbol's daily series, or raise ValueError (unknown symbol, no data...)."""
+
+
+def _normalize(name: str) -> str:
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _match_columns(header: list[str], path: str) -> dict[str, int]:
+    """Field -> column index for a header row."""
+    normalized = {_normalize(h): i for i, h in reversed(list(enumerate(header)))}
+    fields = {}
+    for field, names in _COLUMN_NAMES.items():
+        for name in names:
+            if name in normalized:
+                fields[field] = normalized[name]
+                break
+    for required in ("date", "close"):
+        if required not in fields:
+            raise ValueError(f"{path}: no {required} column")
+    return fields
+
+
+def _symbol_from_path(path: str) -> str:
+    name = os.path.basename(path)
+    for suffix in CSV_SUFFIXES + PARQUET_SUFFIXES:
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return name.upper()
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_day(value) -> int:
+    """Ordinal day of a YYYY-MM-DD string (time part ignored), YYYYMMDD or date (cached)."""
+    if isinstance(value, date):
+        return value.toordinal()
+    text = str(value).strip()[:10]
+    if len(text) == 8 and text.isdigit():
+        text = f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    return date.fromisoformat(text).toordinal()
+
+
+def _floats(values, path: str, field: str) -> array:
+    """array("d") of a column; empty cells are NaN."""
+    try:
+        return array("d", map(float, values))
+    except (TypeError, ValueError):
+        pass
+    out = array("d")
+    for v in values:
+        if v is None or v == "":
+            out.append(math.nan)
+            continue
+        try:
+            out.append(float(v))
+        except (TypeError, ValueError):
+            raise ValueError(f"{path}: invalid {field} value {v!r}") from None
+    return out
+
+
+def _series(symbol: str, rows: list, fields: dict[str, int], path: str) -> PriceSeries | None:
+    """One symbol's rows (any order; the last row for a day wins) as an ascending series."""
+    width = max(fields.values()) + 1
+    if any(len(row) < width for row in rows):
+        raise ValueError(f"{path}: rows with missing columns")
+    columns = list(zip(*rows))
+    try:
+        days = list(map(_parse_day, columns[fields["date"]]))
+    except (TypeError, ValueError):
+        raise ValueError(f"{path}: invalid date in {symbol} rows") from None
+    closes = _floats(columns[fields["close"]], path, "close")
+    extra = {
+        name: _floats(columns[fields[name]], path, name)
+        for name in OPTIONAL_COLUMNS if name in fields
+    }
+    keep = [i for i, c in enumerate(closes) if not math.isnan(c)]
+    if len(keep) < len(closes):
+        days = [days[i] for i in keep]
+        closes = array("d", (closes[i] for i in keep))
+        extra = {name: array("d", (col[i] for i in keep)) for name, col in extra.items()}
+    if not days:
+        return None
+    if all(a < b for a, b in zip(days, days[1:])):
+        order = None
+    elif all(a > b for a, b in zip(days, days[1:])):
+        order = range(len(days) - 1, -1, -1)  # newest first
+    else:
+        last = {d: i for i, d in enumerate(days)}
+        order = [last[d] for d in sorted(last)]
+    if order is not None:
+        days = [days[i] for i in order]
+        closes = array("d", (closes[i] for i in order))
+        extra = {name: array("d", (col[i] for i in order)) for name, col in extra.items()}
+    extra = {name: col for name, col in extra.items() if not all(math.isnan(x) for x in col)}
+    return PriceSeries(symbol, array("i", days), closes, **extra)
+
+
+def _collect(rows, fields: dict[str, int], default_symbol: str, path: str) -> dict[str, PriceSeries]:
+    symbol_i = fields.get("symbol")
+    if symbol_i is None:
+        groups = {default_symbol: list(rows)}
+    else:
+        groups: dict[str, list] = {}
+        for row in rows:
+            if len(row) <= symbol_i:
+                raise ValueError(f"{path}: rows with missing columns")
+            groups.setdefault(str(row[symbol_i]).strip().upper(), []).append(row)
+    out = {}
+    for symbol, group in groups.items():
+        series = _series(symbol, group, fields, path) if group else None
+        if series is not None:
+            out[symbol] = series
+    return out
+
+
+def read_csv(path: str) -> dict[str, PriceSeries]:
+    """Series per symbol in a CSV (or gzipped CSV) file."""
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return {}
+        fields = _match_columns(header, path)
+        return _collect(reader, fields, _symbol_from_path(path), path)
+
+
+def read_parquet(path: str) -> dict[str, PriceSeries]:
+    """Series per symbol in a Parquet file (needs pyarrow)."""
+    if pq is None:
+        raise ValueError("Reading Parquet files needs pyarrow (pip install pyarrow)")
+    table = pq.read_table(path)
+    fields = _match_columns(table.column_names, path)
+    wanted = sorted(set(fields.values()))
+    columns = [table.column(i).to_pylist() for i in wanted]
+    position = {i: p for p, i in enumerate(wanted)}
+    remapped = {field: position[i] for field, i in fields.items()}
+    return _collect(zip(*columns), remapped, _symbol_from_path(path), path)
+
+
+def read_file(path: str) -> dict[str, PriceSeries]:
+    """read_csv or read_parquet by file suffix."""
+    lower = path.lower()
+    if lower.endswith(PARQUET_SUFFIXES):
+        return read_parquet(path)
+    if lower.endswith(CSV_SUFFIXES):
+        return read_csv(path)
+    raise ValueError(f"{path}: not a CSV or Parquet file")
+
+
+def find_files(paths: list[str]) -> list[str]:
+    """Price files among paths; directories are searched recursively."""
+    suffixes = CSV_SUFFIXES + PARQUET_SUFFIXES
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                out.extend(
+                    os.path.join(root, n) for n in sorted(names) if n.lower().endswith(suffixes)
+                )
+        else:
+            out.append(path)
+    return out
+
+
+class FileSource(PriceSource):
+    """One file per symbol under a directory: <root>/<SYMBOL><suffix>."""
+
+    suffixes: tuple[str, ...] = ()
+
+    def __init__(self, root: str) -> None:
+        if not root or not os.path.isdir(root):
+            raise ValueError(f"PRICE_SOURCE_PATH {root!r} is not a directory")
+        self.root = root
+
+    def _path(self, symbol: str) -> str | None:
+        for name in (symbol.upper(), symbol.lower(), symbol):
+            for suffix in self.suffixes:
+                path = os.path.join(self.root, name + suffix)
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def fetch(
+        self,
+        symbol: str,
+        outputsize: str = "full",
+        priority: int = INTERACTIVE,
+        stop_at: int | None = None,
+    ) -> PriceSeries:
+        path = self._path(symbol)
+        if path is None:
+            raise ValueError(f"No price file for {symbol.upper()} in {self.root}")
+        series = read_file(path).get(symbol.upper())
+        if series is None:
+            raise ValueError(f"No prices for {symbol.upper()} in {path}")
+        return series
+
+
+class CsvSource(FileSource):
+    name = "csv"
+    suffixes = CSV_SUFFIXES
+
+
+class ParquetSource(FileSource):
+    name = "parquet"
+    suffixes = PARQUET_SUFFIXES
+
+
+FILE_SOURCES = {"csv": CsvSource, "parquet": ParquetSource}
+
+
+def parse_to_bytes(path: str) -> list[tuple[str, bytes]]:
+    """read_file as (symbol, PriceSeries.to_bytes()) pairs: cheap to send between processes."""
+    return [(symbol, series.to_bytes()) for symbol, series in read_file(path).items()]
+
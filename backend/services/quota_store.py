@@ -0,0 +1,87 @@
+"""
+Upstream quota state shared by every process on a host (SQLite, stdlib only).
+
+The scheduler's token buckets (see upstream) are read from and written back to this
+file inside one IMMEDIATE transaction per decision, so N gunicorn workers together
+stay within 5/minute and 25/day on Alpha Vantage and 50/month on RentCast, and a
+restart does not hand out a fresh month. Buckets are stored with wall-clock times.
+
+UPSTREAM_QUOTA_PATH (default quota.sqlite3 next to the price store) picks the file;
+"off" keeps buckets in process memory, i.e. quotas per process.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+from backend.services import series_store
+from backend.services.sqlite_pool import ConnectionPool
+
+DEFAULT_NAME = "quota.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    provider TEXT NOT NULL,
+    period REAL NOT NULL,
+    capacity INTEGER NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (provider, period)
+);
+"""
+
+
+def get_path() -> str | None:
+    """The shared quota file, or None for per-process buckets (UPSTREAM_QUOTA_PATH=off)."""
+    path = os.environ.get("UPSTREAM_QUOTA_PATH") or os.path.join(
+        os.path.dirname(series_store.get_store_path()), DEFAULT_NAME
+    )
+    if path.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    return path
+
+
+def _setup(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+
+
+_pool = ConnectionPool(lambda: get_path() or "", _setup)
+
+
+@contextmanager
+def synced(provider: str, buckets: list) -> Iterator[None]:
+    """
+    Load provider's buckets (objects with capacity, period, tokens, updated) from the
+    shared file, run the block with other processes locked out, then write them back.
+    A no-op when shared quotas are off.
+    """
+    if get_path() is None:
+        yield
+        return
+    with _pool.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored = {
+                period: (capacity, tokens, updated)
+                for period, capacity, tokens, updated in conn.execute(
+                    "SELECT period, capacity, tokens, updated FROM buckets WHERE provider = ?",
+                    (provider,),
+                )
+            }
+            for b in buckets:
+                if b.period in stored:
+                    _, tokens, updated = stored[b.period]
+                    # A lowered limit applies at once; a raised one refills over time
+                    b.tokens, b.updated = min(tokens, b.capacity), updated
+            yield
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (provider, period, capacity, tokens, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(provider, b.period, b.capacity, b.tokens, b.updated) for b in buckets],
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
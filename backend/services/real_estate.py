@@ -1,9 +1,14 @@
 """
 Hypothetical real estate investment: mortgage math and equity at a given date.
-No external API: uses purchase price, down payment %, rate, and optional appreciation.
+No external API: uses purchase price, down payment %, rate, and optional appreciation
+(a constant rate, or a region's historical home price index from regional_data).
 """
 
-from datetime import datetime
+from datetime import date
+
+import numpy as np
+
+from backend.services import metrics, regional_data
 
 
 def round_to(n: float, digits: int) -> float:
@@ -11,43 +16,78 @@ def round_to(n: float, digits: int) -> float:
     return round(n * m) / m
 
 
-def _months_between(start_date: str, end_date: str) -> int:
-    """Return number of full months from start_date to end_date (YYYY-MM-DD)."""
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    if end < start:
-        return 0
-    return (end.year - start.year) * 12 + (end.month - start.month)
+def parse_date(date_str: str) -> date:
+    try:
+        return date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date {date_str!r}, expected YYYY-MM-DD") from None
 
 
-def _years_between(start_date: str, end_date: str) -> float:
-    """Return fractional years between two dates."""
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    delta = (end - start).days
-    return delta / 365.25
+def remaining_balance(loan_amount, annual_interest_rate, payments, loan_term_months):
+    """
+    Balance left on loan_amount after payments monthly payments of a loan_term_months
+    loan at annual_interest_rate percent (closed form, never below 0).
 
+    Without NumPy arrays this is plain float math (one float, or a list of them when
+    payments is a list; (1+r)**n is computed once). If any argument is an array, all of
+    them (the term included) broadcast elementwise and the result is an array; the
+    vectorized power can differ from the scalar one in the last bit.
+    """
+    n = loan_term_months
+    vectorized = (
+        isinstance(loan_amount, np.ndarray)
+        or isinstance(annual_interest_rate, np.ndarray)
+        or isinstance(payments, np.ndarray)
+        or isinstance(n, np.ndarray)
+    )
+    if not vectorized:
+        counts = payments if isinstance(payments, list) else [payments]
+        r = (annual_interest_rate / 100.0) / 12.0
+        if r == 0:
+            balances = [max(0.0, loan_amount - loan_amount / n * k) for k in counts]
+        else:
+            growth = 1 + r
+            growth_n = growth**n
+            denom = growth_n - 1
+            balances = [max(0.0, loan_amount * (growth_n - growth**k) / denom) for k in counts]
+        return balances if isinstance(payments, list) else balances[0]
+    r = np.asarray(annual_interest_rate, dtype=np.float64) / 100.0 / 12.0
+    k = np.asarray(payments, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_n = (1 + r) ** n
+        balance = np.where(
+            r == 0,
+            loan_amount - loan_amount / n * k,
+            loan_amount * (growth_n - (1 + r) ** k) / (growth_n - 1),
+        )
+    return np.maximum(balance, 0.0)
 
-def compute_hypothetical_real_estate(
-    *,
+
+def appreciation_factor(annual_appreciation_percent, days):
+    """
+    Value multiple after days days of constant appreciation, compounded over days /
+    365.25 years (no change for days <= 0); every constant-rate property value uses it.
+    Scalars give a float and a list of days a list; with a NumPy array for either
+    argument they broadcast and the result is an array.
+    """
+    if isinstance(days, np.ndarray) or isinstance(annual_appreciation_percent, np.ndarray):
+        growth = 1 + np.asarray(annual_appreciation_percent, dtype=np.float64) / 100.0
+        return growth ** (np.maximum(days, 0) / 365.25)
+    growth = 1 + annual_appreciation_percent / 100.0
+    if isinstance(days, list):
+        return [growth ** (max(0, d) / 365.25) for d in days]
+    return growth ** (max(0, days) / 365.25)
+
+
+def loan_terms(
     purchase_price: float,
     down_payment_percent: float,
     annual_interest_rate: float,
-    buy_date: str,
-    as_of_date: str,
-    annual_appreciation_percent: float = 0.0,
-    loan_term_years: int = 30,
-) -> dict:
+    loan_term_years: int,
+) -> tuple[float, float, float]:
     """
-    Compute hypothetical real estate position at as_of_date.
-
-    Uses a standard 30-year (or loan_term_years) fixed mortgage. No property API;
-    optional annual_appreciation_percent applies to estimated value at as_of_date.
-
-    Returns dict with: purchasePrice, downPaymentPercent, downPayment, loanAmount,
-    annualInterestRate, monthlyPayment, buyDate, asOfDate, paymentsMade, remainingBalance,
-    estimatedValueAtAsOf, equityAtAsOf, totalPrincipalPaid, gainLoss, gainLossPercent
-    (gain/loss on the down payment / cash invested).
+    Validate a purchase and return (down payment, loan amount, monthly payment).
+    Raises ValueError for a price, down payment or rate amortize() would reject.
     """
     if purchase_price <= 0 or down_payment_percent < 0 or down_payment_percent >= 100:
         raise ValueError("Invalid purchase price or down payment percent")
@@ -61,55 +101,146 @@ def compute_hypothetical_real_estate(
 
     n = loan_term_years * 12
     r = (annual_interest_rate / 100.0) / 12.0
+    growth_n = (1 + r) ** n
     if r == 0:
         monthly_payment = loan_amount / n
     else:
-        monthly_payment = loan_amount * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
+        monthly_payment = loan_amount * (r * growth_n) / (growth_n - 1)
+    return down_payment, loan_amount, monthly_payment
 
-    months_elapsed = _months_between(buy_date, as_of_date)
-    if months_elapsed < 0:
-        raise ValueError("as_of_date must be on or after buy_date")
-    payments_made = min(months_elapsed, n)
 
-    if r == 0:
-        remaining_balance = loan_amount - (loan_amount / n) * payments_made
-    else:
-        remaining_balance = (
-            loan_amount
-            * ((1 + r) ** n - (1 + r) ** payments_made)
-            / ((1 + r) ** n - 1)
-        )
-    remaining_balance = max(0.0, remaining_balance)
+def amortize(
+    *,
+    purchase_price: float,
+    down_payment_percent: float,
+    annual_interest_rate: float,
+    buy_date: str,
+    as_of_dates: list[str],
+    annual_appreciation_percent: float = 0.0,
+    loan_term_years: int = 30,
+    region: str | None = None,
+) -> dict:
+    """
+    Closed-form mortgage and appreciation math for many as-of dates in one pass.
+
+    Dates are parsed once and (1+r)**n is computed once; each as-of date then costs a
+    couple of multiplications, so monthly or daily charts cost about the same as yearly.
+    With region, the value follows that region's monthly home price index (then
+    annual_appreciation_percent past the end of the data) instead of a constant rate.
+
+    Returns scalars downPayment, loanAmount, monthlyPayment and unrounded columns (lists,
+    one entry per as-of date): paymentsMade, remainingBalance, totalPrincipalPaid,
+    estimatedValue, equity. With region, also appreciation: { region, indexFrom,
+    indexThrough } (regional_data.appreciation()).
+    """
+    down_payment, loan_amount, monthly_payment = loan_terms(
+        purchase_price, down_payment_percent, annual_interest_rate, loan_term_years
+    )
+    n = loan_term_years * 12
+
+    with metrics.span("amortize"):
+        start = parse_date(buy_date)
+        start_months = start.year * 12 + start.month
+        start_ordinal = start.toordinal()
+        ends = [parse_date(d) for d in as_of_dates]
+
+        # Full months elapsed (0 before buy_date), capped at the loan term
+        payments = [
+            min(max(0, e.year * 12 + e.month - start_months), n) if e >= start else 0
+            for e in ends
+        ]
+        balances = remaining_balance(loan_amount, annual_interest_rate, payments, n)
+
+        regional = None
+        if region:
+            elapsed = [
+                max(0, e.year * 12 + e.month - start_months) if e >= start else 0 for e in ends
+            ]
+            factors, regional = regional_data.appreciation(
+                region, start, max(elapsed, default=0), annual_appreciation_percent
+            )
+            values = (purchase_price * factors[elapsed]).tolist()
+        else:
+            factors = appreciation_factor(
+                annual_appreciation_percent, [e.toordinal() - start_ordinal for e in ends]
+            )
+            values = [purchase_price * f for f in factors]
+
+    out = {
+        "downPayment": down_payment,
+        "loanAmount": loan_amount,
+        "monthlyPayment": monthly_payment,
+        "paymentsMade": payments,
+        "remainingBalance": balances,
+        "totalPrincipalPaid": [loan_amount - b for b in balances],
+        "estimatedValue": values,
+        "equity": [v - b for v, b in zip(values, balances)],
+    }
+    if regional is not None:
+        out["appreciation"] = regional
+    return out
+
+
+def compute_hypothetical_real_estate(
+    *,
+    purchase_price: float,
+    down_payment_percent: float,
+    annual_interest_rate: float,
+    buy_date: str,
+    as_of_date: str,
+    annual_appreciation_percent: float = 0.0,
+    loan_term_years: int = 30,
+    region: str | None = None,
+) -> dict:
+    """
+    Compute hypothetical real estate position at as_of_date.
+
+    Uses a standard 30-year (or loan_term_years) fixed mortgage. No property API;
+    optional annual_appreciation_percent applies to estimated value at as_of_date, or
+    with region the region's historical index does (see amortize()).
+    Single-date wrapper over amortize().
 
-    years_elapsed = _years_between(buy_date, as_of_date)
-    if years_elapsed < 0:
-        years_elapsed = 0.0
-    estimated_value = purchase_price * (
-        (1 + annual_appreciation_percent / 100.0) ** years_elapsed
+    Returns dict with: purchasePrice, downPaymentPercent, downPayment, loanAmount,
+    annualInterestRate, monthlyPayment, buyDate, asOfDate, paymentsMade, remainingBalance,
+    estimatedValueAtAsOf, equityAtAsOf, totalPrincipalPaid, gainLoss, gainLossPercent
+    (gain/loss on the down payment / cash invested); with region also region,
+    indexFrom and indexThrough.
+    """
+    cols = amortize(
+        purchase_price=purchase_price,
+        down_payment_percent=down_payment_percent,
+        annual_interest_rate=annual_interest_rate,
+        buy_date=buy_date,
+        as_of_dates=[as_of_date],
+        annual_appreciation_percent=annual_appreciation_percent,
+        loan_term_years=loan_term_years,
+        region=region,
     )
-    equity_at_as_of = estimated_value - remaining_balance
-    total_principal_paid = loan_amount - remaining_balance
+    down_payment = cols["downPayment"]
+    equity_at_as_of = cols["equity"][0]
 
     # Gain/loss on the cash (down payment) invested
     cost_basis = down_payment
     gain_loss = equity_at_as_of - cost_basis
     gain_loss_percent = (gain_loss / cost_basis * 100.0) if cost_basis else 0.0
 
-    return {
+    result = {
         "purchasePrice": round_to(purchase_price, 2),
         "downPaymentPercent": round_to(down_payment_percent, 2),
         "downPayment": round_to(down_payment, 2),
-        "loanAmount": round_to(loan_amount, 2),
+        "loanAmount": round_to(cols["loanAmount"], 2),
         "annualInterestRate": round_to(annual_interest_rate, 2),
-        "monthlyPayment": round_to(monthly_payment, 2),
+        "monthlyPayment": round_to(cols["monthlyPayment"], 2),
         "buyDate": buy_date,
         "asOfDate": as_of_date,
-        "paymentsMade": payments_made,
-        "remainingBalance": round_to(remaining_balance, 2),
-        "estimatedValueAtAsOf": round_to(estimated_value, 2),
+        "paymentsMade": cols["paymentsMade"][0],
+        "remainingBalance": round_to(cols["remainingBalance"][0], 2),
+        "estimatedValueAtAsOf": round_to(cols["estimatedValue"][0], 2),
         "equityAtAsOf": round_to(equity_at_as_of, 2),
-        "totalPrincipalPaid": round_to(total_principal_paid, 2),
+        "totalPrincipalPaid": round_to(cols["totalPrincipalPaid"][0], 2),
         "gainLoss": round_to(gain_loss, 2),
         "gainLossPercent": round_to(gain_loss_percent, 2),
         "annualAppreciationPercent": round_to(annual_appreciation_percent, 2),
     }
+    result.update(cols.get("appreciation") or {})
+    return result
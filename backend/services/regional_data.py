@@ -0,0 +1,284 @@
+"""
+Historical regional home price indices (HPI) and 30-year fixed mortgage rates, for
+real estate scenarios that follow what a market actually did instead of a constant
+appreciation rate.
+
+A dataset is one binary file (REGIONAL_DATA_PATH, default data/regional.bin) built from
+published CSVs with build_regional_data.py. It holds a key table and a dense float32
+matrix, one row per series and one column per month (NaN where a series has no value),
+so a (region, month) lookup is a dict hit plus an array index. The file is memory-mapped
+and read in place; it is reopened when it changes on disk.
+
+Series keys: "HPI/US", "HPI/<ST>" (state), "HPI/<ST>/<CITY>" (metro or city, upper case)
+and "RATE/MORTGAGE30" (percent per year).
+"""
+
+import mmap
+import os
+import struct
+import threading
+from datetime import date
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join("data", "regional.bin")
+
+MAGIC = b"RGNL"
+VERSION = 1
+# magic, version, reserved, first month (year * 12 + month - 1), months, series count
+_HEADER = struct.Struct("<4sHHiII")
+_KEY_LENGTH = struct.Struct("<H")
+
+HPI_PREFIX = "HPI/"
+MORTGAGE_RATE_KEY = "RATE/MORTGAGE30"
+
+_dataset: "RegionalData | None" = None
+_dataset_stamp: tuple | None = None
+_lock = threading.Lock()
+_reload_listeners: list = []
+
+
+def month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def month_label(index: int) -> str:
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def region_key(region: str) -> str:
+    """
+    Normalized region: "ca" -> "CA", "ca/san francisco" or "San Francisco, CA" ->
+    "CA/SAN FRANCISCO", "us" -> "US".
+    """
+    text = " ".join(region.replace("_", " ").split()).upper()
+    if "," in text:
+        city, _, state = text.rpartition(",")
+        text = f"{state.strip()}/{city.strip()}"
+    return "/".join(part.strip() for part in text.split("/") if part.strip())
+
+
+def encode(first_month: int, series: dict[str, np.ndarray]) -> bytes:
+    """Binary dataset: every array in series has the same length (months from first_month)."""
+    keys = sorted(series)
+    months = len(series[keys[0]]) if keys else 0
+    if any(len(series[k]) != months for k in keys):
+        raise ValueError("All series must cover the same months")
+    parts = [_HEADER.pack(MAGIC, VERSION, 0, first_month, months, len(keys))]
+    for key in keys:
+        raw = key.encode("utf-8")
+        parts.append(_KEY_LENGTH.pack(len(raw)) + raw)
+    size = sum(map(len, parts))
+    parts.append(b"\0" * (-size % 8))
+    matrix = np.full((len(keys), months), np.nan, dtype="<f4")
+    for row, key in enumerate(keys):
+        matrix[row] = series[key]
+    parts.append(matrix.tobytes())
+    return b"".join(parts)
+
+
+class RegionalData:
+    """A decoded dataset. values is a read-only (series x months) view of buf."""
+
+    def __init__(self, buf) -> None:
+        if len(buf) < _HEADER.size:
+            raise ValueError("Regional dataset is truncated")
+        magic, version, _, self.first_month, self.months, count = _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a regional dataset (or an unsupported version)")
+        offset = _HEADER.size
+        self.rows: dict[str, int] = {}
+        for row in range(count):
+            (length,) = _KEY_LENGTH.unpack_from(buf, offset)
+            offset += _KEY_LENGTH.size
+            self.rows[bytes(buf[offset:offset + length]).decode("utf-8")] = row
+            offset += length
+        offset += -offset % 8
+        self.values = np.frombuffer(
+            buf, dtype="<f4", count=count * self.months, offset=offset
+        ).reshape(count, self.months)
+        # First and last month column with a value, per row (-1 for an empty row)
+        present = ~np.isnan(self.values)
+        has_any = present.any(axis=1)
+        self.first_valid = np.where(has_any, present.argmax(axis=1), -1)
+        self.last_valid = np.where(
+            has_any, self.months - 1 - present[:, ::-1].argmax(axis=1), -1
+        )
+
+    def column(self, month: int) -> int | None:
+        col = month - self.first_month
+        return col if 0 <= col < self.months else None
+
+    def value(self, key: str, month: int) -> float | None:
+        """Value of series key in month (month_index), or None."""
+        row = self.rows.get(key)
+        col = self.column(month)
+        if row is None or col is None:
+            return None
+        v = float(self.values[row, col])
+        return None if v != v else v
+
+    def hpi_regions(self) -> list[str]:
+        return sorted(k[len(HPI_PREFIX):] for k in self.rows if k.startswith(HPI_PREFIX))
+
+
+def get_data_path() -> str:
+    return os.environ.get("REGIONAL_DATA_PATH") or DEFAULT_PATH
+
+
+def add_reload_listener(fn) -> None:
+    """Register fn() to be called when a different dataset file is loaded."""
+    _reload_listeners.append(fn)
+
+
+def get_dataset() -> RegionalData:
+    """The current dataset (reopened if the file changed), or ValueError if there is none."""
+    global _dataset, _dataset_stamp
+    path = get_data_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise ValueError(
+            f"No regional dataset at {path}; build one with build_regional_data.py"
+        ) from None
+    stamp = (path, st.st_mtime_ns, st.st_size, st.st_ino)
+    if stamp == _dataset_stamp and _dataset is not None:
+        return _dataset
+    with _lock:
+        if stamp != _dataset_stamp or _dataset is None:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+            reloaded = _dataset is not None
+            _dataset = RegionalData(buf)
+            _dataset_stamp = stamp
+            if reloaded:
+                for fn in _reload_listeners:
+                    fn()
+        return _dataset
+
+
+def reload_if_changed() -> None:
+    """Reopen the dataset now if its file changed (reload listeners fire); quiet without one."""
+    try:
+        get_dataset()
+    except ValueError:
+        pass
+
+
+def mortgage_rate(day: date) -> float:
+    """30-year fixed rate (percent, 2 decimals) in the month of day."""
+    rate = get_dataset().value(MORTGAGE_RATE_KEY, month_index(day))
+    if rate is None:
+        raise ValueError(f"No 30-year mortgage rate for {month_label(month_index(day))}")
+    return round(rate, 2)
+
+
+def resolve_region(region: str) -> tuple[str, int]:
+    """(region key, dataset row) for region, falling back from a city to its state."""
+    data = get_dataset()
+    key = region_key(region)
+    candidates = [key]
+    if "/" in key:
+        candidates.append(key.split("/", 1)[0])
+    for candidate in candidates:
+        row = data.rows.get(HPI_PREFIX + candidate)
+        if row is not None and data.first_valid[row] >= 0:
+            return candidate, row
+    raise ValueError(f"No home price index for region {region!r}")
+
+
+def _not_covered(data: RegionalData, key: str, row: int, month: int) -> ValueError:
+    return ValueError(
+        f"No {key} home price index for {month_label(month)} "
+        f"(data covers {month_label(data.first_month + int(data.first_valid[row]))} to "
+        f"{month_label(data.first_month + int(data.last_valid[row]))})"
+    )
+
+
+def mortgage_rates(months: np.ndarray) -> np.ndarray:
+    """mortgage_rate() for an array of month indices at once."""
+    data = get_dataset()
+    row = data.rows.get(MORTGAGE_RATE_KEY)
+    cols = np.asarray(months, dtype=np.int64) - data.first_month
+    inside = (cols >= 0) & (cols < data.months)
+    rates = np.full(len(cols), np.nan)
+    if row is not None:
+        rates[inside] = data.values[row, cols[inside]]
+    missing = np.flatnonzero(np.isnan(rates))
+    if len(missing):
+        raise ValueError(f"No 30-year mortgage rate for {month_label(int(months[missing[0]]))}")
+    return np.round(rates, 2)
+
+
+def appreciation(
+    region: str, start: date, months: int, annual_appreciation_percent: float = 0.0
+) -> tuple[np.ndarray, dict]:
+    """
+    Value multipliers for months 0..months after start (1.0 at 0): the region's index
+    in that month over its level in the start month. Past the last month of data, the
+    last index level is compounded at annual_appreciation_percent.
+
+    Returns (float64 array of months + 1 factors, { region, indexFrom, indexThrough }).
+    """
+    data = get_dataset()
+    key, row = resolve_region(region)
+    start_col = data.column(month_index(start))
+    first, last = int(data.first_valid[row]), int(data.last_valid[row])
+    if start_col is None or not first <= start_col <= last:
+        raise _not_covered(data, key, row, month_index(start))
+    known = min(months, last - start_col)
+    levels = data.values[row, start_col:start_col + known + 1].astype(np.float64)
+    if np.isnan(levels).any():
+        raise ValueError(f"The {key} home price index has gaps; rebuild the dataset")
+    factors = np.empty(months + 1)
+    factors[:known + 1] = levels / levels[0]
+    if months > known:
+        if annual_appreciation_percent <= -100:
+            raise ValueError("annualAppreciationPercent must be greater than -100")
+        monthly = (1 + annual_appreciation_percent / 100.0) ** (1 / 12.0)
+        factors[known + 1:] = factors[known] * monthly ** np.arange(1, months - known + 1)
+    info = {
+        "region": key,
+        "indexFrom": month_label(data.first_month + start_col),
+        "indexThrough": month_label(data.first_month + start_col + known),
+    }
+    return factors, info
+
+
+def window_appreciation(
+    region: str,
+    start_months: np.ndarray,
+    months: int | np.ndarray,
+    annual_appreciation_percent: float = 0.0,
+) -> tuple[np.ndarray, dict]:
+    """
+    appreciation() at one horizon for many purchases: the value multiple months after
+    each of start_months (month indices), as one gather and divide. months is a single
+    horizon or an array of one per purchase.
+
+    Returns (float64 factors, { region, indexFrom, indexThrough }) where the index
+    months are the earliest and latest used.
+    """
+    data = get_dataset()
+    key, row = resolve_region(region)
+    first, last = int(data.first_valid[row]), int(data.last_valid[row])
+    cols = np.asarray(start_months, dtype=np.int64) - data.first_month
+    outside = np.flatnonzero((cols < first) | (cols > last))
+    if len(outside):
+        raise _not_covered(data, key, row, int(start_months[outside[0]]))
+    ends = np.minimum(cols + months, last)
+    levels = data.values[row].astype(np.float64)
+    factors = levels[ends] / levels[cols]
+    if np.isnan(factors).any():
+        raise ValueError(f"The {key} home price index has gaps; rebuild the dataset")
+    beyond = cols + months - ends
+    if beyond.any():
+        if annual_appreciation_percent <= -100:
+            raise ValueError("annualAppreciationPercent must be greater than -100")
+        factors *= (1 + annual_appreciation_percent / 100.0) ** (beyond / 12.0)
+    info = {
+        "region": key,
+        "indexFrom": month_label(data.first_month + int(cols.min())) if len(cols) else None,
+        "indexThrough": month_label(data.first_month + int(ends.max())) if len(cols) else None,
+    }
+    return factors, info
@@ -0,0 +1,213 @@
+"""
+Readers for the published CSVs a regional dataset (regional_data) is built from.
+
+- Zillow ZHVI style "wide" files: RegionName, RegionType (country / state / msa / city),
+  StateName, then one column per month (YYYY-MM-DD).
+- "Long" files: region (US, CA, "CA/San Francisco" or "San Francisco, CA") or state
+  [+ city] columns, a date column and a value column (value, index, hpi, index_nsa...).
+- FRED downloads (e.g. MORTGAGE30US): a date column (DATE / observation_date) and one
+  value column, "." for missing. Used for mortgage rates.
+
+Several observations in a month are averaged. Months between two observations (e.g.
+quarterly FHFA indices) are interpolated, geometrically for indices and linearly for
+rates; nothing is extrapolated past the first or last observation.
+"""
+
+import csv
+import gzip
+import math
+from datetime import date
+
+import numpy as np
+
+from backend.services.regional_data import (
+    HPI_PREFIX,
+    MORTGAGE_RATE_KEY,
+    encode,
+    month_index,
+    region_key,
+)
+
+STATES = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR", "CALIFORNIA": "CA",
+    "COLORADO": "CO", "CONNECTICUT": "CT", "DELAWARE": "DE", "DISTRICT OF COLUMBIA": "DC",
+    "FLORIDA": "FL", "GEORGIA": "GA", "HAWAII": "HI", "IDAHO": "ID", "ILLINOIS": "IL",
+    "INDIANA": "IN", "IOWA": "IA", "KANSAS": "KS", "KENTUCKY": "KY", "LOUISIANA": "LA",
+    "MAINE": "ME", "MARYLAND": "MD", "MASSACHUSETTS": "MA", "MICHIGAN": "MI",
+    "MINNESOTA": "MN", "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT",
+    "NEBRASKA": "NE", "NEVADA": "NV", "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ",
+    "NEW MEXICO": "NM", "NEW YORK": "NY", "NORTH CAROLINA": "NC", "NORTH DAKOTA": "ND",
+    "OHIO": "OH", "OKLAHOMA": "OK", "OREGON": "OR", "PENNSYLVANIA": "PA",
+    "RHODE ISLAND": "RI", "SOUTH CAROLINA": "SC", "SOUTH DAKOTA": "SD", "TENNESSEE": "TN",
+    "TEXAS": "TX", "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA", "WASHINGTON": "WA",
+    "WEST VIRGINIA": "WV", "WISCONSIN": "WI", "WYOMING": "WY",
+    "UNITED STATES": "US", "USA": "US",
+}
+_DATE_COLUMNS = ("date", "observationdate", "month", "period")
+_VALUE_COLUMNS = ("value", "index", "hpi", "indexnsa", "indexsa", "zhvi", "rate")
+
+# Observations: series key -> month index -> values seen in that month
+Observations = dict[str, dict[int, list[float]]]
+
+
+def _normalize(name: str) -> str:
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _open(path: str):
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    return opener(path, "rt", newline="", encoding="utf-8-sig")
+
+
+def _month(text: str) -> int | None:
+    """Month index of YYYY-MM-DD / YYYY-MM, or None if text is not a date."""
+    text = text.strip()
+    try:
+        if len(text) == 7:
+            return month_index(date.fromisoformat(text + "-01"))
+        return month_index(date.fromisoformat(text[:10]))
+    except ValueError:
+        return None
+
+
+def _number(text: str) -> float | None:
+    text = (text or "").strip()
+    if not text or text == ".":
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _state(text: str) -> str:
+    text = " ".join(text.split()).upper()
+    return STATES.get(text, text)
+
+
+def _wide_region(row: dict[str, str]) -> str | None:
+    """Region key of a Zillow-style row, or None for region types we do not keep."""
+    kind = (row.get("regiontype") or "").strip().lower()
+    name = (row.get("regionname") or "").strip()
+    state = (row.get("statename") or row.get("state") or "").strip()
+    if kind == "country":
+        return "US"
+    if kind == "state":
+        return _state(name)
+    if kind in ("msa", "city"):
+        if "," in name:
+            return region_key(name)
+        if state:
+            return region_key(f"{_state(state)}/{name}")
+    return None
+
+
+def _add(out: Observations, key: str, month: int, value: float) -> None:
+    out.setdefault(key, {}).setdefault(month, []).append(value)
+
+
+def read_hpi(path: str, out: Observations | None = None) -> Observations:
+    """Home price index observations in a wide or long CSV, added to out."""
+    out = {} if out is None else out
+    with _open(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return out
+        names = [_normalize(h) for h in header]
+        month_cols = [
+            (i, m) for i, m in ((i, _month(h)) for i, h in enumerate(header)) if m is not None
+        ]
+        if "regionname" in names and month_cols:
+            for raw in reader:
+                row = dict(zip(names, raw))
+                region = _wide_region(row)
+                if region is None:
+                    continue
+                for i, month in month_cols:
+                    value = _number(raw[i]) if i < len(raw) else None
+                    if value is not None and value > 0:
+                        _add(out, HPI_PREFIX + region, month, value)
+            return out
+        date_i = next((names.index(c) for c in _DATE_COLUMNS if c in names), None)
+        value_i = next((names.index(c) for c in _VALUE_COLUMNS if c in names), None)
+        region_i = next((names.index(c) for c in ("region", "regionname") if c in names), None)
+        state_i = names.index("state") if "state" in names else None
+        city_i = next((names.index(c) for c in ("city", "metro") if c in names), None)
+        if date_i is None or value_i is None or (region_i is None and state_i is None):
+            raise ValueError(
+                f"{path}: expected a Zillow-style file or region / state, date and value columns"
+            )
+        for raw in reader:
+            if len(raw) < len(header):
+                continue
+            month, value = _month(raw[date_i]), _number(raw[value_i])
+            if month is None or value is None or value <= 0:
+                continue
+            if region_i is not None:
+                region = region_key(raw[region_i])
+                if "/" not in region:
+                    region = _state(region)
+            else:
+                region = _state(raw[state_i])
+                if city_i is not None and raw[city_i].strip():
+                    region = region_key(f"{region}/{raw[city_i]}")
+            if region:
+                _add(out, HPI_PREFIX + region, month, value)
+    return out
+
+
+def read_rates(path: str, out: Observations | None = None) -> Observations:
+    """30-year fixed mortgage rate observations (percent) in a FRED-style CSV, added to out."""
+    out = {} if out is None else out
+    with _open(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return out
+        names = [_normalize(h) for h in header]
+        date_i = next((names.index(c) for c in _DATE_COLUMNS if c in names), None)
+        if date_i is None or len(header) < 2:
+            raise ValueError(f"{path}: expected a date column and a rate column")
+        value_i = next(i for i in range(len(header)) if i != date_i)
+        for raw in reader:
+            if len(raw) <= max(date_i, value_i):
+                continue
+            month, value = _month(raw[date_i]), _number(raw[value_i])
+            if month is not None and value is not None:
+                _add(out, MORTGAGE_RATE_KEY, month, value)
+    return out
+
+
+def monthly(observations: Observations) -> tuple[int, dict[str, np.ndarray]]:
+    """(first month, dense monthly columns) for encode(): averaged, gaps interpolated."""
+    observations = {k: v for k, v in observations.items() if v}
+    if not observations:
+        raise ValueError("No observations to build a dataset from")
+    first = min(min(months) for months in observations.values())
+    last = max(max(months) for months in observations.values())
+    grid = np.arange(first, last + 1)
+    out = {}
+    for key, by_month in observations.items():
+        months = np.array(sorted(by_month))
+        values = np.array([sum(by_month[m]) / len(by_month[m]) for m in months])
+        column = np.full(len(grid), np.nan)
+        span = slice(months[0] - first, months[-1] - first + 1)
+        if key.startswith(HPI_PREFIX):
+            column[span] = np.exp(np.interp(grid[span], months, np.log(values)))
+        else:
+            column[span] = np.interp(grid[span], months, values)
+        out[key] = column
+    return first, out
+
+
+def build(hpi_paths: list[str], rate_paths: list[str]) -> bytes:
+    """Encoded dataset from HPI and mortgage-rate CSVs."""
+    observations: Observations = {}
+    for path in hpi_paths:
+        read_hpi(path, observations)
+    for path in rate_paths:
+        read_rates(path, observations)
+    first, columns = monthly(observations)
+    return encode(first, columns)
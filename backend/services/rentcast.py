@@ -4,9 +4,12 @@ Free tier: 50 requests/month. Get a key at https://rentcast.io/ (developer signu
 """
 
 import os
-import requests
 
-BASE_URL = "https://api.rentcast.io/v1"
+from backend.services import http_client
+from backend.services.avm_cache import cache, normalize_address
+from backend.services.upstream import scheduler
+
+BASE_URL = os.environ.get("RENTCAST_BASE_URL") or "https://api.rentcast.io/v1"
 
 
 def get_api_key() -> str:
@@ -27,33 +30,50 @@ def get_value_by_address(address: str) -> dict:
 
     Returns dict with: price, priceRangeLow, priceRangeHigh, formattedAddress,
     and optionally subjectProperty details. Raises ValueError on API error or missing key.
+
+    Answers (including "not found") are cached on the normalized address, so repeat
+    lookups of the same property do not spend RentCast quota.
     """
-    api_key = get_api_key()
     address = (address or "").strip()
     if not address:
         raise ValueError("Address is required")
+    key = normalize_address(address)
+    cached = cache.get(key)
+    if cached is not None:
+        payload, error = cached
+        if error:
+            raise ValueError(error)
+        return {**payload, "address": address}
+
+    api_key = get_api_key()
 
     headers = {"X-Api-Key": api_key}
     params = {"address": address}
-    resp = requests.get(
-        f"{BASE_URL}/avm/value",
-        headers=headers,
-        params=params,
-        timeout=30,
+    resp = scheduler.call(
+        "rentcast",
+        lambda: http_client.get(
+            "rentcast",
+            f"{BASE_URL}/avm/value",
+            headers=headers,
+            params=params,
+        ),
     )
 
     if resp.status_code == 401:
         raise ValueError("Invalid RENTCAST_API_KEY or key not activated")
     if resp.status_code == 404:
-        raise ValueError("Address not found or no value estimate available")
+        message = "Address not found or no value estimate available"
+        cache.put_negative(key, message)
+        raise ValueError(message)
     if resp.status_code == 429:
+        scheduler.report_throttled("rentcast")
         raise ValueError("RentCast rate limit exceeded (50 free requests/month)")
     resp.raise_for_status()
 
     data = resp.json()
     # Normalize response for our API
     subject = data.get("subjectProperty") or {}
-    return {
+    result = {
         "address": address,
         "formattedAddress": subject.get("formattedAddress") or address,
         "price": data.get("price"),
@@ -61,3 +81,5 @@ def get_value_by_address(address: str) -> dict:
         "priceRangeHigh": data.get("priceRangeHigh"),
         "subjectProperty": subject,
     }
+    cache.put(key, result)
+    return result
@@ -0,0 +1,111 @@
+"""
+Bounded LRU of serialized API responses, keyed on path + canonical query string.
+Entries carry tags (e.g. "symbol:VOO") so they can be dropped when the data they
+were computed from changes, and an optional server-side TTL.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CachedResponse:
+    __slots__ = ("body", "mimetype", "etag", "cache_control", "tags", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        mimetype: str,
+        cache_control: str,
+        tags: frozenset[str],
+        ttl: float | None = None,
+    ) -> None:
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.cache_control = cache_control
+        self.tags = tags
+        self.expires_at = time.monotonic() + ttl if ttl is not None else None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+class ResponseCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._bytes -= len(self._entries.pop(key).body)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        max_entries = _env_int("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        max_bytes = _env_int("RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        if len(entry.body) > max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > max_entries or self._bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry carrying tag. Returns how many were dropped."""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if tag in e.tags]
+            for k in keys:
+                self._bytes -= len(self._entries.pop(k).body)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "notModified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+cache = ResponseCache()
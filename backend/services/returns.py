@@ -4,6 +4,7 @@ what would it be worth on a sell date using historical (adjusted) prices?
 """
 
 from backend.services.alpha_vantage import get_daily_adjusted, get_price_on_or_before
+from backend.services.price_series import PriceSeries
 
 
 def round_to(n: float, digits: int) -> float:
@@ -17,13 +18,16 @@ def compute_hypothetical_return(
     invested_amount: float,
     buy_date: str,
     sell_date: str | None = None,
+    series: PriceSeries | None = None,
 ) -> dict:
     """
     Compute hypothetical stock return.
     Returns dict with symbol, buyDate, sellDate, buyPrice, sellPrice, shares,
     costBasis, valueAtSell, gainLoss, gainLossPercent (same keys as JS API).
+    Pass series (from get_daily_adjusted) to reuse an already loaded series.
     """
-    series = get_daily_adjusted(symbol, "full")
+    if series is None:
+        series = get_daily_adjusted(symbol, "full")
     buy = get_price_on_or_before(series, buy_date)
     if not buy:
         raise ValueError(f"No price data on or before buy date {buy_date} for {symbol}")
@@ -32,8 +36,8 @@ def compute_hypothetical_return(
         sell = get_price_on_or_before(series, sell_date)
     else:
         sell = {
-            "date": series["dates"][-1],
-            "close": series["closes"][-1],
+            "date": series.date_at(-1),
+            "close": series.closes[-1],
         }
     if not sell or sell["date"] < buy["date"]:
         raise ValueError(f"No price data for sell date for {symbol}")
@@ -46,7 +50,7 @@ def compute_hypothetical_return(
     gain_loss_percent = (gain_loss / invested_amount) * 100
 
     return {
-        "symbol": series["symbol"],
+        "symbol": series.symbol,
         "buyDate": buy["date"],
         "sellDate": sell["date"],
         "buyPrice": round_to(buy_price, 4),
@@ -0,0 +1,284 @@
+"""
+Rolling-window ("every start date") analysis: the stock vs real estate comparison for
+every buy date in a range with a fixed holding period (e.g. all 10-year windows since
+2000), summarized as distributions plus the worst and best windows.
+
+There is no per-window loop. Adjusted closes are already the running (prefix) product
+of daily total returns, so every window's growth is closes[sell] / closes[buy]: one
+searchsorted for the sell rows, two gathers and a divide. The real estate leg is
+amortize()'s closed form evaluated over arrays of buy dates, so a few thousand windows
+cost about as much as one.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from backend.services import metrics, regional_data
+from backend.services.alpha_vantage import get_daily_adjusted
+from backend.services.price_series import iso_date
+from backend.services.real_estate import (
+    amortize,
+    appreciation_factor,
+    parse_date,
+    remaining_balance,
+    round_to,
+)
+
+STEPS = ("daily", "weekly", "monthly")
+MAX_HOLDING_YEARS = 40
+DISTRIBUTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _months(ordinals: np.ndarray) -> np.ndarray:
+    """Month index (year * 12 + month - 1) of each ordinal day."""
+    days = (ordinals - _EPOCH).astype("datetime64[D]")
+    return days.astype("datetime64[M]").astype(np.int64) + 1970 * 12
+
+
+def add_years(ordinals: np.ndarray, years: int) -> np.ndarray:
+    """Ordinal days years later, the day clamped to the month's length (Feb 29 -> 28)."""
+    days = (ordinals - _EPOCH).astype("datetime64[D]")
+    month = days.astype("datetime64[M]")
+    day = (days - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + np.timedelta64(12 * years, "M")
+    length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(
+        np.int64
+    )
+    return target.astype("datetime64[D]").astype(np.int64) + np.minimum(day, length - 1) + _EPOCH
+
+
+def _first_per_step(ordinals: np.ndarray, step: str) -> np.ndarray:
+    """Indices of the first of ordinals (ascending) in each day / Monday week / month."""
+    if step == "daily":
+        return np.arange(len(ordinals))
+    keys = _months(ordinals) if step == "monthly" else (ordinals - 1) // 7
+    return np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1))
+
+
+def _distribution(values: np.ndarray) -> dict:
+    out = {"mean": round_to(float(values.mean()), 2), "std": round_to(float(values.std()), 2)}
+    out["min"] = round_to(float(values.min()), 2)
+    for p, v in zip(DISTRIBUTION_PERCENTILES, np.percentile(values, DISTRIBUTION_PERCENTILES)):
+        out[f"p{p}"] = round_to(float(v), 2)
+    out["max"] = round_to(float(values.max()), 2)
+    return out
+
+
+def _annualized(multiple: np.ndarray, years: int) -> np.ndarray:
+    """Yearly percent return of a growth multiple (-100 once everything is lost)."""
+    return np.where(multiple > 0, np.abs(multiple) ** (1.0 / years) - 1.0, -1.0) * 100.0
+
+
+def _leg(
+    buy: np.ndarray, sell: np.ndarray, value: np.ndarray, cost_basis: float, years: int
+) -> tuple[dict, np.ndarray]:
+    """
+    Distribution, worst and best window for one leg; also returns its gain percents.
+    With no cost basis (no down payment) percents are 0, as in
+    compute_hypothetical_real_estate; windows are still ranked by gain.
+    """
+    gain = value - cost_basis
+    if cost_basis:
+        gain_percent = gain / cost_basis * 100.0
+        annualized = _annualized(value / cost_basis, years)
+    else:
+        gain_percent = annualized = np.zeros(len(value))
+
+    def window(i: int) -> dict:
+        return {
+            "buyDate": iso_date(int(buy[i])),
+            "sellDate": iso_date(int(sell[i])),
+            "value": round_to(float(value[i]), 2),
+            "gainLossPercent": round_to(float(gain_percent[i]), 2),
+            "annualizedReturnPercent": round_to(float(annualized[i]), 2),
+        }
+
+    return {
+        "gainLossPercent": _distribution(gain_percent),
+        "annualizedReturnPercent": _distribution(annualized),
+        "lossPercent": round_to(float(np.mean(gain_percent < 0)) * 100.0, 2),
+        "worst": window(int(np.argmin(gain))),
+        "best": window(int(np.argmax(gain))),
+    }, gain_percent
+
+
+def _real_estate_equity(
+    buy: np.ndarray,
+    as_of: np.ndarray,
+    *,
+    purchase_price: float,
+    down_payment_percent: float,
+    annual_interest_rate: float | str,
+    annual_appreciation_percent: float,
+    region: str | None,
+    loan_term_years: int,
+    years: int,
+) -> tuple[np.ndarray, float, dict]:
+    """
+    Equity at as_of for a purchase on each buy day, as compute_hypothetical_real_estate
+    would give it. annual_interest_rate "historical" takes each buy month's 30-year
+    fixed rate. Returns (equity, down payment, extra response fields).
+    """
+    historical = annual_interest_rate == "historical"
+    buy_months = _months(buy)
+    rates = regional_data.mortgage_rates(buy_months) if historical else annual_interest_rate
+    # Validation and the down payment / loan amount from the scalar closed form
+    scalars = amortize(
+        purchase_price=purchase_price,
+        down_payment_percent=down_payment_percent,
+        annual_interest_rate=float(np.min(rates)),
+        buy_date=iso_date(int(buy[0])),
+        as_of_dates=[],
+        annual_appreciation_percent=annual_appreciation_percent,
+        loan_term_years=loan_term_years,
+    )
+    extra: dict = {}
+    with metrics.span("amortize"):
+        loan = scalars["loanAmount"]
+        n = loan_term_years * 12
+        paid = np.minimum(np.maximum(_months(as_of) - buy_months, 0), n)
+        rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), buy.shape)
+        balance = remaining_balance(loan, rates, paid, n)
+        if region:
+            factors, extra = regional_data.window_appreciation(
+                region, buy_months, 12 * years, annual_appreciation_percent
+            )
+        else:
+            factors = appreciation_factor(annual_appreciation_percent, as_of - buy)
+        equity = purchase_price * factors - balance
+    if historical:
+        extra["annualInterestRate"] = _distribution(rates)
+    return equity, scalars["downPayment"], extra
+
+
+def rolling_windows(
+    *,
+    holding_years: int,
+    symbol: str | None = None,
+    invested_amount: float | None = None,
+    purchase_price: float | None = None,
+    down_payment_percent: float | None = None,
+    annual_interest_rate: float | str | None = None,
+    annual_appreciation_percent: float = 0.0,
+    region: str | None = None,
+    loan_term_years: int = 30,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    step: str | None = None,
+    include_windows: bool = False,
+) -> dict:
+    """
+    Every holding_years window whose buy date is in [from_date, to_date] (default: as
+    far as the data goes), one per trading day (or the first trading day of each week /
+    month with step). The stock leg buys on a trading day and sells on or before the
+    same date holding_years later, like compute_hypothetical_return; windows whose
+    sell date is past the last close are left out. Without a stock, buy dates are
+    calendar days from from_date (required) up to holding_years before today, monthly
+    by default. annual_interest_rate "historical" and region use the regional dataset.
+
+    Returns { holdingYears, step, windows, firstBuyDate, lastBuyDate,
+    stock: { symbol, investedAmount, gainLossPercent, annualizedReturnPercent (each
+    { mean, std, min, p5..p95, max }), lossPercent, worst, best } or None,
+    realEstate: same plus purchase/loan figures or None, stockBeatsRealEstatePercent
+    (both legs; None with a zero down payment), columns: { buyDate,
+    stockGainLossPercent, realEstateGainLossPercent } with include_windows }.
+    """
+    has_stock = bool(symbol) and invested_amount is not None
+    has_re = purchase_price is not None
+    if not has_stock and not has_re:
+        raise ValueError("Provide stock params and/or real estate params")
+    if has_stock and invested_amount <= 0:
+        raise ValueError("investedAmount must be positive")
+    if has_re and (down_payment_percent is None or annual_interest_rate is None):
+        raise ValueError("Real estate needs downPaymentPercent and annualInterestRate")
+    if not 1 <= holding_years <= MAX_HOLDING_YEARS:
+        raise ValueError(f"holdingYears must be between 1 and {MAX_HOLDING_YEARS}")
+    step = step or ("daily" if has_stock else "monthly")
+    if step not in STEPS:
+        raise ValueError(f"step must be one of {', '.join(STEPS)}")
+    lo = parse_date(from_date).toordinal() if from_date else None
+    hi = parse_date(to_date).toordinal() if to_date else None
+
+    series = None
+    if has_stock:
+        series = get_daily_adjusted(symbol, "full")
+        ordinals = np.asarray(series.ordinals, dtype=np.int64)
+        closes = np.asarray(series.closes, dtype=np.float64)
+        start, end = series.index_range(lo, hi)
+        candidates = ordinals[start:end]
+        buy_rows = start + _first_per_step(candidates, step)
+        buy = ordinals[buy_rows]
+        target = add_years(buy, holding_years)
+        complete = target <= ordinals[-1]
+        buy_rows, buy, target = buy_rows[complete], buy[complete], target[complete]
+    else:
+        if lo is None:
+            raise ValueError("from is required without a stock")
+        today = date.today().toordinal()
+        latest = int(add_years(np.array([today]), -holding_years)[0])
+        hi = latest if hi is None else min(hi, latest)
+        candidates = np.arange(lo, hi + 1, dtype=np.int64)
+        buy = candidates[_first_per_step(candidates, step)] if len(candidates) else candidates
+        target = add_years(buy, holding_years)
+    if not len(buy):
+        raise ValueError(f"No complete {holding_years}-year windows in the requested range")
+
+    out: dict = {
+        "holdingYears": holding_years,
+        "step": step,
+        "windows": int(len(buy)),
+        "firstBuyDate": iso_date(int(buy[0])),
+        "lastBuyDate": iso_date(int(buy[-1])),
+        "stock": None,
+        "realEstate": None,
+    }
+    stock_gain = re_gain = None
+    with metrics.span("rolling"):
+        if series is not None:
+            sell_rows = np.searchsorted(ordinals, target, side="right") - 1
+            value = invested_amount * closes[sell_rows] / closes[buy_rows]
+            leg, stock_gain = _leg(
+                buy, ordinals[sell_rows], value, invested_amount, holding_years
+            )
+            out["stock"] = {
+                "symbol": series.symbol,
+                "investedAmount": round_to(invested_amount, 2),
+                **leg,
+            }
+        if has_re:
+            equity, down_payment, extra = _real_estate_equity(
+                buy,
+                target,
+                purchase_price=purchase_price,
+                down_payment_percent=down_payment_percent,
+                annual_interest_rate=annual_interest_rate,
+                annual_appreciation_percent=annual_appreciation_percent,
+                region=region,
+                loan_term_years=loan_term_years,
+                years=holding_years,
+            )
+            leg, re_gain = _leg(buy, target, equity, down_payment, holding_years)
+            out["realEstate"] = {
+                "purchasePrice": round_to(purchase_price, 2),
+                "downPayment": round_to(down_payment, 2),
+                "annualAppreciationPercent": round_to(annual_appreciation_percent, 2),
+                **extra,
+                **leg,
+            }
+        if stock_gain is not None and re_gain is not None:
+            # Percent against percent; meaningless without a down payment
+            out["stockBeatsRealEstatePercent"] = round_to(
+                float(np.mean(stock_gain > re_gain)) * 100.0, 2
+            ) if down_payment else None
+    if include_windows:
+        with metrics.span("encode"):
+            columns = {"buyDate": [iso_date(o) for o in buy.tolist()]}
+            if stock_gain is not None:
+                columns["stockGainLossPercent"] = np.round(stock_gain, 2).tolist()
+            if re_gain is not None:
+                columns["realEstateGainLossPercent"] = np.round(re_gain, 2).tolist()
+        out["columns"] = columns
+    return out
@@ -0,0 +1,229 @@
+"""
+Local on-disk store for daily adjusted price series (SQLite, stdlib only).
+Keeps each symbol's dates and adjusted closes so repeat symbols and cold starts
+cost no Alpha Vantage calls; after the first full pull only compact refreshes are needed.
+
+Prices are kept one row per day (plus raw open/high/low/volume/dividend when known);
+each symbol row also holds its dates and closes as a PriceSeries binary snapshot so a
+load is a single-row read with no per-day decoding.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from itertools import repeat
+
+from backend.services import metrics
+from backend.services.sqlite_pool import ConnectionPool
+from backend.services.price_series import OPTIONAL_COLUMNS, PriceSeries
+
+DEFAULT_PATH = os.path.join("data", "series.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    display_symbol TEXT NOT NULL,
+    has_full INTEGER NOT NULL DEFAULT 0,
+    refreshed_at REAL NOT NULL DEFAULT 0,
+    series BLOB
+);
+CREATE TABLE IF NOT EXISTS prices (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close REAL NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    volume REAL,
+    dividend REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS requests (
+    symbol TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (symbol, day)
+) WITHOUT ROWID;
+"""
+
+_write_lock = threading.Lock()
+
+
+def get_store_path() -> str:
+    return os.environ.get("SERIES_STORE_PATH") or DEFAULT_PATH
+
+
+def _setup(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _migrate(conn)
+
+
+# Connections to the store (file and schema created on first use)
+_pool = ConnectionPool(get_store_path, _setup)
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after a store file was created."""
+    with conn:
+        symbol_cols = {r[1] for r in conn.execute("PRAGMA table_info(symbols)")}
+        if "series" not in symbol_cols:
+            conn.execute("ALTER TABLE symbols ADD COLUMN series BLOB")
+        price_cols = {r[1] for r in conn.execute("PRAGMA table_info(prices)")}
+        for name in OPTIONAL_COLUMNS:
+            if name not in price_cols:
+                conn.execute(f"ALTER TABLE prices ADD COLUMN {name} REAL")
+
+
+def _snapshot(conn: sqlite3.Connection, key: str, display_symbol: str) -> bytes | None:
+    """PriceSeries bytes of key's stored dates and closes, or None if it has no prices."""
+    rows = conn.execute(
+        "SELECT date, close FROM prices WHERE symbol = ? ORDER BY date", (key,)
+    ).fetchall()
+    if not rows:
+        return None
+    return PriceSeries.from_dates(
+        display_symbol, [r[0] for r in rows], [r[1] for r in rows]
+    ).to_bytes()
+
+
+def load_series(symbol: str, columns: tuple[str, ...] = ()) -> PriceSeries | None:
+    """
+    Return the stored series for symbol (dates and adjusted closes, has_full,
+    refreshed_at), or None if it was never saved. columns names optional columns
+    (see price_series.OPTIONAL_COLUMNS) to load as well; days without a value are NaN.
+    """
+    key = symbol.upper()
+    with metrics.span("store"), _pool.connection() as conn:
+        row = conn.execute(
+            "SELECT display_symbol, has_full, refreshed_at, series FROM symbols WHERE symbol = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        display_symbol, has_full, refreshed_at, blob = row
+        if not columns:
+            if blob is None:
+                # Store written before snapshots existed: build it once
+                with _write_lock, conn:
+                    blob = _snapshot(conn, key, display_symbol)
+                    conn.execute("UPDATE symbols SET series = ? WHERE symbol = ?", (blob, key))
+            if blob is None:
+                return None
+            series = PriceSeries.from_bytes(blob, copy=True)
+            series.symbol = display_symbol
+            series.has_full = bool(has_full)
+            series.refreshed_at = refreshed_at
+            return series
+
+        unknown = set(columns) - set(OPTIONAL_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown price columns: {', '.join(sorted(unknown))}")
+        rows = conn.execute(
+            f"SELECT date, close, {', '.join(columns)} FROM prices WHERE symbol = ? ORDER BY date",
+            (key,),
+        ).fetchall()
+    if not rows:
+        return None
+    nan = float("nan")
+    extra = {
+        name: [nan if r[2 + i] is None else r[2 + i] for r in rows]
+        for i, name in enumerate(columns)
+    }
+    return PriceSeries.from_dates(
+        display_symbol, [r[0] for r in rows], [r[1] for r in rows],
+        has_full=bool(has_full), refreshed_at=refreshed_at, **extra,
+    )
+
+
+def get_refreshed_at(symbol: str) -> tuple[float, bool] | None:
+    """(refreshed_at, has_full) for a stored symbol without reading its prices, or None."""
+    with _pool.connection() as conn:
+        row = conn.execute(
+            "SELECT refreshed_at, has_full FROM symbols WHERE symbol = ?", (symbol.upper(),)
+        ).fetchone()
+    return (row[0], bool(row[1])) if row else None
+
+
+def save_series(symbol: str, series: PriceSeries, *, full: bool) -> None:
+    """
+    Write a downloaded series (including any optional columns) into the store.
+
+    full=True replaces everything stored for the symbol. full=False merges a compact
+    (recent ~100 days) download: new days are appended and, if a split or dividend has
+    re-based the adjusted closes since the last pull, older stored closes are rescaled
+    by the same factor so the history stays consistent without a full re-download.
+    A compact series must overlap the stored history (its oldest day on or before the
+    last stored day); otherwise save it as a full download instead.
+    """
+    key = symbol.upper()
+    now = time.time()
+    dates = series.dates()
+    closes = series.closes
+    extra = [getattr(series, name) for name in OPTIONAL_COLUMNS]
+    rows = list(zip(
+        repeat(key), dates, closes, *(repeat(None) if col is None else col for col in extra)
+    ))
+    with metrics.span("store"), _write_lock, _pool.connection() as conn:
+        with conn:
+            if full:
+                conn.execute("DELETE FROM prices WHERE symbol = ?", (key,))
+            elif dates:
+                oldest = dates[0]
+                stored = conn.execute(
+                    "SELECT close FROM prices WHERE symbol = ? AND date = ?",
+                    (key, oldest),
+                ).fetchone()
+                if stored and stored[0]:
+                    factor = closes[0] / stored[0]
+                    if abs(factor - 1.0) > 1e-9:
+                        conn.execute(
+                            "UPDATE prices SET close = close * ? WHERE symbol = ? AND date < ?",
+                            (factor, key, oldest),
+                        )
+            conn.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, date, close, "
+                f"{', '.join(OPTIONAL_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if full:
+                # Exactly what was just written: no need to read it back
+                snapshot = PriceSeries(series.symbol, series.ordinals, closes).to_bytes()
+            else:
+                snapshot = _snapshot(conn, key, series.symbol)
+            conn.execute(
+                """
+                INSERT INTO symbols (symbol, display_symbol, has_full, refreshed_at, series)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    display_symbol = excluded.display_symbol,
+                    has_full = MAX(symbols.has_full, excluded.has_full),
+                    refreshed_at = excluded.refreshed_at,
+                    series = excluded.series
+                """,
+                (key, series.symbol, 1 if full else 0, now, snapshot),
+            )
+
+
+def add_request_counts(counts: dict[str, int], day: str, keep_since: str) -> None:
+    """Add per-symbol request counts for day (YYYY-MM-DD); drop days before keep_since."""
+    with _write_lock, _pool.connection() as conn:
+        with conn:
+            conn.executemany(
+                "INSERT INTO requests (symbol, day, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(symbol, day) DO UPDATE SET count = count + excluded.count",
+                [(symbol.upper(), day, n) for symbol, n in counts.items()],
+            )
+            conn.execute("DELETE FROM requests WHERE day < ?", (keep_since,))
+
+
+def top_requested(since: str, limit: int) -> list[tuple[str, int]]:
+    """Most requested symbols from day since (inclusive) on, as (symbol, count), busiest first."""
+    with _pool.connection() as conn:
+        return conn.execute(
+            "SELECT symbol, SUM(count) AS total FROM requests WHERE day >= ? "
+            "GROUP BY symbol ORDER BY total DESC, symbol LIMIT ?",
+            (since, limit),
+        ).fetchall()
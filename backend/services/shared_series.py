@@ -0,0 +1,315 @@
+"""
+Price series shared by every app process on a host through one memory-mapped file
+(SERIES_SHARED_PATH, default series.shared next to the price store; "off" disables
+it), so adding gunicorn workers adds throughput without another in-memory copy of each
+series or another download of it.
+
+The file is a header, then PriceSeries.to_bytes() blobs and index blocks (symbol ->
+blob offset and length), appended and never modified in place. The header points at
+the current index block; a writer bumps a sequence number to odd before moving that
+pointer and back to even after, and readers retry until they see the same even number
+on both sides of their read. Readers get PriceSeries whose columns are read-only
+memoryviews into the mapping (page cache shared by all processes, no copy).
+
+Appending takes an exclusive lock on a lock file next to it, so there is one writer at
+a time across processes. When the file is full the writer copies the live blobs into a
+new file, swaps it in with os.replace and marks the old one retired; readers then reopen
+the path (views into the old mapping stay valid). writing(symbol) is a per-symbol
+cross-process lock held around downloads, so a symbol missing everywhere is downloaded
+by one process while the others wait and then read it from here.
+
+Needs fcntl (no shared cache on Windows: every process keeps its own copy).
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager, nullcontext
+
+from backend.services import series_store
+from backend.services.price_series import PriceSeries
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_NAME = "series.shared"
+DEFAULT_SIZE_MB = 256
+
+MAGIC = b"SSHR"
+VERSION = 1
+# magic, version, retired, sequence, capacity, used, index offset, index length
+_HEADER = struct.Struct("<4sHHQQQQQ")
+_DATA_START = 64
+_SEQ_OFFSET = 8
+_RETIRED_OFFSET = 6
+# Index block: entry count, then per entry offset, length, symbol length + symbol
+_COUNT = struct.Struct("<I")
+_ENTRY = struct.Struct("<QIH")
+
+# Byte 0 of the lock file guards appends; bytes 1..SYMBOL_SLOTS are per-symbol locks
+SYMBOL_SLOTS = 1024
+LOCK_POLL_SECONDS = 0.01
+
+_lock = threading.Lock()
+_append_lock = threading.Lock()
+_slot_locks = [threading.Lock() for _ in range(SYMBOL_SLOTS)]
+_state: dict = {"path": None, "mm": None, "lock_fd": None, "seq": None, "index": {}}
+_stats = {"hits": 0, "misses": 0, "published": 0, "compactions": 0}
+
+
+def get_path() -> str | None:
+    """The shared file, or None when disabled (SERIES_SHARED_PATH=off, or no fcntl)."""
+    path = os.environ.get("SERIES_SHARED_PATH") or os.path.join(
+        os.path.dirname(series_store.get_store_path()), DEFAULT_NAME
+    )
+    if fcntl is None or path.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    return path
+
+
+def _capacity() -> int:
+    try:
+        mb = float(os.environ.get("SERIES_SHARED_SIZE_MB") or DEFAULT_SIZE_MB)
+    except ValueError:
+        mb = DEFAULT_SIZE_MB
+    return max(int(mb * 1024 * 1024), 1024 * 1024)
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _acquire(fd: int, slot: int) -> None:
+    """Exclusive lock on one byte of the lock file, polling so gevent workers keep serving."""
+    while True:
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+            return
+        except OSError:
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+def _release(fd: int, slot: int) -> None:
+    fcntl.lockf(fd, fcntl.LOCK_UN, 1, slot)
+
+
+def _create(path: str, capacity: int, blobs: list[tuple[str, bytes]] = ()) -> None:
+    """Write a new file holding blobs and swap it in at path (call with the append lock)."""
+    tmp = f"{path}.tmp"
+    index: dict[str, tuple[int, int]] = {}
+    with open(tmp, "wb") as f:
+        f.truncate(capacity)
+        offset = _DATA_START
+        for symbol, blob in blobs:
+            f.seek(offset)
+            f.write(blob)
+            index[symbol] = (offset, len(blob))
+            offset = _align8(offset + len(blob))
+        block = _encode_index(index)
+        f.seek(offset)
+        f.write(block)
+        used = _align8(offset + len(block))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0, capacity, used, offset, len(block)))
+    os.replace(tmp, path)
+
+
+def _encode_index(index: dict[str, tuple[int, int]]) -> bytes:
+    parts = [_COUNT.pack(len(index))]
+    for symbol, (offset, length) in index.items():
+        raw = symbol.encode("utf-8")
+        parts.append(_ENTRY.pack(offset, length, len(raw)) + raw)
+    return b"".join(parts)
+
+
+def _decode_index(buf) -> dict[str, tuple[int, int]]:
+    (count,) = _COUNT.unpack_from(buf)
+    pos = _COUNT.size
+    index = {}
+    for _ in range(count):
+        offset, length, symbol_len = _ENTRY.unpack_from(buf, pos)
+        pos += _ENTRY.size
+        index[bytes(buf[pos:pos + symbol_len]).decode("utf-8")] = (offset, length)
+        pos += symbol_len
+    return index
+
+
+def _open(path: str) -> mmap.mmap | None:
+    """Map path read/write, or None if it does not exist yet."""
+    try:
+        with open(path, "r+b") as f:
+            return mmap.mmap(f.fileno(), 0)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _lock_fd(path: str) -> int:
+    fd = _state["lock_fd"]
+    if fd is None or _state["path"] != path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = _state["lock_fd"] = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    return fd
+
+
+def _mapping(path: str) -> mmap.mmap | None:
+    """This process's mapping of path, reopened when the file was replaced."""
+    mm = _state["mm"]
+    if mm is not None and _state["path"] == path and not mm[_RETIRED_OFFSET]:
+        return mm
+    with _lock:
+        mm = _state["mm"]
+        if mm is None or _state["path"] != path or mm[_RETIRED_OFFSET]:
+            # Old views keep the old mapping alive; it is never closed explicitly
+            _lock_fd(path)
+            mm = _open(path)
+            _state.update({"path": path, "mm": mm, "seq": None, "index": {}})
+        return mm
+
+
+def _index(mm: mmap.mmap) -> dict[str, tuple[int, int]]:
+    """The current index (decoded again only when the sequence number moved)."""
+    while True:
+        magic, version, _, seq, _, _, offset, length = _HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a shared series file")
+        if seq & 1:
+            time.sleep(0)
+            continue
+        if seq == _state["seq"] and mm is _state["mm"]:
+            return _state["index"]
+        block = mm[offset:offset + length]
+        (check,) = struct.unpack_from("<Q", mm, _SEQ_OFFSET)
+        if check == seq:
+            index = _decode_index(block)
+            if mm is _state["mm"]:
+                _state["seq"], _state["index"] = seq, index
+            return index
+
+
+def _view(mm: mmap.mmap, entry: tuple[int, int]) -> PriceSeries:
+    offset, length = entry
+    return PriceSeries.from_bytes(memoryview(mm).toreadonly()[offset:offset + length])
+
+
+def get(symbol: str) -> PriceSeries | None:
+    """symbol's latest published series (zero-copy), or None if absent or disabled."""
+    path = get_path()
+    if path is None:
+        return None
+    mm = _mapping(path)
+    entry = _index(mm).get(symbol.upper()) if mm is not None else None
+    if entry is None:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return _view(mm, entry)
+
+
+def put(symbol: str, series: PriceSeries) -> PriceSeries:
+    """
+    Publish series for symbol and return the shared (zero-copy) copy of it; series
+    itself when disabled. Nothing is written if the same or a newer copy is there.
+    """
+    path = get_path()
+    if path is None:
+        return series
+    key = symbol.upper()
+    blob = series.to_bytes()
+    with _append_lock:
+        fd = _lock_fd(path)
+        _acquire(fd, 0)
+        try:
+            mm = _mapping(path)
+            if mm is None:
+                _create(path, _capacity())
+                mm = _mapping(path)
+            index = _index(mm)
+            current = index.get(key)
+            if current is not None:
+                shared = _view(mm, current)
+                if shared.refreshed_at >= series.refreshed_at and (
+                    shared.has_full or not series.has_full
+                ):
+                    return shared
+            index = dict(index)
+            _, _, _, seq, capacity, used, _, _ = _HEADER.unpack_from(mm)
+            offset = used
+            end = _align8(offset + len(blob))
+            block_size = _COUNT.size + sum(
+                _ENTRY.size + len(s.encode("utf-8")) for s in (*index, key)
+            )
+            if end + block_size > capacity:
+                mm = _compact(path, mm, index, key, blob)
+                return _view(mm, _index(mm)[key])
+            index[key] = (offset, len(blob))
+            block = _encode_index(index)
+            mm[offset:offset + len(blob)] = blob
+            mm[end:end + len(block)] = block
+            struct.pack_into("<Q", mm, _SEQ_OFFSET, seq + 1)
+            _HEADER.pack_into(
+                mm, 0, MAGIC, VERSION, 0, seq + 1, capacity,
+                _align8(end + len(block)), end, len(block),
+            )
+            struct.pack_into("<Q", mm, _SEQ_OFFSET, seq + 2)
+            _stats["published"] += 1
+            return _view(mm, index[key])
+        finally:
+            _release(fd, 0)
+
+
+def _compact(
+    path: str, mm: mmap.mmap, index: dict[str, tuple[int, int]], key: str, blob: bytes
+) -> mmap.mmap:
+    """Rewrite the live blobs (key's replaced by blob) into a new file; retire the old one."""
+    blobs = [(s, mm[o:o + n]) for s, (o, n) in index.items() if s != key]
+    blobs.append((key, blob))
+    live = sum(_align8(len(b)) for _, b in blobs)
+    _create(path, max(_capacity(), 2 * live + _DATA_START + 64 * len(blobs)), blobs)
+    mm[_RETIRED_OFFSET] = 1
+    _stats["published"] += 1
+    _stats["compactions"] += 1
+    return _mapping(path)
+
+
+@contextmanager
+def _symbol_lock(path: str, symbol: str):
+    slot = 1 + zlib.crc32(symbol.upper().encode("utf-8")) % SYMBOL_SLOTS
+    # lockf locks belong to the process: threads / greenlets queue on a local lock first
+    with _slot_locks[slot - 1]:
+        fd = _lock_fd(path)
+        _acquire(fd, slot)
+        try:
+            yield
+        finally:
+            _release(fd, slot)
+
+
+def writing(symbol: str):
+    """
+    Context manager held while loading or downloading symbol: one holder per symbol
+    across all processes sharing the file (a no-op when disabled).
+    """
+    path = get_path()
+    return nullcontext() if path is None else _symbol_lock(path, symbol)
+
+
+def stats() -> dict:
+    """
+    { enabled, path, symbols, usedBytes, capacityBytes, hits, misses, published,
+    compactions } (counters are this process's).
+    """
+    path = get_path()
+    out = {"enabled": path is not None, "path": path, "symbols": 0, "usedBytes": 0,
+           "capacityBytes": 0, **_stats}
+    mm = _mapping(path) if path else None
+    if mm is not None:
+        _, _, _, _, capacity, used, _, _ = _HEADER.unpack_from(mm)
+        out.update({"symbols": len(_index(mm)), "usedBytes": used, "capacityBytes": capacity})
+    return out
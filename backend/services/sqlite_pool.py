@@ -0,0 +1,70 @@
+"""
+Per-process pool of SQLite connections for the local stores (price store, AVM cache).
+
+A thread-local connection is per greenlet under the gevent workers, so every request
+would open (and set up) its own connection and never reuse it. Connections here are
+checked out for one operation and handed back, so a process keeps a few of them open
+for its lifetime whatever runs on top of it: threads, greenlets or both.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+DEFAULT_MAX_IDLE = 4
+
+
+class ConnectionPool:
+    """
+    Connections to the file named by path() (re-read on each checkout, so a changed
+    path gets a fresh set). setup(conn) runs once per new connection (PRAGMAs, schema,
+    migrations). At most max_idle connections are kept between checkouts.
+    """
+
+    def __init__(
+        self,
+        path: Callable[[], str],
+        setup: Callable[[sqlite3.Connection], None],
+        max_idle: int = DEFAULT_MAX_IDLE,
+    ) -> None:
+        self._path = path
+        self._setup = setup
+        self._max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[sqlite3.Connection]] = {}
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Checked out by one caller at a time, but not always from the thread that opened it
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._setup(conn)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """A connection for the caller's exclusive use until the block ends."""
+        path = self._path()
+        with self._lock:
+            idle = self._idle.get(path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = self._open(path)
+        try:
+            yield conn
+        except BaseException:
+            # Never hand back a connection left inside a transaction
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(path, [])
+                if len(idle) < self._max_idle:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
@@ -0,0 +1,134 @@
+"""
+Parameter sweep for real estate: equity or gain/loss % over a grid of
+interest rate x down payment % x annual appreciation % at one as-of date.
+
+For a fixed buy/as-of date the mortgage and appreciation math separates per axis:
+the remaining-balance fraction depends only on the rate and the value multiple only
+on appreciation, so each axis is computed once and cells are a multiply-subtract.
+"""
+
+import base64
+import sys
+from array import array
+
+from backend.services import metrics
+from backend.services.real_estate import (
+    appreciation_factor,
+    parse_date,
+    remaining_balance,
+    round_to,
+)
+
+MAX_CELLS = 250_000
+METRICS = ("equity", "gainLossPercent")
+
+
+def frange(start: float, stop: float, step: float) -> list[float]:
+    """Inclusive range of floats (start, start+step, ..., <= stop), rounded to avoid drift."""
+    if step <= 0:
+        raise ValueError("Sweep step must be positive")
+    if stop < start:
+        raise ValueError("Sweep max must be >= min")
+    count = int((stop - start) / step + 1e-9) + 1
+    if count > MAX_CELLS:
+        raise ValueError(f"Too many sweep values (max {MAX_CELLS})")
+    return [round(start + i * step, 10) for i in range(count)]
+
+
+def sweep_real_estate(
+    *,
+    purchase_price: float,
+    buy_date: str,
+    as_of_date: str,
+    rates: list[float],
+    down_payments: list[float],
+    appreciations: list[float],
+    metric: str = "equity",
+    loan_term_years: int = 30,
+) -> dict:
+    """
+    Evaluate metric on the grid rates x down_payments x appreciations (all percents).
+    Returns { metric, axes: {annualInterestRate, downPaymentPercent,
+    annualAppreciationPercent}, shape: [nr, nd, na], values: flat row-major list
+    (appreciation varies fastest), min, max }.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    if purchase_price <= 0:
+        raise ValueError("Invalid purchase price or down payment percent")
+    if not rates or not down_payments or not appreciations:
+        raise ValueError("Every sweep axis needs at least one value")
+    cells = len(rates) * len(down_payments) * len(appreciations)
+    if cells > MAX_CELLS:
+        raise ValueError(f"Sweep grid too large ({cells} cells, max {MAX_CELLS})")
+    if any(d < 0 or d >= 100 for d in down_payments):
+        raise ValueError("Invalid purchase price or down payment percent")
+    if any(r < 0 for r in rates):
+        raise ValueError("Interest rate must be non-negative")
+
+    with metrics.span("amortize"):
+        start = parse_date(buy_date)
+        end = parse_date(as_of_date)
+        n = loan_term_years * 12
+        if end >= start:
+            payments = min((end.year - start.year) * 12 + end.month - start.month, n)
+        else:
+            payments = 0
+        days = end.toordinal() - start.toordinal()
+
+        # Remaining balance as a fraction of the loan, per rate
+        fractions = [remaining_balance(1.0, rate, payments, n) for rate in rates]
+        loans = [purchase_price * (1 - d / 100.0) for d in down_payments]
+        downs = [purchase_price * d / 100.0 for d in down_payments]
+        values = [purchase_price * appreciation_factor(a, days) for a in appreciations]
+
+        out: list[float] = []
+        if metric == "equity":
+            for b in fractions:
+                for loan in loans:
+                    owed = loan * b
+                    out.extend([v - owed for v in values])
+        else:
+            for b in fractions:
+                for loan, down in zip(loans, downs):
+                    owed = loan * b
+                    if down:
+                        scale = 100.0 / down
+                        out.extend([(v - owed - down) * scale for v in values])
+                    else:
+                        out.extend([0.0] * len(values))
+
+    return {
+        "metric": metric,
+        "asOfDate": as_of_date,
+        "axes": {
+            "annualInterestRate": rates,
+            "downPaymentPercent": down_payments,
+            "annualAppreciationPercent": appreciations,
+        },
+        "shape": [len(rates), len(down_payments), len(appreciations)],
+        "values": out,
+        "min": min(out),
+        "max": max(out),
+    }
+
+
+def encode_values(values: list[float], encoding: str = "json") -> dict:
+    """
+    Encode sweep values for the response: "json" rounds to cents in a plain list;
+    "float32" is base64 of little-endian float32 (4 bytes/cell) for large grids.
+    """
+    if encoding == "json":
+        with metrics.span("encode"):
+            return {"encoding": "json", "values": [round_to(v, 2) for v in values]}
+    if encoding == "float32":
+        with metrics.span("encode"):
+            buf = array("f", values)
+            if sys.byteorder != "little":
+                buf.byteswap()
+            return {
+                "encoding": "float32",
+                "dtype": "<f4",
+                "values": base64.b64encode(buf.tobytes()).decode("ascii"),
+            }
+    raise ValueError("encoding must be json or float32")
@@ -0,0 +1,242 @@
+"""
+Rate-limit-aware scheduler shared by the upstream API clients.
+
+Each provider has one token bucket per limit (Alpha Vantage: 5/minute and 25/day,
+RentCast: 50/month by default). Callers queue for a token in priority order, so
+interactive requests are served before background warmers, and wait for the next
+token instead of failing when a limit is hit. A call that could not get a token
+within its max wait (e.g. the daily quota is spent) fails fast with ValueError.
+Transient failures are retried here rather than in the HTTP session, so each retry
+queues for (and spends) a token like any other request.
+
+Bucket levels live in a SQLite file shared by all processes on the host (see
+quota_store), so the limits hold for the whole deployment however many gunicorn
+workers run, and survive restarts. Queue order is per process.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable
+
+import requests
+
+from backend.services import http_client, metrics, quota_store
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+MINUTE = 60.0
+DAY = 86400.0
+MONTH = 30 * DAY
+
+DEFAULT_MAX_WAIT_SECONDS = 65.0
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """
+    capacity tokens, refilled continuously at capacity per period seconds. Times are
+    epoch seconds (time.time()) so the state can be shared between processes.
+    """
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated = time.time()
+
+    def _refill(self, now: float) -> None:
+        rate = self.capacity / self.period
+        # max(): the wall clock may step back
+        self.tokens = min(self.capacity, self.tokens + max(now - self.updated, 0.0) * rate)
+        self.updated = max(now, self.updated)
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def drain(self, now: float) -> None:
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def snapshot(self, now: float) -> dict:
+        self._refill(now)
+        return {
+            "limit": self.capacity,
+            "periodSeconds": self.period,
+            "remaining": int(self.tokens) if self.tokens > 0 else 0,
+            "nextTokenInSeconds": round(self.wait_time(now), 1),
+        }
+
+
+class _Provider:
+    def __init__(self, name: str, label: str, limits: list[tuple[int, float]]) -> None:
+        self.name = name
+        self.label = label
+        self.buckets = [TokenBucket(c, p) for c, p in limits]
+        self.queue: list[tuple[int, int]] = []  # heap of (priority, ticket)
+        self.calls = 0
+        self.retried = 0
+        self.throttled = 0
+        self.rejected = 0
+
+
+class UpstreamScheduler:
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._providers: dict[str, _Provider] = {}
+        self._tickets = itertools.count()
+
+    def register(self, name: str, label: str, limits: list[tuple[int, float]]) -> None:
+        """Add (or replace) a provider with its (capacity, period seconds) limits."""
+        with self._cond:
+            self._providers[name] = _Provider(name, label, limits)
+
+    def acquire(
+        self, name: str, priority: int = INTERACTIVE, max_wait: float | None = None
+    ) -> None:
+        """
+        Block until a token from every bucket of provider name is taken. Callers are
+        served in (priority, arrival) order. Raises ValueError if that cannot happen
+        within max_wait seconds (None = DEFAULT_MAX_WAIT_SECONDS or UPSTREAM_MAX_WAIT_SECONDS).
+        """
+        if max_wait is None:
+            max_wait = float(os.environ.get("UPSTREAM_MAX_WAIT_SECONDS") or DEFAULT_MAX_WAIT_SECONDS)
+        deadline = time.monotonic() + max_wait
+        with self._cond:
+            provider = self._providers[name]
+            entry = (priority, next(self._tickets))
+            heapq.heappush(provider.queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if provider.queue[0] == entry:
+                        with quota_store.synced(name, provider.buckets):
+                            clock = time.time()
+                            wait = max(b.wait_time(clock) for b in provider.buckets)
+                            if wait == 0:
+                                for b in provider.buckets:
+                                    b.take(clock)
+                        if wait == 0:
+                            provider.calls += 1
+                            return
+                        if now + wait > deadline:
+                            provider.rejected += 1
+                            raise ValueError(
+                                f"{provider.label} rate limit reached; "
+                                f"next request possible in {_describe(wait)}"
+                            )
+                        self._cond.wait(wait)
+                    else:
+                        if now >= deadline:
+                            provider.rejected += 1
+                            raise ValueError(
+                                f"{provider.label} is busy; too many queued requests"
+                            )
+                        self._cond.wait(deadline - now)
+            finally:
+                provider.queue.remove(entry)
+                heapq.heapify(provider.queue)
+                self._cond.notify_all()
+
+    def call(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        *,
+        priority: int = INTERACTIVE,
+        max_wait: float | None = None,
+    ) -> Any:
+        """
+        Run fn once a token for provider name is available (the wait is the "queue" span).
+        A transient failure (http_client.is_transient) is retried up to UPSTREAM_RETRIES
+        times after a backoff, each attempt queueing for a token of its own; fn must be
+        safe to call again.
+        """
+        attempt = 0
+        while True:
+            with metrics.span("queue"):
+                if attempt:
+                    time.sleep(http_client.backoff(attempt))
+                self.acquire(name, priority, max_wait)
+            try:
+                result = fn()
+            except requests.RequestException as e:
+                if attempt >= http_client.retries() or not http_client.is_transient(e):
+                    raise
+            else:
+                if attempt >= http_client.retries() or not http_client.is_transient(result):
+                    return result
+            attempt += 1
+            with self._cond:
+                self._providers[name].retried += 1
+
+    def report_throttled(self, name: str) -> None:
+        """The provider said we are over a limit: empty its shortest-period bucket."""
+        with self._cond:
+            provider = self._providers[name]
+            provider.throttled += 1
+            with quota_store.synced(name, provider.buckets):
+                min(provider.buckets, key=lambda b: b.period).drain(time.time())
+
+    def quota(self) -> dict:
+        """Per provider: bucket snapshots, queue depth by priority and call counters."""
+        out = {}
+        with self._cond:
+            for p in self._providers.values():
+                with quota_store.synced(p.name, p.buckets):
+                    now = time.time()
+                    limits = [b.snapshot(now) for b in p.buckets]
+                out[p.name] = {
+                    "limits": limits,
+                    "remaining": min(b["remaining"] for b in limits),
+                    "queued": {
+                        "interactive": sum(1 for pr, _ in p.queue if pr == INTERACTIVE),
+                        "background": sum(1 for pr, _ in p.queue if pr != INTERACTIVE),
+                    },
+                    "calls": p.calls,
+                    "retried": p.retried,
+                    "throttled": p.throttled,
+                    "rejected": p.rejected,
+                }
+        return out
+
+
+def _describe(seconds: float) -> str:
+    if seconds < 120:
+        return f"{int(seconds) + 1}s"
+    if seconds < 7200:
+        return f"{int(seconds // 60) + 1} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+scheduler = UpstreamScheduler()
+scheduler.register(
+    "alphaVantage",
+    "Alpha Vantage",
+    [
+        (_env_int("ALPHA_VANTAGE_PER_MINUTE", 5), MINUTE),
+        (_env_int("ALPHA_VANTAGE_PER_DAY", 25), DAY),
+    ],
+)
+scheduler.register(
+    "rentcast",
+    "RentCast",
+    [(_env_int("RENTCAST_PER_MONTH", 50), MONTH)],
+)
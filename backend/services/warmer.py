@@ -0,0 +1,200 @@
+"""
+Background cache warmer: keeps the most requested symbols downloaded, refreshed and
+parsed in memory so interactive requests almost never wait on Alpha Vantage.
+
+After each US market close (weekdays at WARMER_RUN_AT_UTC, default 21:30 UTC, which is
+after the 16:00 New York close in both EST and EDT) the hot set is refreshed at
+BACKGROUND priority, busiest symbol first, while more than WARMER_RESERVE daily Alpha
+Vantage calls remain for interactive users. The hot set is WARMER_SYMBOLS plus the
+WARMER_MAX_SYMBOLS most requested symbols over the last WARMER_WINDOW_DAYS. Every hot
+symbol is also loaded into memory with its date index built.
+
+Runs as a daemon thread in each app process (see start) or stand-alone (warmer.py).
+Only one process per price store downloads: the holder of a lock file next to the
+store. The others pick refreshed series up from the shared series file (or the store).
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from backend.services import popularity, series_store
+from backend.services.alpha_vantage import preload, refresh_daily_adjusted
+from backend.services.upstream import scheduler
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, every process may download
+    fcntl = None
+
+DEFAULT_RUN_AT_UTC = "21:30"
+DEFAULT_MAX_SYMBOLS = 50
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_RESERVE = 5
+# How often processes that do not hold the lock reload refreshed series from the store
+FOLLOWER_INTERVAL_SECONDS = 300.0
+
+logger = logging.getLogger(__name__)
+
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+_lock_file = None
+_status: dict = {"running": False, "leader": False, "lastRunAt": None, "nextRunAt": None,
+                 "lastResult": None}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def _run_at() -> tuple[int, int]:
+    value = os.environ.get("WARMER_RUN_AT_UTC") or DEFAULT_RUN_AT_UTC
+    try:
+        hour, minute = (int(part) for part in value.split(":"))
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            return hour, minute
+    except ValueError:
+        pass
+    hour, minute = DEFAULT_RUN_AT_UTC.split(":")
+    return int(hour), int(minute)
+
+
+def last_run_slot(now: datetime) -> datetime:
+    """Most recent weekday run time at or before now (UTC)."""
+    hour, minute = _run_at()
+    slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if slot > now:
+        slot -= timedelta(days=1)
+    while slot.weekday() >= 5:
+        slot -= timedelta(days=1)
+    return slot
+
+
+def next_run_slot(now: datetime) -> datetime:
+    """First weekday run time after now (UTC)."""
+    hour, minute = _run_at()
+    slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if slot <= now:
+        slot += timedelta(days=1)
+    while slot.weekday() >= 5:
+        slot += timedelta(days=1)
+    return slot
+
+
+def hot_symbols() -> list[str]:
+    """WARMER_SYMBOLS, then the most requested symbols, without duplicates."""
+    seeds = [
+        s.strip().upper() for s in (os.environ.get("WARMER_SYMBOLS") or "").split(",") if s.strip()
+    ]
+    limit = _env_int("WARMER_MAX_SYMBOLS", DEFAULT_MAX_SYMBOLS)
+    popular = popularity.popular(limit, _env_int("WARMER_WINDOW_DAYS", DEFAULT_WINDOW_DAYS))
+    return list(dict.fromkeys(seeds + popular))[: max(limit, len(seeds))]
+
+
+def _daily_remaining() -> int:
+    limits = scheduler.quota()["alphaVantage"]["limits"]
+    return max(limits, key=lambda b: b["periodSeconds"])["remaining"]
+
+
+def warm_once(download: bool = True) -> dict:
+    """
+    One pass over the hot set. Symbols not refreshed since the last market close are
+    downloaded while the daily budget lasts (if download); all others are loaded from
+    the store into memory. Returns { refreshed, loaded, skipped, failed: {symbol: error} }.
+    """
+    cutoff = last_run_slot(datetime.now(timezone.utc)).timestamp()
+    budget = _daily_remaining() - _env_int("WARMER_RESERVE", DEFAULT_RESERVE) if download else 0
+    result: dict = {"refreshed": [], "loaded": [], "skipped": [], "failed": {}}
+    for symbol in hot_symbols():
+        stored = series_store.get_refreshed_at(symbol)
+        current = stored is not None and stored[1] and stored[0] >= cutoff
+        if current or budget <= 0:
+            result["loaded" if preload(symbol) else "skipped"].append(symbol)
+            continue
+        budget -= 1
+        try:
+            series = refresh_daily_adjusted(symbol, cutoff)
+        except (ValueError, requests.RequestException) as e:
+            result["failed"][symbol] = str(e)
+            if "API key" in str(e) or "rate limit" in str(e):
+                break
+            continue
+        if series.refreshed_at >= cutoff:
+            result["refreshed"].append(symbol)
+        else:
+            result["failed"][symbol] = "Refresh failed; stored series kept"
+    return result
+
+
+def _try_lead() -> bool:
+    """Take (or keep) the per-store lock that makes this process the downloader."""
+    global _lock_file
+    if _lock_file is not None or fcntl is None:
+        return True
+    directory = os.path.dirname(series_store.get_store_path())
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    f = open(os.path.join(directory, "warmer.lock"), "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _lock_file = f
+    return True
+
+
+def run(once: bool = False) -> None:
+    """Warm now, then after every market close until stop() is called (or once)."""
+    _status["running"] = True
+    try:
+        while True:
+            leader = _try_lead()
+            try:
+                result = warm_once(download=leader)
+            except Exception:
+                # Keep the thread alive; the next pass retries
+                logger.exception("Cache warmer pass failed")
+                result = None
+            now = datetime.now(timezone.utc)
+            wait = (next_run_slot(now) - now).total_seconds()
+            if not leader:
+                wait = min(wait, FOLLOWER_INTERVAL_SECONDS)
+            _status.update({
+                "leader": leader,
+                "lastRunAt": now.isoformat(timespec="seconds"),
+                "nextRunAt": (now + timedelta(seconds=wait)).isoformat(timespec="seconds"),
+                "lastResult": result,
+            })
+            if result:
+                logger.info(
+                    "Cache warmer: %d refreshed, %d loaded, %d failed",
+                    len(result["refreshed"]), len(result["loaded"]), len(result["failed"]),
+                )
+            if once or _stop.wait(wait):
+                return
+    finally:
+        _status["running"] = False
+
+
+def start() -> None:
+    """Start the warmer thread for this process (once)."""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=run, name="cache-warmer", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    _stop.set()
+
+
+def status() -> dict:
+    """{ running, leader, lastRunAt, nextRunAt, lastResult } of this process's warmer."""
+    return dict(_status)
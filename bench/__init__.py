@@ -0,0 +1 @@
+# Benchmark suite: fake upstream, micro-benchmarks, end-to-end load scenarios
@@ -0,0 +1,100 @@
+"""
+Benchmark runner: python -m bench [--quick] [--update-baseline] [--tolerance 0.25]
+
+Starts the fake upstream, points the app at it (temporary price store and caches,
+upstream limits lifted), runs the micro-benchmarks and the end-to-end load scenarios,
+prints p50/p99 latency and throughput, and compares them with bench/baseline.json.
+Exits 1 if any benchmark regressed by more than the tolerance. Baselines are
+machine-specific: refresh them with --update-baseline on the machine that runs the check.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from bench import fake_upstream
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _configure_env(base_url: str, workdir: str) -> None:
+    os.environ.update({
+        "ALPHA_VANTAGE_BASE_URL": f"{base_url}/query",
+        "RENTCAST_BASE_URL": f"{base_url}/v1",
+        "ALPHA_VANTAGE_API_KEY": "bench",
+        "RENTCAST_API_KEY": "bench",
+        "SERIES_STORE_PATH": os.path.join(workdir, "series.sqlite3"),
+        "AVM_CACHE_PATH": os.path.join(workdir, "avm_cache.sqlite3"),
+        "ALPHA_VANTAGE_PER_MINUTE": "100000",
+        "ALPHA_VANTAGE_PER_DAY": "100000",
+        "RENTCAST_PER_MONTH": "100000",
+        "WARMER_ENABLED": "0",
+    })
+
+
+def _print_table(results: dict) -> None:
+    print(f"{'benchmark':<48}{'p50 ms':>12}{'p99 ms':>12}{'ops/s':>12}{'errors':>8}")
+    for group, benches in results.items():
+        for name, r in benches.items():
+            print(
+                f"{group + '.' + name:<48}{r['p50Ms']:>12.4f}{r['p99Ms']:>12.4f}"
+                f"{r['throughput']:>12.1f}{r['errors']:>8}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Investment Outlook benchmarks")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake upstream latency")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="also write results JSON here")
+    args = parser.parse_args()
+
+    server, base_url = fake_upstream.start(latency_ms=args.latency_ms)
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure_env(base_url, workdir)
+        # Import after the environment points the app at the fake upstream
+        from bench import load, micro
+
+        results = {
+            "micro": micro.run(iterations=300 if args.quick else 2000),
+            "load": load.run(
+                requests=100 if args.quick else 400, concurrency=args.concurrency
+            ),
+        }
+    server.shutdown()
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    from bench.stats import compare
+
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} of baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
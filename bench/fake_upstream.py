@@ -0,0 +1,139 @@
+"""
+Local stand-in for Alpha Vantage and RentCast used by the benchmarks.
+
+Serves deterministic synthetic data with configurable latency:
+  GET /query?function=TIME_SERIES_DAILY_ADJUSTED&symbol=&outputsize=full|compact
+      25 years of weekday prices (100 days for compact), seeded by symbol
+  GET /v1/avm/value?address=
+      AVM estimate seeded by address
+
+Run standalone:  python -m bench.fake_upstream --port 8765 --latency-ms 200
+then point the app at it with ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8765/query
+and RENTCAST_BASE_URL=http://127.0.0.1:8765/v1.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+YEARS = 25
+END_DATE = date(2026, 10, 15)
+
+
+@lru_cache(maxsize=256)
+def series_payload(symbol: str, outputsize: str) -> bytes:
+    """TIME_SERIES_DAILY_ADJUSTED JSON (newest first, like Alpha Vantage) for symbol."""
+    rnd = random.Random(zlib.crc32(symbol.encode()))
+    days = []
+    d = END_DATE - timedelta(days=int(YEARS * 365.25))
+    while d <= END_DATE:
+        if d.weekday() < 5:
+            days.append(d)
+        d += timedelta(days=1)
+    price = rnd.uniform(20, 200)
+    rows = []
+    for d in days:
+        price *= 1 + rnd.gauss(0.0003, 0.012)
+        p = f"{price:.4f}"
+        rows.append((d.isoformat(), {
+            "1. open": p, "2. high": p, "3. low": p, "4. close": p,
+            "5. adjusted close": p, "6. volume": str(rnd.randrange(10**5, 10**7)),
+            "7. dividend amount": "0.0000", "8. split coefficient": "1.0",
+        }))
+    rows.reverse()
+    if outputsize == "compact":
+        rows = rows[:100]
+    return json.dumps({
+        "Meta Data": {
+            "1. Information": "Daily Time Series with Splits and Dividend Events",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": rows[0][0],
+            "4. Output Size": "Full size" if outputsize == "full" else "Compact",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": dict(rows),
+    }, indent=4).encode()
+
+
+def avm_payload(address: str) -> bytes:
+    rnd = random.Random(zlib.crc32(address.upper().encode()))
+    price = round(rnd.uniform(150_000, 2_500_000), -3)
+    return json.dumps({
+        "price": price,
+        "priceRangeLow": round(price * 0.9, -3),
+        "priceRangeHigh": round(price * 1.1, -3),
+        "subjectProperty": {"formattedAddress": address.upper()},
+    }).encode()
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    calls = 0
+    _calls_lock = threading.Lock()
+
+    def do_GET(self):
+        with self._calls_lock:
+            FakeUpstreamHandler.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("/query") and params.get("function") == "TIME_SERIES_DAILY_ADJUSTED":
+            body = series_payload(params.get("symbol", "").upper(), params.get("outputsize", "compact"))
+        elif url.path.endswith("/avm/value") and params.get("address"):
+            body = avm_payload(params["address"])
+        else:
+            self._send(404, b'{"error": "not found"}')
+            return
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes) -> None:
+        gzipped = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port: int = 0, latency_ms: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Start the fake upstream in a daemon thread. Returns (server, base URL)."""
+    handler = type("Handler", (FakeUpstreamHandler,), {"latency": latency_ms / 1000.0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base = start(args.port, args.latency_ms)
+    print(f"Fake upstream on {base} (Alpha Vantage: {base}/query, RentCast: {base}/v1)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
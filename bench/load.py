@@ -0,0 +1,91 @@
+"""
+End-to-end load scenarios: the Flask app on a local threaded server, talking to the
+fake upstream, hit by concurrent clients the way the frontend does.
+"""
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import app
+from bench.stats import summarize
+
+SYMBOLS = ("VOO", "SPY", "QQQ", "VTI", "IWM")
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_app() -> tuple[object, str]:
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _params(rnd: random.Random) -> dict:
+    # Distinct amounts so the response cache does not turn the run into pure cache hits
+    year = rnd.randrange(2003, 2020)
+    return {
+        "symbol": rnd.choice(SYMBOLS),
+        "investedAmount": rnd.randrange(10_000, 1_000_000),
+        "buyDate": f"{year}-0{rnd.randrange(1, 10)}-15",
+        "purchasePrice": rnd.randrange(200_000, 3_000_000),
+        "downPaymentPercent": rnd.choice([5, 10, 20, 25]),
+        "annualInterestRate": rnd.choice([3.5, 5, 6.5, 7]),
+        "reBuyDate": f"{year}-0{rnd.randrange(1, 10)}-15",
+        "asOfDate": "2026-06-30",
+    }
+
+
+def _get(url: str) -> None:
+    with urllib.request.urlopen(url, timeout=60) as resp:
+        resp.read()
+
+
+def run_scenario(base: str, path: str, requests: int, concurrency: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    urls = [f"{base}{path}?{urlencode(_params(rnd))}" for _ in range(requests)]
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(url: str) -> None:
+        nonlocal errors
+        t = time.perf_counter()
+        try:
+            _get(url)
+        except (urllib.error.URLError, OSError):
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, urls))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def run(requests: int = 400, concurrency: int = 16) -> dict:
+    server, base = start_app()
+    try:
+        # Warm: first load of each symbol pays the (fake) upstream download once
+        for symbol in SYMBOLS:
+            _get(f"{base}/api/stock/historical?symbol={symbol}&from=2026-01-01")
+        return {
+            "compare": run_scenario(base, "/api/compare", requests, concurrency, 1),
+            "compare_time_series": run_scenario(
+                base, "/api/compare/time-series", requests, concurrency, 2
+            ),
+        }
+    finally:
+        server.shutdown()
@@ -0,0 +1,109 @@
+"""Micro-benchmarks for the hot service functions (series already loaded in memory)."""
+
+import random
+import time
+
+from backend.services.alpha_vantage import get_daily_adjusted, get_price_on_or_before
+from backend.services.compare_timeseries import get_compare_time_series
+from backend.services.outlook import simulate_outlook
+from backend.services.real_estate import compute_hypothetical_real_estate
+from backend.services.rolling import rolling_windows
+
+from bench.stats import summarize
+
+
+def _time_calls(fn, args_list: list, batch: int = 1) -> dict:
+    """
+    Per-call latency of fn over args_list. Calls are timed in groups of batch (latency =
+    group time / batch) so sub-microsecond functions are not dominated by timer overhead.
+    """
+    for args in args_list[: max(1, len(args_list) // 10)]:
+        fn(*args)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(args_list), batch):
+        group = args_list[i : i + batch]
+        t = time.perf_counter()
+        for args in group:
+            fn(*args)
+        latencies.append((time.perf_counter() - t) / len(group))
+    wall = time.perf_counter() - start
+    summary = summarize(latencies, wall)
+    summary["count"] = len(args_list)
+    summary["throughput"] = round(len(args_list) / wall, 1)
+    return summary
+
+
+def run(iterations: int = 2000, symbol: str = "VOO") -> dict:
+    rnd = random.Random(42)
+    series = get_daily_adjusted(symbol, "full")
+    dates = series.dates()
+
+    def real_estate(i):
+        compute_hypothetical_real_estate(
+            purchase_price=500_000 + i,
+            down_payment_percent=20,
+            annual_interest_rate=6.5,
+            buy_date="2005-06-15",
+            as_of_date=dates[-1 - i % 1000],
+            annual_appreciation_percent=3,
+        )
+
+    def time_series(i):
+        get_compare_time_series(
+            symbol=symbol,
+            invested_amount=100_000,
+            stock_buy=dates[i % 1000],
+            purchase_price=500_000,
+            down_payment_percent=20,
+            annual_interest_rate=6.5,
+            re_buy_date=dates[i % 1000],
+            as_of_date=dates[-1],
+            annual_appreciation_percent=3,
+            granularity="monthly",
+        )
+
+    def outlook(i):
+        simulate_outlook(
+            symbol=symbol,
+            invested_amount=100_000,
+            purchase_price=500_000,
+            down_payment_percent=20,
+            annual_interest_rate=6.5,
+            annual_appreciation_percent=3,
+            start_date=dates[-1],
+            horizon_years=30,
+            paths=10_000,
+            seed=i,
+        )
+
+    def rolling(i):
+        rolling_windows(
+            holding_years=10,
+            symbol=symbol,
+            invested_amount=100_000,
+            purchase_price=500_000 + i,
+            down_payment_percent=20,
+            annual_interest_rate=6.5,
+            annual_appreciation_percent=3,
+        )
+
+    return {
+        "compute_hypothetical_real_estate": _time_calls(
+            real_estate, [(i,) for i in range(iterations * 5)], batch=50
+        ),
+        "get_price_on_or_before": _time_calls(
+            get_price_on_or_before,
+            [(series, dates[rnd.randrange(len(dates))]) for _ in range(iterations * 50)],
+            batch=500,
+        ),
+        "get_compare_time_series_monthly": _time_calls(
+            time_series, [(i,) for i in range(max(1, iterations // 10))]
+        ),
+        "simulate_outlook_10k_x_360": _time_calls(
+            outlook, [(i,) for i in range(max(2, iterations // 200))]
+        ),
+        "rolling_windows_10y_daily": _time_calls(
+            rolling, [(i,) for i in range(max(1, iterations // 10))]
+        ),
+    }
@@ -0,0 +1,45 @@
+"""Latency summaries and baseline comparison for the benchmark suite."""
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies_s: list[float], wall_s: float, errors: int = 0) -> dict:
+    """p50/p99/mean latency in ms and throughput (ops/s) for one benchmark."""
+    lat = sorted(latencies_s)
+    return {
+        "count": len(lat),
+        "errors": errors,
+        "p50Ms": round(percentile(lat, 50) * 1000, 4),
+        "p99Ms": round(percentile(lat, 99) * 1000, 4),
+        "meanMs": round(sum(lat) / len(lat) * 1000, 4) if lat else 0.0,
+        "throughput": round(len(lat) / wall_s, 1) if wall_s else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Regressions of results against baseline: p50 or p99 more than tolerance slower, or
+    throughput more than tolerance lower. Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    for group, benches in results.items():
+        for name, cur in benches.items():
+            base = baseline.get(group, {}).get(name)
+            if not base:
+                continue
+            for key in ("p50Ms", "p99Ms"):
+                if base.get(key) and cur[key] > base[key] * (1 + tolerance):
+                    regressions.append(
+                        f"{group}.{name}.{key}: {cur[key]} vs baseline {base[key]}"
+                    )
+            if base.get("throughput") and cur["throughput"] < base["throughput"] * (1 - tolerance):
+                regressions.append(
+                    f"{group}.{name}.throughput: {cur['throughput']} vs baseline {base['throughput']}"
+                )
+    return regressions
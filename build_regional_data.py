@@ -0,0 +1,61 @@
+"""
+Build the regional dataset (backend/services/regional_data.py) from published CSVs:
+`python build_regional_data.py --hpi Metro_zhvi.csv --hpi State_zhvi.csv --rates MORTGAGE30US.csv`.
+See backend/services/regional_sources.py for the accepted layouts. The output
+(REGIONAL_DATA_PATH, default data/regional.bin) is replaced atomically, so running
+app processes pick it up on their next request.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.services import regional_data, regional_sources
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the regional HPI / mortgage-rate dataset")
+    parser.add_argument(
+        "--hpi", action="append", default=[], help="home price index CSV (repeatable)"
+    )
+    parser.add_argument(
+        "--rates", action="append", default=[], help="30-year fixed rate CSV (repeatable)"
+    )
+    parser.add_argument("--out", default=None, help="output file (default: REGIONAL_DATA_PATH)")
+    args = parser.parse_args()
+    if not args.hpi and not args.rates:
+        parser.error("give at least one --hpi or --rates file")
+
+    out = args.out or regional_data.get_data_path()
+    try:
+        data = regional_sources.build(args.hpi, args.rates)
+    except (OSError, ValueError) as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+    directory = os.path.dirname(out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{out}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out)
+
+    dataset = regional_data.RegionalData(data)
+    print(json.dumps({
+        "path": out,
+        "bytes": len(data),
+        "from": regional_data.month_label(dataset.first_month),
+        "through": regional_data.month_label(dataset.first_month + dataset.months - 1),
+        "regions": len(dataset.hpi_regions()),
+        "mortgageRates": regional_data.MORTGAGE_RATE_KEY in dataset.rows,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -175,6 +175,7 @@ compareBtn.addEventListener("click", async () => {
   const reBuyDate = document.getElementById("reBuyDate").value;
   const asOfDate = document.getElementById("asOfDate").value;
   const annualAppreciationPercent = parseFloat(document.getElementById("annualAppreciationPercent").value) || 0;
+  const appreciationRegion = document.getElementById("appreciationRegion").value.trim();
 
   const params = new URLSearchParams();
 
@@ -191,6 +192,7 @@ compareBtn.addEventListener("click", async () => {
     params.set("reBuyDate", reBuyDate);
     params.set("asOfDate", asOfDate);
     if (annualAppreciationPercent !== 0) params.set("annualAppreciationPercent", String(annualAppreciationPercent));
+    if (appreciationRegion) params.set("region", appreciationRegion);
   }
 
   if (params.toString() === "") {
@@ -198,11 +200,15 @@ compareBtn.addEventListener("click", async () => {
     return;
   }
 
+  const tsParams = new URLSearchParams(params);
+  tsParams.set("granularity", document.getElementById("chartGranularity").value);
+  tsParams.set("maxPoints", "500");
+
   compareBtn.disabled = true;
   try {
     const [compareRes, tsRes] = await Promise.all([
       fetch(`/api/compare?${params}`),
-      fetch(`/api/compare/time-series?${params}`),
+      fetch(`/api/compare/time-series?${tsParams}`),
     ]);
     const data = await compareRes.json();
     if (!compareRes.ok) {
@@ -221,10 +227,13 @@ compareBtn.addEventListener("click", async () => {
 
 let compareChartInstance = null;
 
+const X_AXIS_TITLES = { yearly: "Year", monthly: "Month", weekly: "Week ending", daily: "Date" };
+
 function renderCompareChart(tsData) {
   const container = document.getElementById("chart-container");
   const canvas = document.getElementById("compare-chart");
-  if (!tsData || (!tsData.stock && !tsData.realEstate) || !tsData.years || tsData.years.length === 0) {
+  const labels = tsData ? tsData.labels || tsData.years : null;
+  if (!tsData || (!tsData.stock && !tsData.realEstate) || !labels || labels.length === 0) {
     container.style.display = "none";
     if (compareChartInstance) {
       compareChartInstance.destroy();
@@ -266,7 +275,7 @@ function renderCompareChart(tsData) {
   compareChartInstance = new Chart(canvas, {
     type: "line",
     data: {
-      labels: tsData.years,
+      labels,
       datasets,
     },
     options: {
@@ -282,7 +291,7 @@ function renderCompareChart(tsData) {
         },
       },
       scales: {
-        x: { title: { display: true, text: "Year" } },
+        x: { title: { display: true, text: X_AXIS_TITLES[tsData.granularity] || "Year" } },
         y: {
           title: { display: true, text: "Value ($)" },
           ticks: { callback: (v) => "$" + Number(v).toLocaleString() },
@@ -328,6 +337,7 @@ function renderCompareResult(data) {
           <dt>Buy date</dt><dd>${realEstate.buyDate}</dd>
           <dt>As-of date</dt><dd>${realEstate.asOfDate}</dd>
           <dt>Remaining balance</dt><dd>$${realEstate.remainingBalance.toLocaleString()}</dd>
+          ${realEstate.region ? `<dt>Home price index</dt><dd>${realEstate.region} (${realEstate.indexFrom} to ${realEstate.indexThrough})</dd>` : ""}
           <dt>Est. value at as-of</dt><dd>$${realEstate.estimatedValueAtAsOf.toLocaleString()}</dd>
           <dt>Equity at as-of</dt><dd>$${realEstate.equityAtAsOf.toLocaleString()}</dd>
           <dt>Gain / loss (on down payment)</dt><dd class="${gainClass}">$${realEstate.gainLoss.toLocaleString()} (${realEstate.gainLossPercent >= 0 ? "+" : ""}${realEstate.gainLossPercent.toFixed(2)}%)</dd>
@@ -0,0 +1,27 @@
+"""
+Production server config: gunicorn with gevent workers (`gunicorn app:app`).
+
+Each worker process serves many requests concurrently as greenlets. gevent patches
+sockets, sleeps and locks, so a request waiting on Alpha Vantage or RentCast (or queued
+in the upstream scheduler) yields instead of pinning an OS thread, and the same Flask
+blueprints serve hundreds of in-flight comparisons per container.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '3000')}"
+# Upstream quotas and cached series are shared between workers (see quota_store and
+# shared_series), so more workers do not mean more Alpha Vantage / RentCast calls.
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+# Concurrent requests (greenlets) per worker
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+# Upstream calls may queue for a rate-limit token (UPSTREAM_MAX_WAIT_SECONDS) and then
+# download for up to UPSTREAM_READ_TIMEOUT, so allow well over both.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 150))
+graceful_timeout = 30
+keepalive = 5
+# gevent must patch the standard library before the app (and its locks) is imported
+preload_app = False
+accesslog = "-"
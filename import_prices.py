@@ -0,0 +1,45 @@
+"""
+Bulk price import: `python import_prices.py DIR_OR_FILE...` loads end-of-day CSV / Parquet
+files (see backend/services/price_sources.py for the accepted layouts) into the local
+price store in parallel, so those symbols are served with no Alpha Vantage calls.
+Re-importing a symbol replaces its stored history.
+"""
+
+import argparse
+import json
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.services import price_import
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import CSV / Parquet prices into the price store")
+    parser.add_argument("paths", nargs="+", help="price files or directories (searched recursively)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPUs)")
+    parser.add_argument("--symbols", help="comma-separated symbols to import (default: all)")
+    parser.add_argument("--quiet", action="store_true", help="no per-file output")
+    args = parser.parse_args()
+
+    symbols = None
+    if args.symbols:
+        symbols = {s.strip().upper() for s in args.symbols.split(",") if s.strip()}
+
+    def progress(path: str, count: int, error: str | None) -> None:
+        if error:
+            print(f"FAILED {path}: {error}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"{path}: {count} symbol(s)")
+
+    result = price_import.import_files(
+        args.paths, workers=args.workers, symbols=symbols, progress=progress
+    )
+    print(json.dumps(result, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
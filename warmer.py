@@ -0,0 +1,33 @@
+"""
+Stand-alone cache warmer: `python warmer.py` keeps the popular symbols refreshed after
+every market close (see backend/services/warmer.py); `python warmer.py --once` runs a
+single pass and exits, e.g. from cron. Use it with WARMER_ENABLED=0 in the app, or next
+to it: only one process per price store downloads.
+"""
+
+import argparse
+import json
+import logging
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.services import warmer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh popular symbols in the price store")
+    parser.add_argument("--once", action="store_true", help="run one pass and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        warmer.run(once=args.once)
+    except KeyboardInterrupt:
+        pass
+    if args.once:
+        print(json.dumps(warmer.status(), indent=2))
+
+
+if __name__ == "__main__":
+    main()